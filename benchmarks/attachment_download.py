@@ -0,0 +1,78 @@
+"""
+Benchmarks attachment download throughput against a local file server.
+
+Usage::
+
+    python benchmarks/attachment_download.py [count] [size_mb] [concurrency]
+
+"""
+import functools
+import sys
+import tempfile
+import threading
+import time
+import types
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import anyio
+
+from curious.core import _current_client
+from curious.core.httpclient import HTTPClient
+from curious.dataclasses.attachment import Attachment
+from curious.dataclasses.bases import allow_external_makes
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory: Path) -> ThreadingHTTPServer:
+    handler = functools.partial(QuietHandler, directory=str(directory))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def main(count: int, size_mb: int, concurrency: int):
+    source = Path(tempfile.mkdtemp())
+    dest = Path(tempfile.mkdtemp())
+    server = serve(source)
+    url_base = f"http://127.0.0.1:{server.server_port}"
+
+    block = bytes(range(256)) * 4096
+    attachments = []
+    for i in range(count):
+        path = source / f"file{i}.bin"
+        with path.open("wb") as f:
+            for _ in range(size_mb):
+                f.write(block)
+
+        with allow_external_makes():
+            attachment = Attachment(id=i, filename=path.name, size=path.stat().st_size,
+                                    url=f"{url_base}/{path.name}")
+        attachments.append(attachment)
+
+    # the dataclasses only need the http client from the current client
+    _current_client.set(types.SimpleNamespace(http=HTTPClient("", max_connections=concurrency)))
+
+    total = count * size_mb
+    before = time.perf_counter()
+    for attachment in attachments:
+        await attachment.save(dest / f"seq_{attachment.filename}")
+    sequential = time.perf_counter() - before
+
+    before = time.perf_counter()
+    await Attachment.save_all(attachments, dest, concurrency=concurrency)
+    concurrent = time.perf_counter() - before
+
+    print(f"{count} files x {size_mb} MiB")
+    print(f"sequential:            {sequential:.2f}s ({total / sequential:.1f} MiB/s)")
+    print(f"concurrent (cap {concurrency}): {concurrent:.2f}s ({total / concurrent:.1f} MiB/s)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    anyio.run(main, *(args + [32, 8, 8][len(args):]), backend="trio")
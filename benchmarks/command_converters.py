@@ -0,0 +1,203 @@
+"""
+Benchmarks the per-invocation overhead of converting command arguments.
+
+The baseline is the previous converter, which inspected the signature and looked up converters on
+every invocation. The new path runs the command's precompiled :class:`.ConverterPipeline`.
+
+Usage::
+
+    python benchmarks/command_converters.py [iterations]
+
+"""
+import inspect
+import sys
+import time
+from typing import List
+
+from curious.commands.context import Context
+from curious.commands.decorators import command
+from curious.commands.exc import ConversionFailedError, MissingArgumentError
+from curious.commands.utils import get_pipeline
+from curious.util import replace_quotes
+
+
+def old_convert(ctx, tokens: List[str], signature: inspect.Signature):
+    final_args = []
+    final_kwargs = {}
+
+    def _with_reraise(func, ann, ctx, arg):
+        try:
+            return func(ann, ctx, arg)
+        except ConversionFailedError:
+            raise
+        except Exception as e:
+            raise ConversionFailedError(ctx, arg, ann, message="Converter error") from e
+
+    args_it = iter(tokens)
+    for n, (name, param) in enumerate(signature.parameters.items()):
+        if n == 0:
+            # Don't convert the `ctx` argument.
+            continue
+
+        assert isinstance(param, inspect.Parameter)
+        # We loop over the signature parameters because it's easier to use those to consume.
+        # Get the next argument from args.
+
+        def consume_token() -> str:
+            try:
+                return next(args_it)
+            except StopIteration as e:
+                # not good!
+                # If we're a *arg format, we can safely handle this, or if we have a default.
+                if param.kind in [inspect.Parameter.KEYWORD_ONLY,
+                                  inspect.Parameter.VAR_POSITIONAL]:
+                    return None
+
+                if param.default == inspect.Parameter.empty:
+                    raise MissingArgumentError(ctx, param.name) from e
+
+                return None  # ??
+
+        # Begin the consumption!
+        if param.kind in [inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                          inspect.Parameter.POSITIONAL_ONLY]:
+            # ensure we have a non-empty argument
+            arg = consume_token()
+            if arg is None:
+                break
+
+            while arg == "":
+                if arg is None:
+                    break
+
+                arg = next(args_it)
+
+            arg = replace_quotes(arg)
+            converter = ctx._lookup_converter(param.annotation)
+            final_args.append(_with_reraise(converter, param.annotation, ctx, arg))
+            continue
+
+        if param.kind in [inspect.Parameter.KEYWORD_ONLY]:
+            # Only add it to final_kwargs.
+            # This is a consume all operation, so we eat all of the arguments.
+            f = []
+
+            while True:
+                next_arg = consume_token()
+                if next_arg is None:
+                    break
+
+                f.append(next_arg)
+
+            if not f:
+                if param.default is inspect.Parameter.empty:
+                    raise MissingArgumentError(ctx, param.name)
+                else:
+                    final_kwargs[param.name] = param.default
+            else:
+                converter = ctx._lookup_converter(param.annotation)
+                if len(f) == 1:
+                    final_kwargs[param.name] = _with_reraise(converter, param.annotation, ctx,
+                                                             f[0])
+                else:
+                    final_kwargs[param.name] = _with_reraise(converter, param.annotation, ctx,
+                                                             " ".join(f))
+            continue
+
+        if param.kind in [inspect.Parameter.VAR_POSITIONAL]:
+            # This *shouldn't* be called on `*` arguments, but we can't be sure.
+            # Special case - consume ALL the arguments.
+            f = []
+
+            while True:
+                next_arg = consume_token()
+                if next_arg is None:
+                    break
+
+                f.append(next_arg)
+
+            if not f:
+                if param.default is inspect.Parameter.empty:
+                    raise MissingArgumentError(ctx, param.name)
+                else:
+                    final_kwargs[param.name] = param.default
+            else:
+                converter = ctx._lookup_converter(param.annotation)
+                results = []
+                for item in f:
+                    results.append(_with_reraise(converter, param.annotation, ctx, item))
+
+                final_args += results
+
+        if param.kind in [inspect.Parameter.VAR_KEYWORD]:
+            # no
+            continue
+
+    return final_args, final_kwargs
+
+
+
+class BenchContext(Context):
+    def __init__(self):
+        # the converters used here don't need a message or event context
+        pass
+
+
+@command()
+async def no_args(ctx):
+    pass
+
+
+@command()
+async def simple(ctx, user: str, amount: int):
+    pass
+
+
+@command()
+async def mixed(ctx, amount: int, ratio: float, *, reason: str = None):
+    pass
+
+
+@command()
+async def variadic(ctx, *values: int):
+    pass
+
+
+@command()
+async def generic(ctx, values: List[int]):
+    pass
+
+
+CASES = [
+    (no_args, []),
+    (simple, ["someone", "10"]),
+    (mixed, ["3", "0.5", "because", "I", "said", "so"]),
+    (variadic, [str(i) for i in range(8)]),
+    (generic, ['"1 2 3 4"']),
+]
+
+
+def main(iterations: int):
+    ctx = BenchContext()
+
+    print(f"{iterations} invocations per command")
+    for func, tokens in CASES:
+        before = time.perf_counter()
+        for _ in range(iterations):
+            old_convert(ctx, tokens, inspect.signature(func))
+        old = time.perf_counter() - before
+
+        before = time.perf_counter()
+        for _ in range(iterations):
+            get_pipeline(func).convert(ctx, tokens)
+        new = time.perf_counter() - before
+
+        assert old_convert(ctx, tokens, inspect.signature(func)) == \
+            get_pipeline(func).convert(ctx, tokens)
+
+        print(f"{func.__name__:>10}: old {old / iterations * 1e6:.2f}us, "
+              f"new {new / iterations * 1e6:.2f}us ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,127 @@
+"""
+Benchmarks command matching and tokenization over a corpus of generated chat messages.
+
+The baseline is the previous pipeline, which checked each prefix in turn and tokenized the whole
+message one character at a time. The new pipeline splits out the command word first, and only
+tokenizes the arguments if the command exists.
+
+Usage::
+
+    python benchmarks/command_tokenizer.py [messages] [command_ratio]
+
+"""
+import random
+import sys
+import time
+import types
+
+import anyio
+
+from curious.commands.utils import _tokenize, prefix_check_factory
+
+PREFIXES = ["!", "?", ">>", "bot "]
+COMMANDS = ["ping", "help", "ban", "kick", "tag", "remind", "role", "say"]
+WORDS = ["the", "a", "server", "when", "is", "lol", "anyone", "here", "discord", "message",
+         "channel", "yeah", "ok", "I", "think", "that", "update", "broke", "it", "again"]
+
+
+def old_split(content: str, delim: str = " "):
+    tokens = []
+    cur = ''
+    in_quotes = False
+
+    for char in content.strip():
+        if char == delim and not in_quotes:
+            tokens.append(cur)
+            cur = ''
+        elif char == '"' and not in_quotes:
+            in_quotes = True
+            cur += char
+        elif char == '"' and in_quotes:
+            in_quotes = False
+            cur += char
+        else:
+            cur += char
+    tokens.append(cur)
+
+    return tokens
+
+
+def old_check(content: str):
+    matched = None
+    for prefix in PREFIXES:
+        if content.startswith(prefix):
+            matched = prefix
+            break
+
+    if not matched:
+        return None
+
+    tokens = old_split(content[len(matched):])
+    return tokens[0], tokens[1:]
+
+
+def sentence(rng: random.Random, length: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(length)]
+    if words and rng.random() < 0.3:
+        # add a quoted phrase
+        start = rng.randrange(len(words))
+        words[start] = '"' + words[start]
+        words[-1] += '"'
+
+    return " ".join(words)
+
+
+def make_corpus(count: int, command_ratio: float):
+    rng = random.Random(0)
+    corpus = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < command_ratio:
+            # a real command, with arguments
+            word = rng.choice(COMMANDS)
+        elif roll < command_ratio * 2:
+            # something prefixed that isn't a command, e.g. "!!!" or "?what"
+            word = rng.choice(WORDS)
+        else:
+            corpus.append(sentence(rng, rng.randint(1, 60)))
+            continue
+
+        corpus.append(rng.choice(PREFIXES) + word + " " + sentence(rng, rng.randint(0, 40)))
+
+    return corpus
+
+
+async def main(count: int, command_ratio: float):
+    corpus = make_corpus(count, command_ratio)
+    messages = [types.SimpleNamespace(content=content) for content in corpus]
+    commands = set(COMMANDS)
+    check = prefix_check_factory(PREFIXES)
+
+    before = time.perf_counter()
+    old_tokens = 0
+    for message in messages:
+        matched = old_check(message.content)
+        if matched is not None and matched[0] in commands:
+            old_tokens += len(matched[1])
+    old = time.perf_counter() - before
+
+    before = time.perf_counter()
+    new_tokens = 0
+    for message in messages:
+        matched = await check(None, message)
+        if matched is not None and matched[0] in commands:
+            new_tokens += len(_tokenize(matched[1]) if matched[1] else [])
+    new = time.perf_counter() - before
+
+    assert old_tokens == new_tokens
+
+    print(f"{count} messages, {command_ratio:.0%} commands, {command_ratio:.0%} prefixed "
+          f"non-commands")
+    print(f"old: {old * 1000:.1f}ms ({old / count * 1e6:.2f}us/message)")
+    print(f"new: {new * 1000:.1f}ms ({new / count * 1e6:.2f}us/message)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    anyio.run(main, int(args[0]) if args else 100_000, float(args[1]) if len(args) > 1 else 0.05)
@@ -0,0 +1,105 @@
+"""
+Benchmarks making dataclasses from gateway payloads.
+
+Three paths are timed for each type:
+
+- ``stack``: ``__init__`` plus an ``inspect.stack()`` call, which is what every dataclass made
+  used to cost when running without ``-O``.
+- ``init``: ``__init__`` alone, with the construction checks disabled.
+- ``parser``: the generated ``_from_payload`` parser.
+
+Usage::
+
+    python benchmarks/dataclass_construction.py [count]
+
+"""
+import inspect
+import sys
+import time
+import types
+
+from curious.core import _current_client
+from curious.dataclasses.bases import allow_external_makes
+from curious.dataclasses.channel import Channel
+from curious.dataclasses.emoji import Emoji
+from curious.dataclasses.member import Member
+from curious.dataclasses.message import Message
+from curious.dataclasses.role import Role
+from curious.dataclasses.user import User
+
+TIMESTAMP = "2018-06-01T12:34:56.789000+00:00"
+
+
+def user(i: int) -> dict:
+    return {"id": str(100000000000000000 + i), "username": f"user{i}",
+            "discriminator": f"{i % 10000:04d}", "avatar": "a" * 32, "bot": False}
+
+
+PAYLOADS = {
+    User: user,
+    Member: lambda i: {"user": user(i), "roles": [str(200000000000000000 + r) for r in range(4)],
+                       "joined_at": TIMESTAMP, "nick": None, "deaf": False, "mute": False},
+    Role: lambda i: {"id": str(200000000000000000 + i), "name": f"role{i}", "color": 0xff00ff,
+                     "hoist": True, "mentionable": False, "permissions": 104324161,
+                     "managed": False, "position": i},
+    Channel: lambda i: {"id": str(300000000000000000 + i), "guild_id": "1", "name": f"chan{i}",
+                        "type": 0, "topic": "a topic", "position": i, "nsfw": False,
+                        "parent_id": "400000000000000000", "last_message_id": "500000000000000000",
+                        "rate_limit_per_user": 0},
+    Message: lambda i: {"id": str(500000000000000000 + i), "channel_id": "300000000000000000",
+                        "author": user(i), "content": "hello world " * 4, "timestamp": TIMESTAMP,
+                        "edited_timestamp": None, "type": 0, "embeds": [], "attachments": [],
+                        "mentions": [], "mention_roles": []},
+    Emoji: lambda i: {"id": str(600000000000000000 + i), "name": f"emoji{i}", "roles": [],
+                      "require_colons": True, "managed": False, "animated": False},
+}
+
+
+def fake_client():
+    users = {}
+
+    def make_user(data: dict):
+        user_id = int(data["id"])
+        if user_id not in users:
+            users[user_id] = User._from_payload(data)
+
+        return users[user_id]
+
+    state = types.SimpleNamespace(make_user=make_user, _users=users,
+                                  _check_decache_user=lambda id: None)
+    return types.SimpleNamespace(state=state, user=None, guilds={})
+
+
+def main(count: int):
+    _current_client.set(fake_client())
+
+    print(f"{count} objects per type, microseconds per object")
+    print(f"{'type':>8} {'stack':>8} {'init':>8} {'parser':>8}")
+    for cls, factory in PAYLOADS.items():
+        payloads = [factory(i) for i in range(count)]
+
+        # inspect.stack() is much slower than everything else, so only sample it
+        sample = payloads[:max(1, count // 100)]
+        before = time.perf_counter()
+        with allow_external_makes():
+            for payload in sample:
+                inspect.stack()
+                cls(**payload)
+        stack = (time.perf_counter() - before) / len(sample)
+
+        before = time.perf_counter()
+        with allow_external_makes():
+            for payload in payloads:
+                cls(**payload)
+        init = (time.perf_counter() - before) / count
+
+        before = time.perf_counter()
+        for payload in payloads:
+            cls._from_payload(payload)
+        parser = (time.perf_counter() - before) / count
+
+        print(f"{cls.__name__:>8} {stack * 1e6:8.1f} {init * 1e6:8.2f} {parser * 1e6:8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,91 @@
+"""
+Benchmarks firing events through an :class:`.EventManager`.
+
+Each event has a plugin-style hook (which has nothing to do for it), a few short handlers marked
+as inline, one long handler and a temporary listener. Events are fired once with inline dispatch
+turned off, which spawns a task for everything like before, and once with it turned on.
+
+Usage::
+
+    python benchmarks/event_dispatch.py [events] [inline handlers]
+
+"""
+import logging
+import sys
+import time
+import types
+
+import anyio
+
+from curious.core import _current_client
+from curious.core.event import EventManager, event
+
+GATEWAY = types.SimpleNamespace(session=types.SimpleNamespace(shard_id=0))
+
+
+def make_manager(inline_handlers: int) -> EventManager:
+    manager = EventManager()
+    counts = {"short": 0, "long": 0}
+
+    async def hook(ctx, *args):
+        # like the commands manager's hook, for events no plugin handles
+        if ctx.event_name != "message_create":
+            return
+
+    manager.add_event_hook(hook, inline=True)
+
+    for _ in range(inline_handlers):
+        @event("message_create", inline=True)
+        async def short_handler(ctx, message):
+            counts["short"] += 1
+
+        manager.add_event(short_handler)
+
+    @event("message_create")
+    async def long_handler(ctx, message):
+        await anyio.sleep(0)
+        counts["long"] += 1
+
+    manager.add_event(long_handler)
+
+    async def listener(ctx, message):
+        pass
+
+    manager.add_temporary_listener("message_create", listener)
+    manager.counts = counts
+    return manager
+
+
+async def run(count: int, inline_handlers: int, inline: bool):
+    manager = make_manager(inline_handlers)
+    manager.inline_dispatch = inline
+
+    before = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        manager.task_manager = tg
+        for i in range(count):
+            await manager.fire_event("message_create", i, gateway=GATEWAY)
+
+    elapsed = time.perf_counter() - before
+    assert manager.counts == {"short": count * inline_handlers, "long": count}
+
+    stats = manager.stats
+    print(f"{'inline' if inline else 'spawned':>8} {stats.tasks_spawned / count:8.2f} "
+          f"{stats.inline_calls / count:8.2f} {stats.dispatch_overhead * 1e6:10.2f} "
+          f"{elapsed / count * 1e6:10.2f}")
+
+
+def main(count: int, inline_handlers: int):
+    _current_client.set(types.SimpleNamespace(shard_count=1))
+    # adding hooks logs a warning
+    logging.getLogger("curious").setLevel(logging.ERROR)
+
+    print(f"{count} events, {inline_handlers} inline handlers, per event")
+    print(f"{'mode':>8} {'tasks':>8} {'inline':>8} {'fire (us)':>10} {'total (us)':>10}")
+    for inline in (False, True):
+        anyio.run(run, count, inline_handlers, inline)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 50_000, int(args[1]) if len(args) > 1 else 4)
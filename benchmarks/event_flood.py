@@ -0,0 +1,78 @@
+"""
+Benchmarks an :class:`.EventManager` under a flood of events, with and without admission control.
+
+Events arrive faster than their handlers (which each sleep for 50 milliseconds) can finish. A
+fifth of them are ``message_create``, which is given a higher priority; the rest are
+``typing_start``. Without limits, handler tasks pile up; with them, the flood is either slowed down
+(``block``) or partly shed (``drop`` and ``sample``).
+
+Usage::
+
+    python benchmarks/event_flood.py [events] [max tasks]
+
+"""
+import logging
+import sys
+import time
+import types
+
+import anyio
+
+from curious.core import _current_client
+from curious.core.event import AdmissionControl, EventManager, OverloadPolicy, event
+
+GATEWAY = types.SimpleNamespace(session=types.SimpleNamespace(shard_id=0))
+
+
+async def run(count: int, max_tasks: int, policy: OverloadPolicy):
+    manager = EventManager()
+    if policy is not None:
+        manager.admission = AdmissionControl(max_tasks=max_tasks, policy=policy,
+                                             priorities={"message_create": 1})
+
+    handled = {"message_create": 0, "typing_start": 0}
+    peak = 0
+
+    @event("message_create")
+    @event("typing_start")
+    async def handler(ctx, i):
+        await anyio.sleep(0.05)
+        handled[ctx.event_name] += 1
+
+    manager.add_event(handler)
+
+    before = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        manager.task_manager = tg
+        for i in range(count):
+            name = "message_create" if i % 5 == 0 else "typing_start"
+            await manager.fire_event(name, i, gateway=GATEWAY)
+            peak = max(peak, manager.stats.tasks_spawned - sum(handled.values()))
+            # let the handlers run now and then, like reading from the websocket would
+            if i % 100 == 0:
+                await anyio.sleep(0)
+
+    elapsed = time.perf_counter() - before
+
+    admission = manager.admission
+    shed = admission.shed if admission else 0
+    delayed = admission.delayed if admission else 0
+    print(f"{policy.name.lower() if policy else 'none':>8} {peak:8} "
+          f"{handled['message_create']:8} {handled['typing_start']:8} {shed:8} {delayed:8} "
+          f"{elapsed:8.2f}")
+
+
+def main(count: int, max_tasks: int):
+    _current_client.set(types.SimpleNamespace(shard_count=1))
+    logging.getLogger("curious").setLevel(logging.ERROR)
+
+    print(f"{count} events, limit of {max_tasks} tasks")
+    print(f"{'policy':>8} {'peak':>8} {'messages':>8} {'typing':>8} "
+          f"{'shed':>8} {'delayed':>8} {'time (s)':>8}")
+    for policy in (None, OverloadPolicy.BLOCK, OverloadPolicy.DROP, OverloadPolicy.SAMPLE):
+        anyio.run(run, count, max_tasks, policy)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 50_000, int(args[1]) if len(args) > 1 else 500)
@@ -0,0 +1,128 @@
+"""
+Measures the resident memory of a large synthetic guild.
+
+Members are sent in chunks of JSON, so every string is a fresh object like it would be from the
+gateway. Usernames, role sets and games are drawn from pools with realistic amounts of repetition,
+and most members are offline.
+
+Each run measures one member store, as RSS is per process.
+
+Usage::
+
+    python benchmarks/member_memory.py [members] [default|lazy|columnar]
+
+"""
+import gc
+import json
+import random
+import resource
+import sys
+import time
+import types
+
+import anyio
+
+from curious.core import _current_client
+from curious.core.state import State
+from curious.dataclasses.guild import Guild
+from curious.dataclasses.memberstore import ColumnarMemberStore, LazyMemberStore
+
+GUILD_ID = 1
+NAMES = [f"name{i}" for i in range(5000)]
+GAMES = [f"Game {i}" for i in range(300)]
+ROLE_SETS = [[]] * 10 + [[str(200 + r) for r in range(n)] for n in range(1, 6)] + \
+            [[str(200 + r), str(300 + s)] for r in range(5) for s in range(5)]
+STATUSES = ["online"] * 6 + ["idle"] * 3 + ["dnd"]
+
+
+def rss() -> int:
+    """
+    :return: The current resident set size of this process, in bytes.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # peak RSS, in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def make_chunk(rng: random.Random, start: int, count: int) -> str:
+    members = []
+    for i in range(start, start + count):
+        name = rng.choice(NAMES)
+        if rng.random() < 0.5:
+            name += str(rng.randrange(100))
+
+        avatar = "%032x" % rng.getrandbits(128) if rng.random() < 0.4 else None
+        members.append({
+            "user": {"id": str(100000000000000000 + i), "username": name,
+                     "discriminator": "%04d" % rng.randrange(1, 10000), "avatar": avatar},
+            "roles": rng.choice(ROLE_SETS),
+            "joined_at": "2018-%02d-%02dT12:%02d:%02d.%06d+00:00" % (
+                rng.randrange(1, 13), rng.randrange(1, 29), rng.randrange(60), rng.randrange(60),
+                rng.randrange(1000000)),
+            "nick": rng.choice(NAMES) if rng.random() < 0.1 else None,
+            "deaf": False, "mute": False,
+        })
+
+    return json.dumps(members)
+
+
+def make_presences(rng: random.Random, start: int, count: int) -> str:
+    presences = []
+    for i in range(start, start + count):
+        if rng.random() >= 0.2:
+            # offline members are not sent
+            continue
+
+        game = {"name": rng.choice(GAMES), "type": 0} if rng.random() < 0.3 else None
+        presences.append({"user": {"id": str(100000000000000000 + i)},
+                          "status": rng.choice(STATUSES), "game": game})
+
+    return json.dumps(presences)
+
+
+async def run(count: int, store: str):
+    state = State()
+    if store == "columnar":
+        state.member_store_factory = lambda guild: ColumnarMemberStore(guild.id)
+    elif store == "lazy":
+        state.member_store_factory = lambda guild: LazyMemberStore(guild.id)
+
+    client = types.SimpleNamespace(state=state, user=types.SimpleNamespace(id=0),
+                                   guilds=state.guilds)
+    _current_client.set(client)
+
+    guild = Guild(id=GUILD_ID)
+    state._guilds[guild.id] = guild
+    guild.from_guild_create(id=GUILD_ID, name="large", member_count=count, members=[])
+
+    rng = random.Random(0)
+    gc.collect()
+    before_rss = rss()
+    elapsed = 0
+
+    for start in range(0, count, 1000):
+        size = min(1000, count - start)
+        members = json.loads(make_chunk(rng, start, size))
+        presences = json.loads(make_presences(rng, start, size))
+
+        before = time.perf_counter()
+        guild._handle_member_chunk(members)
+        for presence in presences:
+            guild._members.set_presence(int(presence["user"]["id"]), presence)
+        elapsed += time.perf_counter() - before
+
+    del members, presences
+    gc.collect()
+    used = rss() - before_rss
+
+    print(f"{store}: {len(guild.members)} members, {len(state._users)} users")
+    print(f"RSS: {used / 1024 / 1024:.1f} MiB ({used / count:.0f} bytes/member)")
+    print(f"ingest: {elapsed:.1f}s ({elapsed / count * 1e6:.1f}us/member)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    anyio.run(run, int(args[0]) if args else 1_000_000, args[1] if len(args) > 1 else "default")
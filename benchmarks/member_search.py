@@ -0,0 +1,103 @@
+"""
+Benchmarks searching a large synthetic guild for members by name.
+
+The first searches build the name index and its sorted key list, so they are timed separately.
+Afterwards, the indexed searches are compared against a linear scan over every member, which is
+how searches were done before the index.
+
+Usage::
+
+    python benchmarks/member_search.py [members] [searches]
+
+"""
+import random
+import sys
+import time
+import types
+
+from curious.core import _current_client
+from curious.dataclasses.memberstore import ColumnarMemberStore, LazyMemberStore, MemberStore
+from curious.dataclasses.user import User
+
+GUILD_ID = 1
+
+
+def member(i: int) -> dict:
+    user = {"id": str(100000000000000000 + i), "username": f"User{i}",
+            "discriminator": f"{i % 10000:04d}", "avatar": None, "bot": False}
+    return {"user": user, "roles": [], "joined_at": None,
+            "nick": f"nick{i}" if i % 10 == 0 else None, "deaf": False, "mute": False}
+
+
+def fake_client():
+    users = {}
+
+    def make_user(data: dict):
+        user_id = int(data["id"])
+        if user_id not in users:
+            users[user_id] = User._from_payload(data)
+
+        return users[user_id]
+
+    state = types.SimpleNamespace(make_user=make_user, _users=users,
+                                  _check_decache_user=lambda id: None)
+    return types.SimpleNamespace(state=state, user=None, guilds={})
+
+
+def linear_search(store: MemberStore, name: str):
+    for member in store.values():
+        if member.user.username == name or member.nickname == name:
+            return member
+
+
+def run(store_type: type, count: int, searches: int):
+    _current_client.set(fake_client())
+    store = store_type(GUILD_ID)
+    for i in range(count):
+        store.add_payload(member(i))
+
+    rng = random.Random(0)
+    names = [f"User{rng.randrange(count)}" for _ in range(searches)]
+    folded = [name.lower() for name in names]
+
+    before = time.perf_counter()
+    store.search("")
+    store.search_prefix("")
+    build = time.perf_counter() - before
+
+    before = time.perf_counter()
+    for name in names:
+        store.search(name)
+    exact = (time.perf_counter() - before) / searches
+
+    before = time.perf_counter()
+    for name in folded:
+        store.search(name)
+    casefold = (time.perf_counter() - before) / searches
+
+    before = time.perf_counter()
+    for name in names[:max(1, searches // 100)]:
+        store.search_prefix(name[:5])
+    prefix = (time.perf_counter() - before) / max(1, searches // 100)
+
+    sample = names[:max(1, searches // 100)]
+    before = time.perf_counter()
+    for name in sample:
+        linear_search(store, name)
+    linear = (time.perf_counter() - before) / len(sample)
+
+    print(f"{store_type.__name__:>20} {build * 1e3:8.1f} {exact * 1e6:8.2f} "
+          f"{casefold * 1e6:8.2f} {prefix * 1e6:8.2f} {linear * 1e6:10.1f}")
+
+
+def main(count: int, searches: int):
+    print(f"{count} members, {searches} searches")
+    print(f"{'store':>20} {'build':>8} {'exact':>8} {'casefold':>8} {'prefix':>8} {'linear':>10}")
+    print(f"{'':>20} {'(ms)':>8} {'(us)':>8} {'(us)':>8} {'(us)':>8} {'(us)':>10}")
+    for store_type in (MemberStore, LazyMemberStore, ColumnarMemberStore):
+        run(store_type, count, searches)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 200_000, int(args[1]) if len(args) > 1 else 10_000)
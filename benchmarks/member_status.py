@@ -0,0 +1,100 @@
+"""
+Benchmarks counting and listing the members of a large synthetic guild by status.
+
+A fifth of the members are given a presence, like the presences sent in a guild create. The
+status counters and buckets are compared against scanning every member, which is how
+:attr:`.Guild.presence_count` and :meth:`.Guild.members_with_status` used to work.
+
+Usage::
+
+    python benchmarks/member_status.py [members]
+
+"""
+import random
+import sys
+import time
+import types
+
+from curious.core import _current_client
+from curious.dataclasses.memberstore import ColumnarMemberStore, LazyMemberStore, MemberStore
+from curious.dataclasses.presence import Status
+from curious.dataclasses.user import User
+
+GUILD_ID = 1
+STATUSES = ["online"] * 6 + ["idle"] * 3 + ["dnd"]
+
+
+def member(i: int) -> dict:
+    user = {"id": str(100000000000000000 + i), "username": f"user{i}",
+            "discriminator": f"{i % 10000:04d}", "avatar": None, "bot": False}
+    return {"user": user, "roles": [], "joined_at": None, "nick": None, "deaf": False,
+            "mute": False}
+
+
+def fake_client():
+    users = {}
+
+    def make_user(data: dict):
+        user_id = int(data["id"])
+        if user_id not in users:
+            users[user_id] = User._from_payload(data)
+
+        return users[user_id]
+
+    state = types.SimpleNamespace(make_user=make_user, _users=users,
+                                  _check_decache_user=lambda id: None)
+    return types.SimpleNamespace(state=state, user=None, guilds={})
+
+
+def timed(func, repeat: int) -> float:
+    before = time.perf_counter()
+    for _ in range(repeat):
+        func()
+
+    return (time.perf_counter() - before) / repeat
+
+
+def run(store_type: type, count: int):
+    _current_client.set(fake_client())
+    store = store_type(GUILD_ID)
+    rng = random.Random(0)
+    before = time.perf_counter()
+    for i in range(count):
+        store.add_payload(member(i))
+        if rng.random() < 0.2:
+            store.set_presence(100000000000000000 + i, {"status": rng.choice(STATUSES)})
+
+    ingest = time.perf_counter() - before
+
+    def scan_count():
+        return sum(1 for member in store.values() if member.status is not Status.OFFLINE)
+
+    def scan_online():
+        for member in store.values():
+            if member.status is Status.ONLINE:
+                pass
+
+    def bucket_count():
+        return len(store) - store.status_count(Status.OFFLINE)
+
+    def bucket_online():
+        for _ in store.with_status(Status.ONLINE):
+            pass
+
+    assert scan_count() == bucket_count()
+    print(f"{store_type.__name__:>20} {ingest / count * 1e6:8.2f} "
+          f"{timed(scan_count, 3) * 1e3:10.2f} {timed(bucket_count, 1000) * 1e3:10.4f} "
+          f"{timed(scan_online, 3) * 1e3:10.2f} {timed(bucket_online, 3) * 1e3:10.2f}")
+
+
+def main(count: int):
+    print(f"{count} members")
+    print(f"{'store':>20} {'ingest':>8} {'scan':>10} {'counter':>10} {'scan':>10} {'bucket':>10}")
+    print(f"{'':>20} {'(us)':>8} {'count(ms)':>10} {'count(ms)':>10} "
+          f"{'online(ms)':>10} {'online(ms)':>10}")
+    for store_type in (MemberStore, LazyMemberStore, ColumnarMemberStore):
+        run(store_type, count)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,125 @@
+"""
+Benchmarks the member stores on a large synthetic guild.
+
+Members are added through member chunks, as they would be on startup, then looked up by ID and
+iterated over. For :class:`.LazyMemberStore`, the lookups are the first access to each member.
+Memory is the size of everything allocated by the store and the user cache, as measured by
+:mod:`tracemalloc`; the user cache alone is shown for comparison.
+
+Usage::
+
+    python benchmarks/member_store.py [members]
+
+"""
+import gc
+import sys
+import time
+import tracemalloc
+import types
+
+from curious.core import _current_client
+from curious.dataclasses.memberstore import ColumnarMemberStore, LazyMemberStore, MemberStore
+from curious.dataclasses.user import User
+
+TIMESTAMP = "2018-06-01T12:34:56.789000+00:00"
+GUILD_ID = 1
+# most members only have a handful of common role combinations
+ROLE_SETS = [[], [], [], ["11"], ["11", "12"], ["13"], ["11", "14", "15"]]
+
+
+def member(i: int) -> dict:
+    user = {"id": str(100000000000000000 + i), "username": f"user{i}",
+            "discriminator": f"{i % 10000:04d}", "avatar": "a" * 32, "bot": False}
+    return {"user": user, "roles": ROLE_SETS[i % len(ROLE_SETS)], "joined_at": TIMESTAMP,
+            "nick": f"nick{i}" if i % 10 == 0 else None, "deaf": False, "mute": False}
+
+
+def fake_client():
+    users = {}
+
+    def make_user(data: dict):
+        user_id = int(data["id"])
+        if user_id not in users:
+            users[user_id] = User._from_payload(data)
+
+        return users[user_id]
+
+    state = types.SimpleNamespace(make_user=make_user, _users=users,
+                                  _check_decache_user=lambda id: None)
+    return types.SimpleNamespace(state=state, user=None, guilds={})
+
+
+def ingest(store_type: type, chunks: list):
+    store = store_type(GUILD_ID)
+    for chunk in chunks:
+        for member_data in chunk:
+            store.add_payload(member_data)
+
+    return store
+
+
+def measure(store_type: type, count: int) -> int:
+    """
+    Measures the memory used by the store and user cache, per member.
+    """
+    _current_client.set(fake_client())
+    chunks = [[member(i) for i in range(start, min(start + 1000, count))]
+              for start in range(0, count, 1000)]
+    gc.collect()
+
+    tracemalloc.start()
+    # the store has to stay alive until it's been measured
+    store = None
+    if store_type is None:
+        # only the user cache, which every store shares
+        for chunk in chunks:
+            for member_data in chunk:
+                _current_client.get().state.make_user(member_data["user"])
+    else:
+        store = ingest(store_type, chunks)
+
+    # drop the payloads, which a real chunk handler wouldn't hold on to
+    del chunks
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+    return memory // count
+
+
+def run(store_type: type, count: int):
+    memory = measure(store_type, count)
+
+    _current_client.set(fake_client())
+    chunks = [[member(i) for i in range(start, min(start + 1000, count))]
+              for start in range(0, count, 1000)]
+    before = time.perf_counter()
+    store = ingest(store_type, chunks)
+    elapsed = time.perf_counter() - before
+
+    ids = list(store)
+    before = time.perf_counter()
+    for member_id in ids:
+        store[member_id]
+    lookup = time.perf_counter() - before
+
+    before = time.perf_counter()
+    for _ in store.values():
+        pass
+    iterate = time.perf_counter() - before
+
+    print(f"{store_type.__name__:>20} {elapsed / count * 1e6:8.2f} {memory:8} "
+          f"{lookup / count * 1e6:8.2f} {iterate / count * 1e6:8.2f}")
+
+
+def main(count: int):
+    print(f"{count} members, per member")
+    print(f"{'store':>20} {'ingest':>8} {'bytes':>8} {'lookup':>8} {'iterate':>8}")
+    print(f"{'':>20} {'(us)':>8} {'':>8} {'(us)':>8} {'(us)':>8}")
+    print(f"{'(users only)':>20} {'':>8} {measure(None, count):8}")
+    for store_type in (MemberStore, LazyMemberStore, ColumnarMemberStore):
+        run(store_type, count)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,165 @@
+# This file is part of curious.
+#
+# curious is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# curious is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with curious.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Utilities for limiting how many invocations of a command can run at once.
+
+.. currentmodule:: curious.commands.concurrency
+"""
+from collections import deque
+
+import anyio
+from typing import Callable, Deque, Dict, Tuple
+
+from curious.commands import Context
+from curious.commands.exc import CommandConcurrencyLimited
+from curious.commands.ratelimit import BucketNamer
+
+
+class _Bucket(object):
+    """
+    The state of a single concurrency bucket.
+    """
+    __slots__ = ("in_flight", "waiters")
+
+    def __init__(self):
+        self.in_flight = 0
+        self.waiters: Deque[anyio.Event] = deque()
+
+
+class ConcurrencyLimit(object):
+    """
+    Represents a concurrency limit for a command.
+
+    Up to ``limit`` invocations can run at once per bucket. Once a bucket is full, up to
+    ``max_queued`` further invocations wait for a slot in order, for up to ``wait`` seconds. Any
+    other invocations are rejected with a :class:`.CommandConcurrencyLimited`.
+    """
+
+    def __init__(self, *, limit: int, bucket_namer: Callable[[Context], str] = BucketNamer.GLOBAL,
+                 max_queued: int = 0, wait: float = None):
+        """
+        :param limit: The number of invocations that can run at once.
+        :param bucket_namer: A callable that gets the concurrency bucket name.
+        :param max_queued: The number of invocations that can wait for a slot, per bucket.
+        :param wait: The maximum time (in seconds) to wait for a slot, or None to wait forever.
+        """
+        if limit < 1:
+            raise ValueError("Limit must be at least 1")
+
+        self.limit = limit
+        self.bucket_namer = bucket_namer
+        self.max_queued = max_queued
+        self.wait = wait
+
+        #: The command function being used.
+        self.command = None
+
+        #: The number of invocations currently running, across all buckets.
+        self.in_flight = 0
+
+        #: The number of invocations currently waiting for a slot, across all buckets.
+        self.queued = 0
+
+        #: The number of invocations rejected so far.
+        self.rejected = 0
+
+        # buckets are removed once idle, so this only holds active buckets
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def __repr__(self) -> str:
+        return "<ConcurrencyLimit limit={} in_flight={} queued={}>".format(
+            self.limit, self.in_flight, self.queued
+        )
+
+    def get_counts(self, key: str) -> Tuple[int, int]:
+        """
+        Gets the number of running and waiting invocations for a bucket.
+
+        :param key: The bucket name.
+        :return: A two-item tuple of (in flight, queued).
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0, 0
+
+        return bucket.in_flight, len(bucket.waiters)
+
+    def _reject(self, ctx: Context, reason: str):
+        self.rejected += 1
+        raise CommandConcurrencyLimited(ctx, self.command, self, reason)
+
+    async def acquire(self, ctx: Context) -> str:
+        """
+        Acquires a slot for an invocation, waiting if needed.
+
+        :param ctx: The :class:`.Context` of the invocation.
+        :return: The bucket name, which must be passed to :meth:`.ConcurrencyLimit.release`.
+        """
+        key = self.bucket_namer(ctx)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+
+        if bucket.in_flight < self.limit and not bucket.waiters:
+            bucket.in_flight += 1
+            self.in_flight += 1
+            return key
+
+        if len(bucket.waiters) >= self.max_queued:
+            self._reject(ctx, "too many invocations are running")
+
+        event = anyio.create_event()
+        bucket.waiters.append(event)
+        self.queued += 1
+        try:
+            async with anyio.fail_after(self.wait):
+                await event.wait()
+        except BaseException as e:
+            if event.is_set():
+                # we were handed a slot just as we stopped waiting, so pass it on
+                await self.release(key)
+            else:
+                bucket.waiters.remove(event)
+                self._cleanup(key, bucket)
+
+            if isinstance(e, TimeoutError):
+                self._reject(ctx, "timed out waiting for other invocations to finish")
+
+            raise
+        finally:
+            self.queued -= 1
+
+        # the slot was handed over from the releasing invocation
+        return key
+
+    async def release(self, key: str) -> None:
+        """
+        Releases a slot, handing it to the next waiting invocation if there is one.
+
+        :param key: The bucket name returned from :meth:`.ConcurrencyLimit.acquire`.
+        """
+        bucket = self._buckets[key]
+        if bucket.waiters:
+            await bucket.waiters.popleft().set()
+            return
+
+        bucket.in_flight -= 1
+        self.in_flight -= 1
+        self._cleanup(key, bucket)
+
+    def _cleanup(self, key: str, bucket: _Bucket) -> None:
+        if bucket.in_flight == 0 and not bucket.waiters:
+            del self._buckets[key]
@@ -29,7 +29,7 @@ from curious.commands.converters import convert_channel, convert_float, convert_
 from curious.commands.exc import CommandInvokeError, CommandNotFound, CommandsError, \
     ConditionFailedError
 from curious.commands.plugin import Plugin
-from curious.commands.utils import _convert
+from curious.commands.utils import _tokenize, get_pipeline
 from curious.core import get_current_client
 from curious.core.event import EventContext
 from curious.dataclasses.channel import Channel
@@ -67,6 +67,7 @@ class Context(object):
         int: convert_int,
         float: convert_float,
     }
+    _converter_version = 0
 
     def __init__(self, message: Message, event_context: EventContext):
         """
@@ -82,11 +83,10 @@ class Context(object):
         #: The subcommand chain for this context.
         self.subcommand_chain: List[str] = []
 
-        #: The argument tokens for this context.
-        self.tokens = []  # type: List[str]
-
-        #: The full tokens for this context.
-        self.full_tokens: List[str] = []
+        # the unsplit argument content, tokenized on first use
+        self._raw_tokens: str = None
+        self._full_tokens: List[str] = []
+        self._tokens: List[str] = None
 
         #: The command object that has been matched.
         self.command_object: 'Callable[[Context, ...], Any]' = None
@@ -109,6 +109,46 @@ class Context(object):
         :param converter: The converter callable.
         """
         cls._converters[type_] = converter
+        # invalidate the converters cached by compiled commands
+        Context._converter_version += 1
+
+    @property
+    def full_tokens(self) -> List[str]:
+        """
+        :return: The full tokens for this context.
+        """
+        if self._raw_tokens is not None:
+            self._full_tokens = _tokenize(self._raw_tokens) if self._raw_tokens else []
+            self._raw_tokens = None
+
+        return self._full_tokens
+
+    @full_tokens.setter
+    def full_tokens(self, value: Union[str, List[str]]):
+        """
+        Sets the full tokens for this context. If this is a string, it will be tokenized the first
+        time the tokens are used.
+        """
+        if isinstance(value, str):
+            self._raw_tokens = value
+            self._full_tokens = []
+        else:
+            self._raw_tokens = None
+            self._full_tokens = value
+
+    @property
+    def tokens(self) -> List[str]:
+        """
+        :return: The argument tokens for this context.
+        """
+        if self._tokens is None:
+            return self.full_tokens
+
+        return self._tokens
+
+    @tokens.setter
+    def tokens(self, value: List[str]):
+        self._tokens = value
 
     @property
     def guild(self) -> Guild:
@@ -212,13 +252,23 @@ class Context(object):
         # 4) Convert the arguments.
         converted_args, converted_kwargs = await self._get_converted_args(command_callable)
 
-        # 5) Invoke the command.
+        # 5) Wait for a free slot, if the command limits its concurrency.
+        acquired = []
         try:
-            result = await self._run_command(command_callable, *converted_args, **converted_kwargs)
-        except Exception as e:
-            raise CommandInvokeError(self) from e
+            for limit in getattr(command_callable, "cmd_concurrency", []):
+                acquired.append((limit, await limit.acquire(self)))
+
+            # 6) Invoke the command.
+            try:
+                result = await self._run_command(command_callable, *converted_args,
+                                                 **converted_kwargs)
+            except Exception as e:
+                raise CommandInvokeError(self) from e
+        finally:
+            for limit, key in reversed(acquired):
+                await limit.release(key)
 
-        # 6) Process the result of the command, if available.
+        # 7) Process the result of the command, if available.
         await self._process_result(result)
 
     async def _process_result(self, result: Any):
@@ -256,19 +306,18 @@ class Context(object):
                 break
 
             token = self.tokens[0]
-            for command in current_command.cmd_subcommands:
-                if command.cmd_name == token or token in command.cmd_aliases:
-                    matched_command = command
-                    current_command = command
-                    # update tokens so that they're consumed
-                    self.tokens = self.tokens[1:]
-                    self.subcommand_chain.append(token)
-                    break
-            else:
+            command = self.manager.lookup_subcommand(current_command, token)
+            if command is None:
                 # we didnt match any subcommand
                 # so escape the loop now
                 break
 
+            matched_command = command
+            current_command = command
+            # update tokens so that they're consumed
+            self.tokens = self.tokens[1:]
+            self.subcommand_chain.append(token)
+
         # bind method, if appropriate
         if not hasattr(matched_command, "__self__") and self_ is not None:
             matched_command = types.MethodType(matched_command, self_)
@@ -280,7 +329,10 @@ class Context(object):
         Looks up a converter for the specified annotation.
         """
         origin = typing_inspect.get_origin(annotation)
-        if origin is not None:
+        if origin is list:
+            # newer pythons return the builtin type as the origin of generics
+            annotation = List
+        elif origin is not None:
             annotation = origin
 
         if annotation in self._converters:
@@ -300,7 +352,9 @@ class Context(object):
         Gets the converted args and kwargs for this command, based on the tokens.
         """
 
-        return await _convert(self, self.tokens, inspect.signature(func))
+        # bound methods have `self` before `ctx`
+        skip = 2 if inspect.ismethod(func) else 1
+        return get_pipeline(func).convert(self, self.tokens, skip=skip)
 
     def _make_reraise_ctx(self, new_name: str) -> EventContext:
         """
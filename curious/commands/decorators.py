@@ -23,8 +23,9 @@ import logging
 from typing import Any, List, Type
 
 from curious.commands import plugin as md_plugin
+from curious.commands.concurrency import ConcurrencyLimit
 from curious.commands.ratelimit import BucketNamer, CommandRateLimit
-from curious.commands.utils import get_description
+from curious.commands.utils import ConverterPipeline, get_description
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +73,8 @@ def command(*,
         set("cmd_hidden", hidden)
         set("cmd_conditions", [])
         set("cmd_ratelimits", [])
+        set("cmd_concurrency", [])
+        set("cmd_pipeline", ConverterPipeline(func))
 
         # annotate command object with any extra
         for ann_name, annotation in kwargs.items():
@@ -123,6 +126,39 @@ def ratelimit(*, limit: int, time: float, bucket_namer=BucketNamer.AUTHOR):
     return inner
 
 
+def concurrency(*, limit: int, bucket_namer=BucketNamer.GLOBAL, max_queued: int = 0,
+                wait: float = None):
+    """
+    Limits how many invocations of a command can run at once.
+
+    .. code-block:: python3
+
+        # one export per guild at a time, with up to 5 more waiting for up to a minute
+        @command()
+        @concurrency(limit=1, bucket_namer=BucketNamer.GUILD, max_queued=5, wait=60)
+        async def export(self, ctx):
+            ...
+
+    :param limit: The number of invocations that can run at once, per bucket.
+    :param bucket_namer: A callable that gets the concurrency bucket name.
+    :param max_queued: The number of invocations that can wait for a slot, per bucket. Any others \
+        are rejected.
+    :param wait: The maximum time (in seconds) to wait for a slot, or None to wait forever.
+    """
+
+    def inner(func):
+        if not hasattr(func, "cmd_concurrency"):
+            func.cmd_concurrency = []
+
+        cl = ConcurrencyLimit(limit=limit, bucket_namer=bucket_namer, max_queued=max_queued,
+                              wait=wait)
+        cl.command = func
+        func.cmd_concurrency.append(cl)
+        return func
+
+    return inner
+
+
 def _subcommand(parent):
     """
     Decorator factory set on a command to produce subcommands.
@@ -127,6 +127,24 @@ class CommandRateLimited(CommandsError):
     __str__ = __repr__
 
 
+class CommandConcurrencyLimited(CommandsError):
+    """
+    Raised when a command has too many invocations running to run another.
+    """
+    event_name = "command_concurrency_limited"
+
+    def __init__(self, context, func, limit, reason: str):
+        self.ctx = context
+        self.func = func
+        self.limit = limit
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return f"The command {self.ctx.command_name} cannot be ran right now: {self.reason}."
+
+    __str__ = __repr__
+
+
 class CommandNotFound(CommandsError):
     """
     Raised when a command is not found.
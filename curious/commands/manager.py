@@ -34,7 +34,7 @@ from curious.commands.exc import CommandsError
 from curious.commands.help import help_command
 from curious.commands.plugin import Plugin
 from curious.commands.ratelimit import RateLimiter
-from curious.commands.utils import prefix_check_factory
+from curious.commands.utils import ConverterPipeline, prefix_check_factory
 from curious.core import client as md_client
 from curious.core.event import EventContext, event
 from curious.dataclasses.message import Message
@@ -117,7 +117,8 @@ class CommandsManager(object):
             This should take two arguments, the client and message, and should return either None
             or a 2-item tuple:
               - The command word matched
-              - The tokens after the command word
+              - The tokens after the command word, or the unsplit content after the command
+                word, which will only be tokenized if a command matches
 
         :param command_prefix: The command prefix, if no message check is provided.
         """
@@ -140,8 +141,20 @@ class CommandsManager(object):
         self._plugin_command_cache = {}
 
         #: A dictionary of stand-alone commands, i.e. commands not associated with a plugin.
+        #: Use :meth:`.CommandsManager.add_command` and :meth:`.CommandsManager.remove_command`
+        #: to modify this, so that the command table stays in sync.
         self.commands = {}
 
+        #: The compiled mapping of <command name or alias> -> <command>, across standalone
+        #: commands and every plugin.
+        self._command_table = {}
+
+        #: A mapping of <command function> -> (<subcommand count>, <dict of subcommands>).
+        self._subcommand_tables = {}
+
+        #: A mapping of <event name> -> <tuple of plugin event handlers>.
+        self._event_handlers: Dict[str, tuple] = {}
+
         #: The context class for this context.
         self.context_class = context_klass
 
@@ -165,10 +178,11 @@ class CommandsManager(object):
         """
         self.client.events.add_event(self.handle_message)
         self.client.events.add_event(self.default_command_error)
-        self.client.events.add_event_hook(self.event_hook)
+        # the hook returns early for events without plugin handlers, so it's ran inline
+        self.client.events.add_event_hook(self.event_hook, inline=True)
 
         from curious.commands.decorators import command
-        self.commands["help"] = command(name="help")(help_command)
+        self.add_command(command(name="help")(help_command))
 
     async def load_plugin(self, klass: Type[Plugin], *args,
                           module: str = None):
@@ -214,6 +228,12 @@ class CommandsManager(object):
                 table[alias] = command
 
         self._plugin_command_cache[instance] = table
+        self._update_table(table)
+
+        handlers = inspect.getmembers(instance, predicate=lambda v: hasattr(v, "is_event"))
+        for _, handler in handlers:
+            for name in handler.events:
+                self._event_handlers[name] = self._event_handlers.get(name, ()) + (handler,)
 
         return instance
 
@@ -227,7 +247,7 @@ class CommandsManager(object):
         if isinstance(klass, str):
             plugin, scope = self.plugins.pop(klass)
         else:
-            for k, (s, p) in self.plugins.copy().items():
+            for k, (p, s) in self.plugins.copy().items():
                 if type(p) == klass:
                     plugin, scope = self.plugins.pop(k)
                     break
@@ -240,13 +260,21 @@ class CommandsManager(object):
 
         if plugin is not None:
             await plugin.plugin_unload()
-            self._plugin_command_cache.pop(getattr(plugin, "plugin_name", type(plugin).__name__))
+            table = self._plugin_command_cache.pop(plugin, {})
+            self._update_table(table)
+
+            for name, handlers in list(self._event_handlers.items()):
+                handlers = tuple(h for h in handlers if getattr(h, "__self__", None) is not plugin)
+                if handlers:
+                    self._event_handlers[name] = handlers
+                else:
+                    del self._event_handlers[name]
 
         return plugin
 
-    def lookup_command(self, name: str):
+    def _resolve_command(self, name: str):
         """
-        Does a lookup in plugin and standalone commands.
+        Resolves a command name by checking every command source in order of precedence.
         """
         if name in self.commands:
             return self.commands[name]
@@ -255,6 +283,92 @@ class CommandsManager(object):
             if name in commands:
                 return commands[name]
 
+    def _update_table(self, names: Iterable[str]) -> None:
+        """
+        Re-resolves the specified names in the command table, after a command source changes.
+        """
+        replaced = []
+        for name in names:
+            old_command = self._command_table.get(name)
+            if old_command is not None:
+                replaced.append(old_command)
+
+            command = self._resolve_command(name)
+            if command is None:
+                self._command_table.pop(name, None)
+            else:
+                self._command_table[name] = command
+                self._compile_subcommands(command)
+
+        if replaced:
+            live = {getattr(command, "__func__", command)
+                    for command in self._command_table.values()}
+            for command in replaced:
+                self._prune_subcommands(command, live)
+
+    def _prune_subcommands(self, command, live: set) -> None:
+        """
+        Removes the subcommand tables of a command that has left the command table, and of all of
+        its subcommands.
+
+        :param live: The functions of every command still in the command table.
+        """
+        func = getattr(command, "__func__", command)
+        # the command might still be in the table under another name
+        if func in live or self._subcommand_tables.pop(func, None) is None:
+            return
+
+        for subcommand in getattr(func, "cmd_subcommands", []):
+            self._prune_subcommands(subcommand, live)
+
+    def _compile_subcommands(self, command) -> dict:
+        """
+        Compiles the subcommands of a command, and all of its subcommands, into lookup tables.
+        The argument converters of each command are compiled too.
+        """
+        func = getattr(command, "__func__", command)
+        subcommands = getattr(func, "cmd_subcommands", [])
+        # recompile the arguments too, in case this is a reloaded command
+        func.cmd_pipeline = ConverterPipeline(func)
+
+        table = {}
+        for subcommand in subcommands:
+            # earlier subcommands take precedence, as with a linear scan
+            table.setdefault(subcommand.cmd_name, subcommand)
+            for alias in subcommand.cmd_aliases:
+                table.setdefault(alias, subcommand)
+
+            self._compile_subcommands(subcommand)
+
+        self._subcommand_tables[func] = (len(subcommands), table)
+        return table
+
+    def lookup_command(self, name: str):
+        """
+        Does a lookup in plugin and standalone commands.
+        """
+        return self._command_table.get(name)
+
+    def lookup_subcommand(self, command, name: str):
+        """
+        Looks up a direct subcommand of a command.
+
+        :param command: The parent command.
+        :param name: The name or alias of the subcommand.
+        :return: The subcommand function, or None if no subcommand matched.
+        """
+        func = getattr(command, "__func__", command)
+        try:
+            count, table = self._subcommand_tables[func]
+        except KeyError:
+            table = self._compile_subcommands(func)
+        else:
+            # subcommands can be added after the parent was registered
+            if count != len(func.cmd_subcommands):
+                table = self._compile_subcommands(func)
+
+        return table.get(name)
+
     def get_command(self, command_name: str):
         """
         Gets a command from the internal command storage.
@@ -270,11 +384,8 @@ class CommandsManager(object):
             return None
 
         for token in sp[1:]:
-            try:
-                filtered = filter(lambda cmd: cmd.cmd_name == token or token in cmd.cmd_aliases,
-                                  command.cmd_subcommands)
-                command = next(filtered)
-            except StopIteration:
+            command = self.lookup_subcommand(command, token)
+            if command is None:
                 return None
 
         return command
@@ -288,10 +399,11 @@ class CommandsManager(object):
         if not hasattr(command, "is_cmd"):
             raise ValueError("Commands must be decorated with the command decorator")
 
-        self.commands[command.cmd_name] = command
-        for alias in command.cmd_aliases:
-            self.commands[alias] = command
+        names = [command.cmd_name, *command.cmd_aliases]
+        for name in names:
+            self.commands[name] = command
 
+        self._update_table(names)
         return command
 
     def remove_command(self, command):
@@ -301,11 +413,15 @@ class CommandsManager(object):
         :param command: The name of the command, or the command function.
         """
         if isinstance(command, str):
-            return self.commands.pop(command)
+            removed = self.commands.pop(command)
+            self._update_table([command])
+            return removed
         else:
             for k, p in self.commands.copy().items():
                 if p == command:
-                    return self.commands.pop(k)
+                    removed = self.commands.pop(k)
+                    self._update_table([k])
+                    return removed
 
     async def load_plugins_from(self, import_path: str):
         """
@@ -348,9 +464,8 @@ class CommandsManager(object):
             module = import_path
 
         for plugin in self._module_plugins[module]:
-            await plugin.plugin_unload()
             name = getattr(plugin, "plugin_name", type(plugin).__name__)
-            self.plugins.pop(name)
+            await self.unload_plugin(name)
 
         del sys.modules[import_path]
         del self._module_plugins[module]
@@ -358,19 +473,34 @@ class CommandsManager(object):
     async def event_hook(self, ctx: EventContext, *args, **kwargs):
         """
         The event hook for the commands manager.
+
+        This is ran inline, so plugin handlers are spawned unless they are inline themselves.
         """
-        async with anyio.create_task_group() as tg:
-            tg: anyio.TaskGroup
-            for plugin in self.plugins.values():
-                body = inspect.getmembers(plugin, predicate=lambda v: hasattr(v, "is_event"))
-                for _, handler in body:
-                    if ctx.event_name not in handler.events:
-                        continue
+        handlers = self._event_handlers.get(ctx.event_name)
+        if not handlers:
+            return
+
+        events = self.client.events
+        wrapper = events._safety_wrapper
+        if not events.is_inline(self.event_hook):
+            # we're already running in our own task
+            if len(handlers) == 1:
+                return await wrapper(handlers[0], ctx, *args, **kwargs)
 
-                    cofunc = partial(self.client.events._safety_wrapper,
-                                     handler, ctx, *args, **kwargs)
+            async with anyio.create_task_group() as tg:
+                tg: anyio.TaskGroup
+                for handler in handlers:
+                    await tg.spawn(partial(wrapper, handler, ctx, *args, **kwargs))
+
+            return
 
-                    await tg.spawn(cofunc)
+        for handler in handlers:
+            if getattr(handler, "inline", False):
+                events.stats.inline_calls += 1
+                await wrapper(handler, ctx, *args, **kwargs)
+            else:
+                await events.spawn_handler(ctx.event_name,
+                                           partial(wrapper, handler, ctx, *args, **kwargs))
 
     async def handle_commands(self, ctx: EventContext, message: Message):
         """
@@ -408,7 +538,6 @@ class CommandsManager(object):
         ctx = self.context_class(event_context=ctx, message=message)
         ctx.root_command_name = command_word
         ctx.full_tokens = tokens
-        ctx.tokens = ctx.full_tokens
         ctx.manager = self
 
         # step 3, invoke the context to try and match the command and run it
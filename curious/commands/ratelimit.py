@@ -1,8 +1,13 @@
 """
 Utilities for ratelimiting a command.
 """
+import abc
+import anyio
+import sqlite3
+import threading
 import time
-from typing import Any, Callable, List, Tuple
+from collections import defaultdict
+from typing import Callable, Dict, List, Set, Tuple
 
 from curious.commands import Context
 from curious.commands.exc import CommandRateLimited
@@ -57,6 +62,9 @@ class CommandRateLimit(object):
         :param time: The time (in seconds) this ratelimit lasts.
         :param bucket_namer: A callable that gets the ratelimit bucket name.
         """
+        if limit < 1:
+            raise ValueError("Limit must be at least 1")
+
         self.limit = limit
         self.time = time
         self.bucket_namer = bucket_namer
@@ -64,6 +72,21 @@ class CommandRateLimit(object):
         #: The command function being used.
         self.command = None
 
+    @property
+    def interval(self) -> float:
+        """
+        :return: The time (in seconds) one use takes to regenerate.
+        """
+        return self.time / self.limit
+
+    @property
+    def tolerance(self) -> float:
+        """
+        :return: How far (in seconds) a bucket can run ahead of the current time, which allows \
+            bursts of up to ``limit`` uses.
+        """
+        return self.time - self.interval
+
     def get_full_bucket_key(self, ctx: Context) -> Tuple[str, str]:
         """
         Gets the full bucket key for this ratelimit.
@@ -71,32 +94,218 @@ class CommandRateLimit(object):
         return self.command.cmd_name, self.bucket_namer(ctx)
 
 
-class RateLimiter(object):
+class RateLimitBackend(metaclass=abc.ABCMeta):
     """
-    Represents a ratelimiter. This ensures that commands meet the ratelimit before being ran.
+    The base class for a ratelimit storage backend.
+
+    Backends store one value per bucket, the bucket's theoretical arrival time (TAT), as used by
+    the generic cell rate algorithm. A bucket whose TAT has passed is the same as an empty bucket,
+    so it can be dropped, which keeps storage bounded by the number of recently used buckets.
     """
 
-    def __init__(self):
-        self._ratelimit_buckets = {}
+    @abc.abstractmethod
+    async def hit(self, key: str, interval: float, tolerance: float) -> float:
+        """
+        Atomically records a use of a bucket, unless it is ratelimited.
 
-    async def update_bucket(self, key: Any, current_uses: int, expiration: float):
+        :param key: The key of the bucket.
+        :param interval: The time one use takes to regenerate.
+        :param tolerance: How far the bucket may run ahead of the current time.
+        :return: 0 if the use was allowed, otherwise the time (in seconds) until it would be.
         """
-        Updates a ratelimit bucket.
 
-        :param key: The ratelimit key to use.
-        :param current_uses: The current uses for the key.
-        :param expiration: When the ratelimit expires.
+    @abc.abstractmethod
+    async def sweep(self) -> int:
+        """
+        Removes every expired bucket.
+
+        :return: The number of buckets removed.
+        """
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    A ratelimit backend that stores buckets in memory. This is the default backend.
+
+    Expired buckets are removed with a timer wheel. When a bucket is used, it's scheduled into the
+    slot after its expiry, and slots are swept as time passes them.
+    """
+
+    def __init__(self, *, resolution: float = 1.0):
+        """
+        :param resolution: The width (in seconds) of each slot in the timer wheel.
         """
-        self._ratelimit_buckets[key] = (current_uses, expiration)
+        if resolution <= 0:
+            raise ValueError("Resolution must be positive")
+
+        self.resolution = resolution
+
+        #: A dictionary of <bucket key> -> <theoretical arrival time>.
+        self._buckets: Dict[str, float] = {}
 
-    async def get_bucket(self, key: Any) -> Tuple[int, float]:
+        #: A dictionary of <slot> -> <set of bucket keys that may expire in that slot>.
+        self._wheel: Dict[int, Set[str]] = defaultdict(set)
+        self._swept = int(time.monotonic() // resolution)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def __repr__(self) -> str:
+        return "<MemoryRateLimitBackend buckets={}>".format(len(self._buckets))
+
+    def _sweep(self, now: float) -> int:
+        """
+        Sweeps every slot in the timer wheel that has passed.
         """
-        Gets the ratelimit bucket for the specified key.
+        current = int(now // self.resolution)
+        if current <= self._swept:
+            return 0
 
-        :param key: The key to use.
-        :return: A two-item tuple of (uses, expiration), or None if no bucket was found.
+        # after a long idle period, it's cheaper to check the slots we have
+        if current - self._swept > len(self._wheel):
+            slots = [slot for slot in self._wheel if slot <= current]
+        else:
+            slots = range(self._swept + 1, current + 1)
+
+        self._swept = current
+        removed = 0
+        for slot in slots:
+            for key in self._wheel.pop(slot, ()):
+                # the bucket may have been used again, and scheduled into a later slot
+                tat = self._buckets.get(key)
+                if tat is not None and tat <= now:
+                    del self._buckets[key]
+                    removed += 1
+
+        return removed
+
+    async def hit(self, key: str, interval: float, tolerance: float) -> float:
+        now = time.monotonic()
+        self._sweep(now)
+
+        tat = max(self._buckets.get(key, now), now)
+        if tat - now > tolerance:
+            return tat - now - tolerance
+
+        tat += interval
+        self._buckets[key] = tat
+        self._wheel[int(tat // self.resolution) + 1].add(key)
+        return 0.0
+
+    async def sweep(self) -> int:
+        return self._sweep(time.monotonic())
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    A ratelimit backend that stores buckets in a SQLite database, so that ratelimits can be shared
+    between multiple processes on the same machine, such as the processes of a sharded bot.
+
+    .. code-block:: python3
+
+        manager.ratelimiter = RateLimiter(SQLiteRateLimitBackend("/tmp/ratelimits.db"))
+
+    Queries are ran in a thread. Expired buckets are deleted every ``sweep_interval`` seconds.
+    """
+
+    def __init__(self, path: str, *, sweep_interval: float = 60.0):
+        """
+        :param path: The path to the database file. It will be created if it doesn't exist.
+        :param sweep_interval: The time (in seconds) between deleting expired buckets.
+        """
+        self.path = path
+        self.sweep_interval = sweep_interval
+
+        self._connection: sqlite3.Connection = None
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def __repr__(self) -> str:
+        return "<SQLiteRateLimitBackend path={!r}>".format(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens the database, creating the table if needed.
+        """
+        if self._connection is None:
+            # transactions are managed manually, to lock the database across the read and write
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS ratelimits "
+                               "(key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+            self._connection = connection
+
+        return self._connection
+
+    def _run(self, fn, *args):
+        """
+        Runs a function inside a write transaction.
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(connection, *args)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+            connection.execute("COMMIT")
+            return result
+
+    def _sweep(self, connection: sqlite3.Connection, now: float) -> int:
+        self._next_sweep = now + self.sweep_interval
+        return connection.execute("DELETE FROM ratelimits WHERE tat <= ?", (now,)).rowcount
+
+    def _hit(self, connection: sqlite3.Connection, key: str, interval: float,
+             tolerance: float) -> float:
+        # wall clock time is used, as it's the same in every process
+        now = time.time()
+        if now >= self._next_sweep:
+            self._sweep(connection, now)
+
+        row = connection.execute("SELECT tat FROM ratelimits WHERE key = ?", (key,)).fetchone()
+        tat = max(row[0], now) if row is not None else now
+        if tat - now > tolerance:
+            return tat - now - tolerance
+
+        connection.execute("INSERT OR REPLACE INTO ratelimits (key, tat) VALUES (?, ?)",
+                           (key, tat + interval))
+        return 0.0
+
+    async def hit(self, key: str, interval: float, tolerance: float) -> float:
+        return await anyio.run_in_thread(self._run, self._hit, key, interval, tolerance)
+
+    async def sweep(self) -> int:
+        return await anyio.run_in_thread(self._run, lambda c: self._sweep(c, time.time()))
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class RateLimiter(object):
+    """
+    Represents a ratelimiter. This ensures that commands meet the ratelimit before being ran.
+
+    Ratelimits use the generic cell rate algorithm. A bucket allows a burst of up to ``limit``
+    uses, after which one use regenerates every ``time / limit`` seconds. Unlike a fixed window,
+    this never allows two bursts back to back at the edge of a window.
+    """
+
+    def __init__(self, backend: RateLimitBackend = None):
+        """
+        :param backend: The :class:`.RateLimitBackend` to store buckets in. Defaults to a \
+            :class:`.MemoryRateLimitBackend`.
         """
-        return self._ratelimit_buckets.get(key)
+        #: The backend that buckets are stored in.
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
 
     async def ensure_ratelimits(self, ctx: Context, cmd):
         """
@@ -104,20 +313,8 @@ class RateLimiter(object):
         """
         ratelimits: List[CommandRateLimit] = cmd.cmd_ratelimits
         for limit in ratelimits:
-            bucket_key = limit.get_full_bucket_key(ctx)
-            bucket = await self.get_bucket(key=bucket_key)
-            if not bucket:
-                await self.update_bucket(bucket_key, 1, time.monotonic() + limit.time)
-                continue
-
-            # check if we've hit the limit
-            if bucket[0] == limit.limit:
-                # we have, but that might be okay if the timer has expired
-                if time.monotonic() > bucket[1]:
-                    # we're good, so we can just reset the bucket and continue on our way
-                    await self.update_bucket(bucket_key, 1, time.monotonic() + limit.time)
-                else:
-                    raise CommandRateLimited(ctx, cmd, limit, bucket)
-            else:
-                # we haven't, but we need to up the number anyway
-                await self.update_bucket(bucket_key, bucket[0] + 1, bucket[1])
+            key = "{}:{}".format(*limit.get_full_bucket_key(ctx))
+            retry_after = await self.backend.hit(key, limit.interval, limit.tolerance)
+            if retry_after > 0:
+                bucket = (limit.limit, time.monotonic() + retry_after)
+                raise CommandRateLimited(ctx, cmd, limit, bucket)
@@ -17,10 +17,10 @@ Misc utilities used in commands related things.
 
 .. currentmodule:: curious.commands.utils
 """
-import collections
+import collections.abc
 import inspect
 import typing_inspect
-from typing import Callable, Iterable, List, Union
+from typing import Callable, Iterable, List, Tuple, Union
 
 from curious.commands.exc import ConversionFailedError, MissingArgumentError
 from curious.core.client import Client
@@ -46,122 +46,147 @@ def get_full_name(func) -> str:
     return ' '.join(reversed(name))
 
 
-async def _convert(ctx, tokens: List[str], signature: inspect.Signature):
+class ConverterPipeline(object):
     """
-    Converts tokens passed from discord, using a signature.
+    A command's signature, compiled into the steps needed to convert tokens into arguments.
+
+    Pipelines are compiled once per command, so invoking a command doesn't need to inspect its
+    signature. Converters are looked up once per context class, and again after
+    :meth:`.Context.add_converter` is called.
     """
-    final_args = []
-    final_kwargs = {}
+    POSITIONAL = 0
+    KEYWORD_ONLY = 1
+    VAR_POSITIONAL = 2
+
+    _kinds = {
+        inspect.Parameter.POSITIONAL_ONLY: POSITIONAL,
+        inspect.Parameter.POSITIONAL_OR_KEYWORD: POSITIONAL,
+        inspect.Parameter.KEYWORD_ONLY: KEYWORD_ONLY,
+        inspect.Parameter.VAR_POSITIONAL: VAR_POSITIONAL,
+    }
+
+    def __init__(self, func):
+        """
+        :param func: The plain command function to compile. This should not be a bound method.
+        """
+        self.func = func
+
+        #: The list of (kind, name, annotation, default) steps, one per parameter.
+        self.steps = []
+
+        for param in inspect.signature(func).parameters.values():
+            try:
+                kind = self._kinds[param.kind]
+            except KeyError:
+                # **kwargs are never filled
+                continue
+
+            self.steps.append((kind, param.name, param.annotation, param.default))
+
+        self._converters = {}
+
+    def __repr__(self) -> str:
+        return "<ConverterPipeline func={} steps={}>".format(self.func.__name__, len(self.steps))
 
-    def _with_reraise(func, ann, ctx, arg):
+    def _get_converters(self, ctx) -> list:
+        """
+        Gets the converter for each step, for the class of the specified context.
+        """
+        version = ctx._converter_version
         try:
-            return func(ann, ctx, arg)
+            cached_version, converters = self._converters[type(ctx)]
+        except KeyError:
+            pass
+        else:
+            if cached_version == version:
+                return converters
+
+        converters = [ctx._lookup_converter(annotation) for _, _, annotation, _ in self.steps]
+        self._converters[type(ctx)] = (version, converters)
+        return converters
+
+    @staticmethod
+    def _convert(converter, annotation, ctx, arg: str):
+        """
+        Runs a single converter.
+        """
+        try:
+            return converter(annotation, ctx, arg)
         except ConversionFailedError:
             raise
         except Exception as e:
-            raise ConversionFailedError(ctx, arg, ann, message="Converter error") from e
-
-    args_it = iter(tokens)
-    for n, (name, param) in enumerate(signature.parameters.items()):
-        if n == 0:
-            # Don't convert the `ctx` argument.
-            continue
+            raise ConversionFailedError(ctx, arg, annotation, message="Converter error") from e
+
+    def convert(self, ctx, tokens: List[str], skip: int = 1) -> Tuple[list, dict]:
+        """
+        Converts tokens into the arguments for this command.
+
+        :param ctx: The :class:`.Context` to convert with.
+        :param tokens: The tokens to convert.
+        :param skip: The number of leading parameters to skip. This is 1 for the ``ctx`` \
+            argument, or 2 for a method, which also has ``self``.
+        :return: A 2-tuple of the positional arguments and the keyword arguments.
+        """
+        final_args = []
+        final_kwargs = {}
+
+        args_it = iter(tokens)
+        converters = self._get_converters(ctx)
+        for step in range(skip, len(self.steps)):
+            kind, name, annotation, default = self.steps[step]
+            converter = converters[step]
+
+            if kind == self.POSITIONAL:
+                # skip over any empty tokens, from repeated delimiters
+                arg = next(args_it, None)
+                while arg == "":
+                    arg = next(args_it, None)
 
-        assert isinstance(param, inspect.Parameter)
-        # We loop over the signature parameters because it's easier to use those to consume.
-        # Get the next argument from args.
-
-        def consume_token() -> str:
-            try:
-                return next(args_it)
-            except StopIteration as e:
-                # not good!
-                # If we're a *arg format, we can safely handle this, or if we have a default.
-                if param.kind in [inspect.Parameter.KEYWORD_ONLY,
-                                  inspect.Parameter.VAR_POSITIONAL]:
-                    return None
-
-                if param.default == inspect.Parameter.empty:
-                    raise MissingArgumentError(ctx, param.name) from e
-
-                return None  # ??
-
-        # Begin the consumption!
-        if param.kind in [inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                          inspect.Parameter.POSITIONAL_ONLY]:
-            # ensure we have a non-empty argument
-            arg = consume_token()
-            if arg is None:
-                break
-
-            while arg == "":
                 if arg is None:
-                    break
+                    if default is inspect.Parameter.empty:
+                        raise MissingArgumentError(ctx, name)
 
-                arg = next(args_it)
-
-            arg = replace_quotes(arg)
-            converter = ctx._lookup_converter(param.annotation)
-            final_args.append(_with_reraise(converter, param.annotation, ctx, arg))
-            continue
-
-        if param.kind in [inspect.Parameter.KEYWORD_ONLY]:
-            # Only add it to final_kwargs.
-            # This is a consume all operation, so we eat all of the arguments.
-            f = []
-
-            while True:
-                next_arg = consume_token()
-                if next_arg is None:
+                    # the rest of the arguments will use their defaults
                     break
 
-                f.append(next_arg)
+                final_args.append(self._convert(converter, annotation, ctx, replace_quotes(arg)))
+                continue
 
-            if not f:
-                if param.default is inspect.Parameter.empty:
-                    raise MissingArgumentError(ctx, param.name)
-                else:
-                    final_kwargs[param.name] = param.default
-            else:
-                converter = ctx._lookup_converter(param.annotation)
-                if len(f) == 1:
-                    final_kwargs[param.name] = _with_reraise(converter, param.annotation, ctx,
-                                                             f[0])
+            # the remaining kinds are consume all operations, so we eat all of the arguments
+            rest = list(args_it)
+            if kind == self.KEYWORD_ONLY:
+                if not rest:
+                    if default is inspect.Parameter.empty:
+                        raise MissingArgumentError(ctx, name)
+
+                    final_kwargs[name] = default
                 else:
-                    final_kwargs[param.name] = _with_reraise(converter, param.annotation, ctx,
-                                                             " ".join(f))
-            continue
+                    arg = rest[0] if len(rest) == 1 else " ".join(rest)
+                    final_kwargs[name] = self._convert(converter, annotation, ctx, arg)
 
-        if param.kind in [inspect.Parameter.VAR_POSITIONAL]:
-            # This *shouldn't* be called on `*` arguments, but we can't be sure.
-            # Special case - consume ALL the arguments.
-            f = []
+            elif kind == self.VAR_POSITIONAL:
+                # *args always needs at least one argument
+                if not rest:
+                    raise MissingArgumentError(ctx, name)
 
-            while True:
-                next_arg = consume_token()
-                if next_arg is None:
-                    break
+                final_args += [self._convert(converter, annotation, ctx, item) for item in rest]
 
-                f.append(next_arg)
+        return final_args, final_kwargs
 
-            if not f:
-                if param.default is inspect.Parameter.empty:
-                    raise MissingArgumentError(ctx, param.name)
-                else:
-                    final_kwargs[param.name] = param.default
-            else:
-                converter = ctx._lookup_converter(param.annotation)
-                results = []
-                for item in f:
-                    results.append(_with_reraise(converter, param.annotation, ctx, item))
 
-                final_args += results
+def get_pipeline(func) -> ConverterPipeline:
+    """
+    Gets the :class:`.ConverterPipeline` for a command, compiling it if needed.
 
-        if param.kind in [inspect.Parameter.VAR_KEYWORD]:
-            # no
-            continue
+    :param func: The command function, or a method bound to it.
+    """
+    func = getattr(func, "__func__", func)
+    pipeline = getattr(func, "cmd_pipeline", None)
+    if pipeline is None:
+        pipeline = ConverterPipeline(func)
+        func.cmd_pipeline = pipeline
 
-    return final_args, final_kwargs
+    return pipeline
 
 
 def get_description(func) -> str:
@@ -239,11 +264,6 @@ def get_usage(func, invoked_as: str = None) -> str:
     return " ".join(final)
 
 
-# This function is a modified version of the code taken from https://stackoverflow.com/a/43035638.
-# This function is licenced under the MIT Licence. (C) 2017 THE_MAD_KING.
-# See: https://meta.stackexchange.com/questions/272956/a-new-code-license-the-mit-this-time-with
-# -attribution-required
-# You can find a copy of the MIT Licence at https://opensource.org/licenses/MIT.
 def split_message_content(content: str, delim: str = " ") -> List[str]:
     """
     Splits a message into individual parts by `delim`, returning a list of strings.
@@ -258,28 +278,110 @@ def split_message_content(content: str, delim: str = " ") -> List[str]:
     :param delim: The delimiter to split on.
     :return: A list of items split
     """
+    return _tokenize(content.strip(), delim)
 
-    tokens = []
-    cur = ''
-    in_quotes = False
-
-    for char in content.strip():
-        if char == delim and not in_quotes:
-            tokens.append(cur)
-            cur = ''
-        elif char == '"' and not in_quotes:
-            in_quotes = True
-            cur += char
-        elif char == '"' and in_quotes:
-            in_quotes = False
-            cur += char
+
+def _tokenize(content: str, delim: str = " ") -> List[str]:
+    """
+    Splits already stripped content by ``delim``, outside of quotes.
+
+    Every quote toggles quoting, so the text between the (2n)th and (2n+1)th quote is quoted.
+    Splitting on the quotes first means each run is handled by :meth:`str.split`, rather than
+    building tokens one character at a time.
+    """
+    if len(delim) != 1:
+        # a multi-character delimiter never matches a single character
+        return [content]
+
+    if delim == '"':
+        # delimiters are checked before quotes, so quoting never starts
+        return content.split(delim)
+
+    tokens = [""]
+    for n, part in enumerate(content.split('"')):
+        if n:
+            tokens[-1] += '"'
+
+        if n % 2:
+            tokens[-1] += part
         else:
-            cur += char
-    tokens.append(cur)
+            pieces = part.split(delim)
+            tokens[-1] += pieces[0]
+            tokens += pieces[1:]
 
     return tokens
 
 
+def split_command_word(content: str, delim: str = " ") -> Tuple[str, str]:
+    """
+    Splits the command word from the rest of a message, without tokenizing the arguments.
+
+    The command word is the same as the first token from :func:`.split_message_content`, and
+    ``_tokenize(rest)`` gives the same tokens as the rest of :func:`.split_message_content`.
+
+    :param content: The message content, without a prefix.
+    :param delim: The delimiter to split on. Must be a single character other than a quote.
+    :return: A 2-tuple of the command word, and the unsplit content after it.
+    """
+    content = content.strip()
+    position = 0
+    while True:
+        index = content.find(delim, position)
+        quote = content.find('"', position)
+        if index == -1:
+            return content, ""
+
+        if quote == -1 or index < quote:
+            return content[:index], content[index + 1:]
+
+        # skip over the quoted part, as delimiters inside it don't count
+        position = content.find('"', quote + 1) + 1
+        if position == 0:
+            return content, ""
+
+
+def _compile_prefixes(prefixes: Iterable[str]) -> dict:
+    """
+    Compiles a list of prefixes into a character trie.
+
+    Each node is a dict of <character> -> <node>, with the ``None`` key holding the position of
+    the prefix that ends at that node, if any.
+    """
+    root = {}
+    for position, prefix in enumerate(prefixes):
+        node = root
+        for char in prefix:
+            node = node.setdefault(char, {})
+
+        node.setdefault(None, position)
+
+    return root
+
+
+def _match_prefix(trie: dict, prefixes: List[str], content: str) -> Union[str, None]:
+    """
+    Matches the start of some content against a compiled prefix trie.
+
+    If several prefixes match, the one that came first in the original list is returned, as
+    with checking each prefix in turn.
+    """
+    node = trie
+    best = node.get(None)
+    for char in content:
+        node = node.get(char)
+        if node is None:
+            break
+
+        position = node.get(None)
+        if position is not None and (best is None or position < best):
+            best = position
+
+    if best is None:
+        return None
+
+    return prefixes[best]
+
+
 def prefix_check_factory(prefix: Union[str, Iterable[str], Callable[[Client, Message], str]]):
     """
     The default message function factory.
@@ -306,6 +408,13 @@ def prefix_check_factory(prefix: Union[str, Iterable[str], Callable[[Client, Mes
         to use.
     :return: A callable that can be used for the ``message_check`` function on the client.
     """
+    # static prefixes are compiled once, so that matching doesn't depend on the prefix count
+    # dynamic prefixes are checked one by one, as they may change between messages
+    trie = None
+    prefixes = None
+    if not callable(prefix) and not isinstance(prefix, str):
+        prefixes = list(prefix)
+        trie = _compile_prefixes(prefixes)
 
     async def __inner(bot: Client, message: Message):
         # move prefix out of global scope
@@ -317,12 +426,15 @@ def prefix_check_factory(prefix: Union[str, Iterable[str], Callable[[Client, Mes
             if inspect.isawaitable(_prefix):
                 _prefix = await _prefix
 
-        if isinstance(_prefix, str):
+        if _prefix is prefix and trie is not None:
+            matched = _match_prefix(trie, prefixes, message.content)
+
+        elif isinstance(_prefix, str):
             match = message.content.startswith(_prefix)
             if match:
                 matched = _prefix
 
-        elif isinstance(prefix, collections.Iterable):
+        elif isinstance(_prefix, collections.abc.Iterable):
             for i in _prefix:
                 if message.content.startswith(i):
                     matched = i
@@ -331,10 +443,8 @@ def prefix_check_factory(prefix: Union[str, Iterable[str], Callable[[Client, Mes
         if not matched:
             return None
 
-        tokens = split_message_content(message.content[len(matched):])
-        command_word = tokens[0]
-
-        return command_word, tokens[1:]
+        # the arguments are only tokenized once a command has matched
+        return split_command_word(message.content[len(matched):])
 
     __inner.prefix = prefix
     return __inner
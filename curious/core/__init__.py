@@ -24,10 +24,13 @@ delegating it to client code.
 .. autosummary::
     :toctree: core
     
+    bulk
     client
     event
+    export
     gateway
     httpclient
+    outbound
     state
 """
 import contextvars
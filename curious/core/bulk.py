@@ -0,0 +1,347 @@
+# This file is part of curious.
+#
+# curious is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# curious is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with curious.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Bulk moderation executors, for running large batches of role edits, bans and kicks.
+
+.. currentmodule:: curious.core.bulk
+"""
+import anyio
+import enum
+import inspect
+import logging
+import typing
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+if typing.TYPE_CHECKING:
+    from curious.core.httpclient import HTTPClient
+
+logger = logging.getLogger("curious.bulk")
+
+
+class BulkAction(enum.Enum):
+    """
+    Represents the type of a :class:`.BulkOperation`.
+    """
+    #: Adds a role to a member.
+    ADD_ROLE = "add_role"
+
+    #: Removes a role from a member.
+    REMOVE_ROLE = "remove_role"
+
+    #: Kicks a member from the guild.
+    KICK = "kick"
+
+    #: Bans a user from the guild.
+    BAN = "ban"
+
+    #: Unbans a user from the guild.
+    UNBAN = "unban"
+
+
+class BulkOperation(object):
+    """
+    Represents a single operation inside a bulk batch.
+
+    Operations are identified by their :attr:`.BulkOperation.key`, which is stable across runs and
+    can be persisted in order to resume a batch later.
+    """
+
+    __slots__ = "action", "target_id", "role_id", "delete_message_days", "reason"
+
+    def __init__(self, action: BulkAction, target_id: int, *,
+                 role_id: int = None, delete_message_days: int = 0, reason: str = None):
+        """
+        :param action: The :class:`.BulkAction` to perform.
+        :param target_id: The ID of the member or user to perform this action on.
+        :param role_id: The ID of the role to add or remove, for role actions.
+        :param delete_message_days: The number of days of messages to delete, for bans.
+        :param reason: The audit log reason, for bans.
+        """
+        if action in (BulkAction.ADD_ROLE, BulkAction.REMOVE_ROLE) and role_id is None:
+            raise ValueError("Role operations require a role ID")
+
+        #: The :class:`.BulkAction` to perform.
+        self.action = action
+
+        #: The ID of the member or user this operation targets.
+        self.target_id = int(target_id)
+
+        #: The ID of the role this operation adds or removes.
+        self.role_id = int(role_id) if role_id is not None else None
+
+        #: The number of days of messages to delete, if this is a ban.
+        self.delete_message_days = delete_message_days
+
+        #: The reason for this operation, if this is a ban.
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return "<BulkOperation action={} target_id={} role_id={}>".format(
+            self.action.name, self.target_id, self.role_id
+        )
+
+    @property
+    def key(self) -> Tuple[str, int, int]:
+        """
+        :return: A hashable key that uniquely identifies this operation.
+        """
+        return self.action.value, self.target_id, self.role_id
+
+    @classmethod
+    def add_role(cls, member_id: int, role_id: int) -> 'BulkOperation':
+        """
+        Creates a new operation that adds a role to a member.
+        """
+        return cls(BulkAction.ADD_ROLE, member_id, role_id=role_id)
+
+    @classmethod
+    def remove_role(cls, member_id: int, role_id: int) -> 'BulkOperation':
+        """
+        Creates a new operation that removes a role from a member.
+        """
+        return cls(BulkAction.REMOVE_ROLE, member_id, role_id=role_id)
+
+    @classmethod
+    def kick(cls, member_id: int) -> 'BulkOperation':
+        """
+        Creates a new operation that kicks a member.
+        """
+        return cls(BulkAction.KICK, member_id)
+
+    @classmethod
+    def ban(cls, user_id: int, *,
+            delete_message_days: int = 0, reason: str = None) -> 'BulkOperation':
+        """
+        Creates a new operation that bans a user.
+        """
+        return cls(BulkAction.BAN, user_id,
+                   delete_message_days=delete_message_days, reason=reason)
+
+    @classmethod
+    def unban(cls, user_id: int) -> 'BulkOperation':
+        """
+        Creates a new operation that unbans a user.
+        """
+        return cls(BulkAction.UNBAN, user_id)
+
+
+class BulkResult(object):
+    """
+    Represents the result of a single :class:`.BulkOperation`.
+    """
+
+    __slots__ = "operation", "result", "error"
+
+    def __init__(self, operation: BulkOperation, result: Any = None, error: Exception = None):
+        #: The :class:`.BulkOperation` this is the result of.
+        self.operation = operation
+
+        #: The data returned from Discord, if the operation succeeded.
+        self.result = result
+
+        #: The exception raised, if the operation failed.
+        self.error = error
+
+    def __repr__(self) -> str:
+        return "<BulkResult operation={!r} success={}>".format(self.operation, self.success)
+
+    @property
+    def success(self) -> bool:
+        """
+        :return: If this operation succeeded.
+        """
+        return self.error is None
+
+    def unwrap(self) -> Any:
+        """
+        :return: The result of this operation, or raises the error if it failed.
+        """
+        if self.error is not None:
+            raise self.error
+
+        return self.result
+
+
+class BulkExecutor(object):
+    """
+    Runs a batch of :class:`.BulkOperation` objects against a guild with bounded concurrency.
+
+    Each operation goes through the normal ratelimit buckets of the :class:`.HTTPClient`, so the
+    batch runs as fast as those buckets allow. Results are recorded as soon as each operation
+    finishes, so if the batch is interrupted it can be resumed by calling :meth:`.run` again, or
+    by passing :attr:`.BulkExecutor.completed` into a new executor.
+
+    .. code-block:: python3
+
+        executor = guild.bulk([BulkOperation.ban(id, reason="raid") for id in raiders])
+        results = await executor.run()
+        failed = [r for r in results if not r.success]
+
+    """
+
+    def __init__(self, http: 'HTTPClient', guild_id: int,
+                 operations: Iterable[BulkOperation], *,
+                 concurrency: int = 5,
+                 progress: Callable[[int, int], Any] = None,
+                 completed: Iterable[Tuple[str, int, int]] = None):
+        """
+        :param http: The :class:`.HTTPClient` to make requests with.
+        :param guild_id: The ID of the guild to run the operations in.
+        :param operations: An iterable of :class:`.BulkOperation` to run.
+        :param concurrency: The maximum number of operations to have in flight at once.
+        :param progress: A callable (or async callable) that is called with \
+            ``(done, total)`` after every operation finishes.
+        :param completed: An iterable of :attr:`.BulkOperation.key` values that have already \
+            been completed in a previous run, and should be skipped.
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        self.http = http
+        self.guild_id = guild_id
+        self.concurrency = concurrency
+        self.progress = progress
+
+        # de-duplicate operations, keeping the original order
+        self._operations: Dict[Tuple[str, int, int], BulkOperation] = {}
+        for operation in operations:
+            self._operations.setdefault(operation.key, operation)
+
+        #: A mapping of operation key -> :class:`.BulkResult` for finished operations.
+        self.results: Dict[Tuple[str, int, int], BulkResult] = {}
+
+        for key in (completed or ()):
+            key = tuple(key)
+            operation = self._operations.get(key)
+            if operation is not None:
+                self.results[key] = BulkResult(operation)
+
+    def __repr__(self) -> str:
+        return "<BulkExecutor guild_id={} done={} total={}>".format(
+            self.guild_id, self.done, self.total
+        )
+
+    @property
+    def operations(self) -> List[BulkOperation]:
+        """
+        :return: The list of :class:`.BulkOperation` in this batch.
+        """
+        return list(self._operations.values())
+
+    @property
+    def total(self) -> int:
+        """
+        :return: The total number of operations in this batch.
+        """
+        return len(self._operations)
+
+    @property
+    def done(self) -> int:
+        """
+        :return: The number of operations that have finished, successfully or not.
+        """
+        return len(self.results)
+
+    @property
+    def completed(self) -> Set[Tuple[str, int, int]]:
+        """
+        :return: The set of operation keys that have completed successfully. This can be \
+            persisted and passed to a new executor to resume this batch.
+        """
+        return {key for (key, result) in self.results.items() if result.success}
+
+    def pending(self, *, retry_failed: bool = False) -> List[BulkOperation]:
+        """
+        :param retry_failed: If operations that previously failed should be included.
+        :return: The list of :class:`.BulkOperation` that still need to be ran.
+        """
+        pending = []
+        for key, operation in self._operations.items():
+            result = self.results.get(key)
+            if result is None or (retry_failed and not result.success):
+                pending.append(operation)
+
+        return pending
+
+    async def _execute(self, operation: BulkOperation) -> Any:
+        """
+        Executes a single operation.
+        """
+        action = operation.action
+        if action is BulkAction.ADD_ROLE:
+            return await self.http.add_member_role(self.guild_id, operation.target_id,
+                                                   operation.role_id)
+
+        if action is BulkAction.REMOVE_ROLE:
+            return await self.http.remove_member_role(self.guild_id, operation.target_id,
+                                                      operation.role_id)
+
+        if action is BulkAction.KICK:
+            return await self.http.kick_member(self.guild_id, operation.target_id)
+
+        if action is BulkAction.BAN:
+            return await self.http.ban_user(self.guild_id, operation.target_id,
+                                            delete_message_days=operation.delete_message_days,
+                                            reason=operation.reason)
+
+        if action is BulkAction.UNBAN:
+            return await self.http.unban_user(self.guild_id, operation.target_id)
+
+        raise ValueError("Unknown bulk action {}".format(action))
+
+    async def _run_one(self, operation: BulkOperation) -> None:
+        """
+        Runs a single operation, recording the result.
+        """
+        try:
+            data = await self._execute(operation)
+        except Exception as e:
+            logger.debug("Bulk operation %r failed: %s", operation, e)
+            result = BulkResult(operation, error=e)
+        else:
+            result = BulkResult(operation, result=data)
+
+        self.results[operation.key] = result
+
+        if self.progress is not None:
+            res = self.progress(self.done, self.total)
+            if inspect.isawaitable(res):
+                await res
+
+    async def run(self, *, retry_failed: bool = False) -> List[BulkResult]:
+        """
+        Runs all pending operations in this batch.
+
+        If this is called again after an interruption, only operations that have not yet finished
+        will be ran.
+
+        :param retry_failed: If operations that failed in a previous run should be retried.
+        :return: A list of :class:`.BulkResult`, in the same order as the operations.
+        """
+        pending = self.pending(retry_failed=retry_failed)
+        # a fixed pool of workers pull from the same iterator, rather than one task per operation
+        operations = iter(pending)
+
+        async def worker():
+            for operation in operations:
+                await self._run_one(operation)
+
+        async with anyio.create_task_group() as tg:
+            tg: anyio.TaskGroup
+            for _ in range(min(self.concurrency, len(pending))):
+                await tg.spawn(worker)
+
+        return [self.results[key] for key in self._operations if key in self.results]
@@ -119,7 +119,7 @@ class Chunker(object):
         await self.client.events.fire_event("ready", gateway=gateway)
         self._ready[shard_id] = True
 
-    @event("guild_chunk")
+    @event("guild_chunk", inline=True)
     async def handle_member_chunk(self, ctx: EventContext, guild: 'md_guild.Guild', members: int):
         """
         Checks if we can fire ready or not.
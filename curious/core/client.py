@@ -142,6 +142,10 @@ class Client(object):
         #: The :class:`.HTTPClient` used for this bot.
         self.http = HTTPClient(self._token, bot=bool(self.bot_type & BotType.BOT))
 
+        #: The mapping of `channel_id -> ChannelSendQueue` for channels with queued sends.
+        #: See :meth:`.ChannelMessageWrapper.enable_queue`.
+        self.send_queues = {}
+
         #: The cached gateway URL.
         self._gw_url = None  # type: str
 
@@ -237,7 +241,7 @@ class Client(object):
         """
         return self.state.guilds_for_shard(shard_id)
 
-    def event(self, name: str):
+    def event(self, name: str, *, inline: bool = False):
         """
         A convenience decorator to mark a function as an event.
 
@@ -250,10 +254,12 @@ class Client(object):
                 pass
 
         :param name: The name of the event.
+        :param inline: If the event should be ran inline by the shard, instead of in a new task. \
+            See :class:`.EventManager`.
         """
 
         def _inner(func):
-            f = ev_dec(name)(func)
+            f = ev_dec(name, inline=inline)(func)
             self.events.add_event(func=f)
             return func
 
@@ -447,7 +453,7 @@ class Client(object):
 
         return " ".join(final)
 
-    @ev_dec(name="ready")
+    @ev_dec(name="ready", inline=True)
     async def handle_ready(self, ctx: 'EventContext'):
         """
         Handles a READY event, dispatching a ``shards_ready`` event when all shards are ready.
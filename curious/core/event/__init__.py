@@ -15,16 +15,19 @@
 import inspect
 from typing import Any, Generator, Tuple
 
+from curious.core.event.admission import AdmissionControl, OverloadPolicy
 from curious.core.event.context import EventContext, current_event_context
-from curious.core.event.manager import EventManager
+from curious.core.event.manager import DispatchStats, EventManager
 
 
-def event(name, scan: bool = True):
+def event(name, scan: bool = True, *, inline: bool = False):
     """
     Marks a function as an event.
 
     :param name: The name of the event.
     :param scan: Should this event be handled in scans too?
+    :param inline: Should this event be ran inline by the task firing the event, instead of in a \
+        new task? Only short handlers should be inline. See :class:`.EventManager`.
     """
 
     def __innr(f):
@@ -34,6 +37,7 @@ def event(name, scan: bool = True):
         f.is_event = True
         f.events.add(name)
         f.scan = scan
+        f.inline = getattr(f, "inline", False) or inline
         return f
 
     return __innr
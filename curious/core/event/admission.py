@@ -0,0 +1,228 @@
+# This file is part of curious.
+#
+# curious is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# curious is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with curious.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Admission control for the tasks spawned by the :class:`.EventManager`.
+
+.. currentmodule:: curious.core.event.admission
+"""
+import collections
+import contextvars
+import enum
+import time
+
+import anyio
+from typing import Dict, List
+
+#: The priorities of the events that the client needs to work, which are never shed.
+DEFAULT_PRIORITIES = {
+    "connect": 10,
+    "ready": 10,
+    "shards_ready": 10,
+    "resumed": 10,
+    "guild_streamed": 10,
+    "guild_available": 10,
+    "guild_joined": 10,
+    "guild_chunk": 10,
+}
+
+# set in every task spawned under admission control, so events fired from handlers don't wait for
+# slots held by the handlers themselves
+_in_handler = contextvars.ContextVar("in_handler", default=False)
+
+
+class OverloadPolicy(enum.Enum):
+    """
+    What happens to an event when its handler tasks are at their limit.
+    """
+    #: Wait for a task to finish, which stops the shard reading any more events until then.
+    BLOCK = "block"
+
+    #: Drop events with a priority of 0 or lower. Other events wait as with ``BLOCK``.
+    DROP = "drop"
+
+    #: Keep a fraction of the events with a priority of 0 or lower, and drop the rest. The kept
+    #: events and any other events wait as with ``BLOCK``.
+    SAMPLE = "sample"
+
+
+class AdmissionControl(object):
+    """
+    Limits how many handler tasks an :class:`.EventManager` can have running at once.
+
+    .. code-block:: python3
+
+        client.events.admission = AdmissionControl(
+            max_tasks=5000, event_limits={"typing_start": 50},
+            policy=OverloadPolicy.DROP, priorities={"message_create": 1}
+        )
+
+    The limits are checked once when an event is fired, before any of its handlers are spawned.
+    If the event is admitted, every handler for it is spawned, so the limits can be exceeded by
+    the handlers of a single event. If the event is shed, its hooks and handlers are skipped.
+
+    Temporary listeners and inline handlers are never delayed or shed, and temporary listeners
+    don't count towards the limits, so a handler waiting for an event with
+    :meth:`.EventManager.wait_for` still gets it while the limits are reached.
+
+    Events fired by handler tasks are never delayed, as they may be waiting for the slot that
+    their own task holds.
+    """
+
+    def __init__(self, max_tasks: int = None, *, event_limits: Dict[str, int] = None,
+                 policy: OverloadPolicy = OverloadPolicy.BLOCK,
+                 priorities: Dict[str, int] = None, sample_rate: float = 0.1):
+        """
+        :param max_tasks: The number of handler tasks that can run at once, or None for no limit.
+        :param event_limits: A mapping of event name -> the number of handler tasks that can run \
+            at once for that event.
+        :param policy: The :class:`.OverloadPolicy` for events over the limits.
+        :param priorities: A mapping of event name -> priority. Events default to priority 0. \
+            These are added to :data:`.DEFAULT_PRIORITIES`.
+        :param sample_rate: The fraction of events kept over the limits, with \
+            :attr:`.OverloadPolicy.SAMPLE`.
+        """
+        if max_tasks is not None and max_tasks < 1:
+            raise ValueError("Task limit must be at least 1")
+
+        if any(limit < 1 for limit in (event_limits or {}).values()):
+            raise ValueError("Event task limits must be at least 1")
+
+        if not 0 < sample_rate <= 1:
+            raise ValueError("Sample rate must be between 0 and 1")
+
+        self.max_tasks = max_tasks
+        self.event_limits = dict(event_limits or {})
+        self.policy = policy
+        self.priorities = {**DEFAULT_PRIORITIES, **(priorities or {})}
+        self.sample_rate = sample_rate
+
+        #: The number of handler tasks currently running.
+        self.in_flight = 0
+
+        #: The number of events shed so far.
+        self.shed = 0
+
+        #: A :class:`collections.Counter` of event name -> the number of times it was shed.
+        self.shed_events = collections.Counter()
+
+        #: The number of events that had to wait to be admitted so far.
+        self.delayed = 0
+
+        #: The total time spent waiting to admit events, in seconds.
+        self.delay_time = 0.0
+
+        self._event_in_flight: Dict[str, int] = {}
+        self._waiters: List[anyio.Event] = []
+        self._sample_credit = 0.0
+
+    def __repr__(self) -> str:
+        return "<AdmissionControl max_tasks={} in_flight={} shed={} delayed={}>".format(
+            self.max_tasks, self.in_flight, self.shed, self.delayed
+        )
+
+    def get_in_flight(self, event_name: str) -> int:
+        """
+        :param event_name: The name of the event.
+        :return: The number of handler tasks currently running for the event.
+        """
+        return self._event_in_flight.get(event_name, 0)
+
+    def is_full(self, event_name: str) -> bool:
+        """
+        :param event_name: The name of the event.
+        :return: If the event is over the global limit or its own limit.
+        """
+        if self.max_tasks is not None and self.in_flight >= self.max_tasks:
+            return True
+
+        limit = self.event_limits.get(event_name)
+        return limit is not None and self._event_in_flight.get(event_name, 0) >= limit
+
+    def _should_shed(self, event_name: str) -> bool:
+        if self.policy is OverloadPolicy.BLOCK or self.priorities.get(event_name, 0) > 0:
+            return False
+
+        if self.policy is OverloadPolicy.SAMPLE:
+            self._sample_credit += self.sample_rate
+            if self._sample_credit >= 1:
+                self._sample_credit -= 1
+                return False
+
+        return True
+
+    async def admit(self, event_name: str) -> bool:
+        """
+        Decides if an event's handlers can be spawned, waiting for other handlers to finish if
+        needed.
+
+        :param event_name: The name of the event.
+        :return: True if the event was admitted, or False if it was shed.
+        """
+        if not self.is_full(event_name):
+            return True
+
+        if self._should_shed(event_name):
+            self.shed += 1
+            self.shed_events[event_name] += 1
+            return False
+
+        if _in_handler.get():
+            return True
+
+        self.delayed += 1
+        start = time.monotonic()
+        try:
+            while self.is_full(event_name):
+                event = anyio.create_event()
+                self._waiters.append(event)
+                try:
+                    await event.wait()
+                finally:
+                    if not event.is_set():
+                        self._waiters.remove(event)
+        finally:
+            self.delay_time += time.monotonic() - start
+
+        return True
+
+    def acquire(self, event_name: str) -> None:
+        """
+        Counts a new handler task for an event. Called by the :class:`.EventManager` when it
+        spawns a handler for an admitted event.
+
+        :param event_name: The name of the event.
+        """
+        self.in_flight += 1
+        self._event_in_flight[event_name] = self._event_in_flight.get(event_name, 0) + 1
+
+    async def release(self, event_name: str) -> None:
+        """
+        Counts a handler task for an event as finished, waking anything waiting to be admitted.
+
+        :param event_name: The name of the event.
+        """
+        self.in_flight -= 1
+        remaining = self._event_in_flight[event_name] - 1
+        if remaining:
+            self._event_in_flight[event_name] = remaining
+        else:
+            del self._event_in_flight[event_name]
+
+        # the waiters check their own limits again, so wake them all
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            await waiter.set()
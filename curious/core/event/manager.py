@@ -16,11 +16,14 @@ import anyio
 import functools
 import inspect
 import logging
+import time
+
 import outcome
 from async_generator import asynccontextmanager
 from multidict import MultiDict
 from typing import Any, AsyncContextManager
 
+from curious.core.event.admission import AdmissionControl, _in_handler
 from curious.core.event.context import EventContext, event_context
 from curious.util import Promise, remove_from_multidict, safe_generator
 
@@ -57,20 +60,81 @@ async def _wait_for_manager(manager, name: str, predicate):
             raise
 
 
+class DispatchStats:
+    """
+    Represents the statistics for the events dispatched by an :class:`.EventManager`.
+    """
+    #: The number of events fired.
+    events_fired: int = 0
+
+    #: The number of tasks spawned to run hooks, handlers and listeners.
+    tasks_spawned: int = 0
+
+    #: The number of hooks, handlers and listeners ran inline.
+    inline_calls: int = 0
+
+    #: The total time spent in :meth:`.EventManager.fire_event`, in seconds. This includes the
+    #: time spent running inline handlers.
+    dispatch_time: float = 0.0
+
+    @property
+    def dispatch_overhead(self) -> float:
+        """
+        :return: The average time spent firing each event, in seconds.
+        """
+        if not self.events_fired:
+            return 0.0
+
+        return self.dispatch_time / self.events_fired
+
+    def reset(self) -> None:
+        """
+        Resets these statistics.
+        """
+        self.events_fired = self.tasks_spawned = self.inline_calls = 0
+        self.dispatch_time = 0.0
+
+
 class EventManager(object):
     """
     A manager for events.
 
     This deals with firing of events and temporary listeners.
+
+    Hooks, handlers and listeners are normally each spawned in a new task. Ones that are marked
+    as inline (for example, with ``@event("message_create", inline=True)``) are instead awaited
+    directly by the task firing the event, in the order they were added. For gateway events, this
+    is the shard's dispatch task, so inline handlers see events in the order they arrived and cost
+    no task spawns.
+
+    .. warning::
+
+        The shard won't process any more events until an inline handler returns. Inline
+        handlers should be short, and must not wait for another event on the same shard (e.g.
+        with :meth:`.EventManager.wait_for`).
     """
 
     def __init__(self):
         #: The task manager used to spawn events.
         self.task_manager: anyio.TaskGroup = None
 
+        #: If inline hooks, handlers and listeners should be ran inline. If this is False, they
+        #: are spawned like everything else.
+        self.inline_dispatch = True
+
+        #: The :class:`.DispatchStats` for this manager.
+        self.stats = DispatchStats()
+
+        #: The :class:`.AdmissionControl` limiting the handler tasks this manager spawns, or None
+        #: for no limits.
+        self.admission: AdmissionControl = None
+
         #: A list of event hooks.
         self.event_hooks = set()
 
+        # the hooks, handlers and listeners that were added as inline
+        self._inline = set()
+
         #: A MultiDict of event listeners.
         self.event_listeners = MultiDict()
 
@@ -79,12 +143,14 @@ class EventManager(object):
 
     # add or removal functions
     # Events
-    def add_event(self, func, name: str = None):
+    def add_event(self, func, name: str = None, *, inline: bool = False):
         """
         Add an event to the internal registry of events.
 
         :param name: The event name to register under.
         :param func: The function to add.
+        :param inline: If this event should be ran inline, instead of in a new task. This is \
+            also enabled by ``@event(..., inline=True)``.
         """
         if not inspect.iscoroutinefunction(func):
             raise TypeError("Event must be an async function")
@@ -94,6 +160,9 @@ class EventManager(object):
         else:
             evs = [name]
 
+        if inline or getattr(func, "inline", False):
+            self._inline.add(func)
+
         for ev_name in evs:
             logger.debug("Registered event `{}` handling `{}`".format(func, ev_name))
             self.event_listeners.add(ev_name, func)
@@ -106,9 +175,10 @@ class EventManager(object):
         :param func: The function to remove.
         """
         self.event_listeners = remove_from_multidict(self.event_listeners, key=name, item=func)
+        self._forget_inline(func)
 
     # listeners
-    def add_temporary_listener(self, name: str, listener):
+    def add_temporary_listener(self, name: str, listener, *, inline: bool = False):
         """
         Adds a new temporary listener.
 
@@ -117,7 +187,11 @@ class EventManager(object):
 
         :param name: The name of the event to listen to.
         :param listener: The listener function.
+        :param inline: If this listener should be ran inline, instead of in a new task.
         """
+        if inline:
+            self._inline.add(listener)
+
         self.temporary_listeners.add(name, listener)
 
     def remove_listener_early(self, name: str, listener):
@@ -129,13 +203,19 @@ class EventManager(object):
         """
         self.event_listeners = remove_from_multidict(self.event_listeners, key=name, item=listener)
 
-    def add_event_hook(self, listener):
+    def add_event_hook(self, listener, *, inline: bool = False):
         """
         Adds an event hook.
 
         :param listener: The event hook callable to use.
+        :param inline: If this hook should be ran inline, instead of in a new task. Hooks are \
+            called for every event, so an inline hook that returns early for the events it \
+            doesn't care about saves a task spawn on each of them.
         """
         logger.warning("Adding event hook '%s'", listener)
+        if inline:
+            self._inline.add(listener)
+
         self.event_hooks.add(listener)
 
     def remove_event_hook(self, listener):
@@ -143,6 +223,26 @@ class EventManager(object):
         Removes an event hook.
         """
         self.event_hooks.remove(listener)
+        self._forget_inline(listener)
+
+    def _forget_inline(self, func):
+        """
+        Stops treating a function as inline, if it's no longer registered anywhere.
+        """
+        if func not in self._inline or func in self.event_hooks:
+            return
+
+        if func in self.event_listeners.values() or func in self.temporary_listeners.values():
+            return
+
+        self._inline.discard(func)
+
+    def is_inline(self, func) -> bool:
+        """
+        :param func: A hook, handler or listener.
+        :return: If the function will be ran inline when an event is fired.
+        """
+        return self.inline_dispatch and func in self._inline
 
     # wrapper functions
     async def _safety_wrapper(self, func, *args, **kwargs):
@@ -163,10 +263,12 @@ class EventManager(object):
         except ListenerExit:
             # remove the function
             self.temporary_listeners = remove_from_multidict(self.temporary_listeners, key, func)
+            self._forget_inline(func)
         except Exception:
             logger.exception("Unhandled exception in listener {}!".format(func.__name__),
                              exc_info=True)
             self.temporary_listeners = remove_from_multidict(self.temporary_listeners, key, func)
+            self._forget_inline(func)
 
     async def wait_for(self, event_name: str, predicate=None):
         """
@@ -242,14 +344,52 @@ class EventManager(object):
         :param cofunc: The async function to spawn.
         :param args: Args to provide to the async function.
         """
+        self.stats.tasks_spawned += 1
         return await self.task_manager.spawn(cofunc, *args)
 
+    async def spawn_handler(self, event_name: str, cofunc, *args) -> Any:
+        """
+        Spawns a handler for an event, counting it against the limits of :attr:`.admission`.
+
+        :param event_name: The name of the event being handled.
+        :param cofunc: The async function to spawn.
+        :param args: Args to provide to the async function.
+        """
+        admission = self.admission
+        if admission is None:
+            return await self.spawn(cofunc, *args)
+
+        admission.acquire(event_name)
+        try:
+            return await self.spawn(self._admitted_wrapper, admission, event_name, cofunc, *args)
+        except BaseException:
+            await admission.release(event_name)
+            raise
+
+    async def _admitted_wrapper(self, admission: AdmissionControl, event_name: str, cofunc, *args):
+        """
+        Releases a handler's slot once it has finished.
+        """
+        _in_handler.set(True)
+        try:
+            await cofunc(*args)
+        finally:
+            await admission.release(event_name)
+
     async def fire_event(self, event_name: str, *args, **kwargs):
         """
         Fires an event.
 
+        Inline hooks, handlers and listeners are awaited before this returns. Everything else is
+        spawned in a new task.
+
+        If :attr:`.admission` is set and the event is over its limits, the temporary listeners and
+        inline handlers are ran first. This then waits for other handlers to finish, or sheds the
+        event, skipping its hooks and non-inline handlers.
+
         :param event_name: The name of the event to fire.
         """
+        start = time.perf_counter()
         if "ctx" not in kwargs:
             gateway = kwargs.pop("gateway")
             ctx = EventContext(gateway.session.shard_id, event_name)
@@ -259,19 +399,70 @@ class EventManager(object):
         # clobber event name
         ctx.event_name = event_name
         # update current event context
-        event_context.set(ctx)
+        # this is reset afterwards, as inline handlers may fire events of their own
+        token = event_context.set(ctx)
 
-        # always ensure hooks are ran first
+        self.stats.events_fired += 1
+        try:
+            handlers = self.event_listeners.getall(event_name, ())
+            admission = self.admission
+            if admission is None or not admission.is_full(event_name):
+                # always ensure hooks are ran first
+                await self._run_hooks(ctx, args, kwargs)
+                await self._run_handlers(ctx, handlers, args, kwargs)
+                await self._run_listeners(ctx, args, kwargs)
+            else:
+                # the handlers holding the slots may be waiting for this event (e.g. with
+                # wait_for), so listeners and inline handlers can't wait to be admitted
+                await self._run_listeners(ctx, args, kwargs)
+                await self._run_handlers(ctx, handlers, args, kwargs, spawned=False)
+                if await admission.admit(event_name):
+                    await self._run_hooks(ctx, args, kwargs)
+                    await self._run_handlers(ctx, handlers, args, kwargs, inline=False)
+        finally:
+            event_context.reset(token)
+            self.stats.dispatch_time += time.perf_counter() - start
+
+    async def _run_hooks(self, ctx: EventContext, args: tuple, kwargs: dict):
         for hook in self.event_hooks:
-            cofunc = functools.partial(hook, ctx, *args, **kwargs)
-            await self.spawn(cofunc)
-
-        for handler in self.event_listeners.getall(event_name, []):
-            coro = functools.partial(handler, ctx, *args, **kwargs)
-            coro.__name__ = handler.__name__
-            await self.spawn(self._safety_wrapper, coro)
-
-        for listener in self.temporary_listeners.getall(event_name, []):
-            coro = functools.partial(self._listener_wrapper, event_name, listener, ctx,
-                                     *args, **kwargs)
-            await self.spawn(coro)
\ No newline at end of file
+            if self.is_inline(hook):
+                # like spawned hooks, errors in inline hooks aren't caught
+                self.stats.inline_calls += 1
+                await hook(ctx, *args, **kwargs)
+            else:
+                cofunc = functools.partial(hook, ctx, *args, **kwargs)
+                await self.spawn_handler(ctx.event_name, cofunc)
+
+    async def _run_handlers(self, ctx: EventContext, handlers, args: tuple, kwargs: dict, *,
+                            inline: bool = True, spawned: bool = True):
+        """
+        Runs the inline handlers for an event and spawns the other ones, or only one of the two.
+        """
+        for handler in handlers:
+            if self.is_inline(handler):
+                if inline:
+                    self.stats.inline_calls += 1
+                    await self._safety_wrapper(handler, ctx, *args, **kwargs)
+            elif not spawned:
+                continue
+            elif kwargs:
+                coro = functools.partial(handler, ctx, *args, **kwargs)
+                coro.__name__ = handler.__name__
+                await self.spawn_handler(ctx.event_name, self._safety_wrapper, coro)
+            else:
+                await self.spawn_handler(ctx.event_name, self._safety_wrapper, handler, ctx, *args)
+
+    async def _run_listeners(self, ctx: EventContext, args: tuple, kwargs: dict):
+        """
+        Runs the temporary listeners for an event. Listeners are short lived, so they don't count
+        towards the limits of :attr:`.admission`.
+        """
+        event_name = ctx.event_name
+        for listener in self.temporary_listeners.getall(event_name, ()):
+            if self.is_inline(listener):
+                self.stats.inline_calls += 1
+                await self._listener_wrapper(event_name, listener, ctx, *args, **kwargs)
+            else:
+                coro = functools.partial(self._listener_wrapper, event_name, listener, ctx,
+                                         *args, **kwargs)
+                await self.spawn(coro)
@@ -0,0 +1,257 @@
+# This file is part of curious.
+#
+# curious is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# curious is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with curious.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Ranged history exporters, for archiving large amounts of channel history.
+
+.. currentmodule:: curious.core.export
+"""
+import anyio
+import datetime
+import json
+import logging
+import os
+import typing
+from typing import List, Tuple, Union
+
+from curious.util import to_snowflake
+
+if typing.TYPE_CHECKING:
+    from curious.core.httpclient import HTTPClient
+
+logger = logging.getLogger("curious.export")
+
+#: The number of messages Discord returns per history request.
+PAGE_SIZE = 100
+
+
+def _snowflake(value: 'Union[int, datetime.datetime]') -> int:
+    """
+    Converts a datetime or snowflake into a snowflake.
+    """
+    if isinstance(value, datetime.datetime):
+        return to_snowflake(value)
+
+    return int(value)
+
+
+class HistoryExporter(object):
+    """
+    Exports the history of a channel by splitting it into snowflake ranges, which are fetched
+    concurrently.
+
+    The range between ``start`` and ``end`` is split into ``windows`` equal time windows. Up to
+    ``concurrency`` windows are fetched at once, each walking forwards from the start of its
+    window, and pages are returned in chronological order. Each window buffers up to ``buffer``
+    pages, so windows ahead of the consumer don't grow without bound.
+
+    Messages are returned as the raw dicts returned from Discord, and are never turned into
+    :class:`.Message` objects.
+
+    .. code-block:: python3
+
+        async with channel.messages.export(start=datetime(2018, 1, 1)) as exporter:
+            async for page in exporter:
+                ...
+
+        # or, write every message to a newline-delimited JSON file
+        async with channel.messages.export() as exporter:
+            count = await exporter.write_ndjson("archive.ndjson")
+
+    Note that all windows share the same ratelimit bucket, so the export can only go as fast as
+    that bucket allows.
+    """
+
+    def __init__(self, http: 'HTTPClient', channel_id: int, *,
+                 start: 'Union[int, datetime.datetime]' = None,
+                 end: 'Union[int, datetime.datetime]' = None,
+                 windows: int = 16, concurrency: int = 4, buffer: int = 4):
+        """
+        :param http: The :class:`.HTTPClient` to make requests with.
+        :param channel_id: The ID of the channel to export.
+        :param start: The datetime or snowflake to export from. Defaults to the creation of the \
+            channel.
+        :param end: The datetime or snowflake to export up to (exclusive). Defaults to now.
+        :param windows: The number of windows to split the range into.
+        :param concurrency: The maximum number of windows to fetch at once.
+        :param buffer: The maximum number of pages each window fetches ahead of the consumer.
+        """
+        if windows < 1 or concurrency < 1 or buffer < 1:
+            raise ValueError("Windows, concurrency and buffer must be at least 1")
+
+        self.http = http
+        self.channel_id = channel_id
+        self.concurrency = concurrency
+        self.buffer = buffer
+
+        #: The first snowflake in the exported range.
+        self.start = _snowflake(start) if start is not None else channel_id
+
+        #: The snowflake the exported range ends at, exclusive.
+        self.end = _snowflake(end) if end is not None \
+            else to_snowflake(datetime.datetime.now(datetime.timezone.utc))
+
+        #: The list of ``(start, end)`` snowflake windows to export.
+        self.windows = self.split(self.start, self.end, windows)
+
+        #: The number of messages returned so far.
+        self.messages_exported = 0
+
+        #: The number of history requests made so far.
+        self.requests_made = 0
+
+        self._queues: List[anyio.Queue] = []
+        self._index = 0
+        self._task_group: anyio.TaskGroup = None
+
+    def __repr__(self) -> str:
+        return "<HistoryExporter channel_id={} windows={} exported={}>".format(
+            self.channel_id, len(self.windows), self.messages_exported
+        )
+
+    @staticmethod
+    def split(start: int, end: int, count: int) -> List[Tuple[int, int]]:
+        """
+        Splits a snowflake range into equal windows.
+
+        :param start: The first snowflake in the range.
+        :param end: The end of the range, exclusive.
+        :param count: The number of windows to split into.
+        :return: A list of ``(start, end)`` windows, in order.
+        """
+        if end <= start:
+            return []
+
+        width = max(1, -(-(end - start) // count))
+        return [(lo, min(lo + width, end)) for lo in range(start, end, width)]
+
+    async def _fetch_window(self, start: int, end: int, queue: anyio.Queue) -> None:
+        """
+        Fetches every message in a window, oldest first, putting each page onto a queue.
+        """
+        cursor = start - 1
+        while True:
+            data = await self.http.get_message_history(self.channel_id, after=cursor,
+                                                       limit=PAGE_SIZE)
+            self.requests_made += 1
+
+            # discord returns newest first, even when going forwards
+            page = [message for message in reversed(data) if int(message["id"]) < end]
+            if page:
+                cursor = int(page[-1]["id"])
+                await queue.put(page)
+
+            # a short page means we hit the end of the channel, a trimmed page the end of the window
+            if len(data) < PAGE_SIZE or len(page) < len(data):
+                return
+
+    async def _worker(self, windows: typing.Iterator[int]) -> None:
+        """
+        Fetches windows until there are none left.
+        """
+        for index in windows:
+            start, end = self.windows[index]
+            queue = self._queues[index]
+
+            try:
+                await self._fetch_window(start, end, queue)
+            except Exception as e:
+                logger.debug("Failed to export window %d of channel %s", index, self.channel_id)
+                # re-raised in the consumer
+                await queue.put(e)
+                return
+
+            await queue.put(None)
+
+    async def __aenter__(self) -> 'HistoryExporter':
+        self._queues = [anyio.create_queue(self.buffer) for _ in self.windows]
+        self._index = 0
+
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+
+        # windows are handed out in order, so the window being consumed is always being fetched
+        windows = iter(range(len(self.windows)))
+        for _ in range(min(self.concurrency, len(self.windows))):
+            await self._task_group.spawn(self._worker, windows)
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            # workers may be blocked on a full queue if we stopped early
+            await self._task_group.cancel_scope.cancel()
+            return await self._task_group.__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            self._task_group = None
+
+    def __aiter__(self) -> 'HistoryExporter':
+        return self
+
+    async def __anext__(self) -> List[dict]:
+        """
+        :return: The next page of raw message dicts, in chronological order.
+        """
+        if self._task_group is None:
+            raise RuntimeError("This exporter is not running - use `async with`")
+
+        while self._index < len(self._queues):
+            page = await self._queues[self._index].get()
+            if page is None:
+                self._index += 1
+                continue
+
+            if isinstance(page, Exception):
+                raise page
+
+            self.messages_exported += len(page)
+            return page
+
+        raise StopAsyncIteration
+
+    async def messages(self) -> 'typing.AsyncGenerator[dict, None]':
+        """
+        An async generator that yields every raw message dict, in chronological order.
+        """
+        async for page in self:
+            for message in page:
+                yield message
+
+    async def write_ndjson(self, fp: 'Union[str, os.PathLike, typing.TextIO]') -> int:
+        """
+        Writes every message to a file as newline-delimited JSON, in chronological order.
+
+        :param fp: The path or text file object to write to.
+        :return: The number of messages written.
+        """
+        if isinstance(fp, (str, os.PathLike)):
+            f = open(fp, "w", encoding="utf-8")
+            close = True
+        else:
+            f = fp
+            close = False
+
+        count = 0
+        try:
+            async for page in self:
+                lines = "".join(json.dumps(message, separators=(",", ":")) + "\n"
+                                for message in page)
+                await anyio.run_in_thread(f.write, lines)
+                count += len(page)
+        finally:
+            if close:
+                f.close()
+
+        return count
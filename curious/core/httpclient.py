@@ -27,16 +27,21 @@ import datetime
 import json
 import logging
 import mimetypes
+import mmap
+import os
 import pytz
 import random
+import ssl
 import string
 import typing
 import weakref
-from asks.errors import ConnectivityError
+from asks.errors import ConnectivityError, ServerClosedConnectionError
+from asks.req_structs import CaseInsensitiveDict
 from asks.response_objects import Response
 from email.utils import parsedate
+import h11
 from h11 import RemoteProtocolError
-from urllib.parse import quote
+from urllib.parse import quote, urlencode, urlsplit
 
 try:
     # try and load a C impl of LRU first
@@ -50,6 +55,7 @@ except ImportError:
     lru = py_lru
 
 import curious
+from curious.core.bulk import BulkExecutor, BulkOperation
 from curious.exc import Forbidden, HTTPException, NotFound, Unauthorized
 
 logger = logging.getLogger("curious.http")
@@ -148,6 +154,177 @@ def encode_multipart(fields, files, boundary=None):
     return body, headers
 
 
+def _make_boundary() -> bytes:
+    """
+    Makes a random multipart boundary.
+    """
+    chars = string.ascii_letters + string.digits
+    return b''.join(random.choice(chars).encode() for i in range(30))
+
+
+class MultipartBody(object):
+    r"""
+    A ``multipart/form-data`` body that is streamed in fixed-size chunks when it is sent, rather
+    than being built in memory like :func:`.encode_multipart`.
+
+    The content of each file can be :class:`bytes`, a :class:`mmap.mmap`, a path-like object or a
+    seekable binary file object. The Content-Length is calculated up front from the size of each
+    part, and file objects are rewound between attempts so the body can be re-sent.
+
+    >>> body = MultipartBody({'FIELD': 'VALUE'},
+    ...                      {'FILE': {'filename': 'F.TXT', 'content': b'CONTENT'}},
+    ...                      boundary=b'BOUNDARY')
+    >>> body.content_length
+    193
+    """
+
+    def __init__(self, fields: typing.Dict[str, typing.Any],
+                 files: typing.Dict[str, typing.Dict[str, typing.Any]], *,
+                 boundary: bytes = None, chunk_size: int = 65536):
+        """
+        :param fields: A dict of form fields.
+        :param files: A dict of files. Each value is a dict with the keys ``filename`` and \
+            ``content``, and optionally ``mimetype``.
+        :param boundary: The multipart boundary to use. Randomly generated if not provided.
+        :param chunk_size: The size of the chunks file contents are read and sent in.
+        """
+        #: The multipart boundary for this body.
+        self.boundary = boundary or _make_boundary()
+
+        #: The size of the chunks that file contents are read in.
+        self.chunk_size = chunk_size
+
+        # list of (header bytes, content source, start offset, content size)
+        self._parts = []
+
+        def escape_quote(s):
+            return s.replace(b'"', b'\\"')
+
+        for name, value in fields.items():
+            name = str(name).encode()
+            if isinstance(value, str):
+                value = value.encode()
+            else:
+                value = str(value).encode()
+
+            header = b'--%s\r\nContent-Disposition: form-data; name="%s"\r\n\r\n' % (
+                self.boundary, escape_quote(name)
+            )
+            self._parts.append((header, value, 0, len(value)))
+
+        for name, value in files.items():
+            filename = value['filename']
+            mimetype = value.get('mimetype') \
+                or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+            header = b'--%s\r\nContent-Disposition: form-data; name="%s"; filename="%s"\r\n' \
+                     b'Content-Type: %s\r\n\r\n' % (
+                         self.boundary, escape_quote(name.encode()),
+                         escape_quote(filename.encode()), mimetype.encode()
+                     )
+            content = value['content']
+            if isinstance(content, str):
+                content = content.encode()
+
+            start, size = self._measure(content)
+            self._parts.append((header, content, start, size))
+
+        self._footer = b'--%s--\r\n' % self.boundary
+
+    @staticmethod
+    def _measure(content) -> typing.Tuple[int, int]:
+        """
+        Gets the start offset and size of a piece of file content.
+        """
+        if isinstance(content, (bytes, bytearray, memoryview, mmap.mmap)):
+            return 0, memoryview(content).nbytes
+
+        if isinstance(content, os.PathLike):
+            return 0, os.stat(content).st_size
+
+        if hasattr(content, "read"):
+            start = content.tell()
+            end = content.seek(0, os.SEEK_END)
+            content.seek(start)
+            return start, end - start
+
+        raise TypeError("Cannot upload content of type {}".format(type(content).__name__))
+
+    @property
+    def content_type(self) -> str:
+        """
+        :return: The Content-Type header for this body.
+        """
+        return 'multipart/form-data; boundary=%s' % self.boundary.decode()
+
+    @property
+    def content_length(self) -> int:
+        """
+        :return: The total length of this body, in bytes.
+        """
+        # each part is terminated with a CRLF
+        parts = sum(len(header) + size + 2 for (header, _, _, size) in self._parts)
+        return parts + len(self._footer)
+
+    @property
+    def headers(self) -> typing.Dict[str, str]:
+        """
+        :return: The headers to send alongside this body.
+        """
+        return {
+            'Content-Type': self.content_type,
+            'Content-Length': str(self.content_length),
+        }
+
+    async def _iter_content(self, content, start: int, size: int) \
+            -> typing.AsyncGenerator[bytes, None]:
+        """
+        Iterates over a single piece of file content, in chunks.
+        """
+        if isinstance(content, (bytes, bytearray, memoryview, mmap.mmap)):
+            view = memoryview(content)
+            for offset in range(0, size, self.chunk_size):
+                yield bytes(view[offset:offset + self.chunk_size])
+
+            return
+
+        if isinstance(content, os.PathLike):
+            with open(content, 'rb') as f:
+                async for chunk in self._iter_file(f, size):
+                    yield chunk
+
+            return
+
+        # rewind in case this is a retry
+        content.seek(start)
+        async for chunk in self._iter_file(content, size):
+            yield chunk
+
+    async def _iter_file(self, f: typing.BinaryIO, size: int) \
+            -> typing.AsyncGenerator[bytes, None]:
+        """
+        Reads a file in chunks, in a worker thread.
+        """
+        remaining = size
+        while remaining > 0:
+            chunk = await anyio.run_in_thread(f.read, min(self.chunk_size, remaining))
+            if not chunk:
+                raise ValueError("File was truncated whilst uploading")
+
+            remaining -= len(chunk)
+            yield chunk
+
+    async def __aiter__(self) -> typing.AsyncGenerator[bytes, None]:
+        for (header, content, start, size) in self._parts:
+            yield header
+            async for chunk in self._iter_content(content, start, size):
+                yield chunk
+
+            yield b'\r\n'
+
+        yield self._footer
+
+
 # more of a namespace
 class Endpoints:
     API_BASE = "/api/v7"
@@ -261,6 +438,10 @@ class HTTPClient(object):
         self._ratelimit_remaining = lru(1024)
         self._is_bot = bot
 
+        #: The session used for downloading files from the CDN.
+        #: This holds up to ``max_connections`` connections at once.
+        self.download_session = asks.Session(connections=max_connections)
+
     def get_ratelimit_lock(self, bucket: object) -> 'anyio.Lock':
         """
         Gets a ratelimit lock from the dict if it exists, otherwise creates a new one.
@@ -272,6 +453,26 @@ class HTTPClient(object):
             self._rate_limits[bucket] = lock
             return lock
 
+    def get_ratelimit_delay(self, bucket: object) -> float:
+        """
+        Gets how long a request in the specified bucket would have to wait for the ratelimit.
+
+        :param bucket: The bucket to check.
+        :return: The number of seconds until the bucket resets, or 0 if it is not exhausted.
+        """
+        if self.global_lock.locked():
+            return 1.0
+
+        try:
+            tries, reset_time = self._ratelimit_remaining[bucket]
+        except KeyError:
+            return 0.0
+
+        if tries > 0:
+            return 0.0
+
+        return max(0.0, reset_time - time.time())
+
     # Special wrapper functions
     @staticmethod
     def get_response_data(response: Response) -> typing.Union[str, dict]:
@@ -314,8 +515,80 @@ class HTTPClient(object):
         else:
             kwargs.pop("path", None)
 
+        # asks can't stream request bodies, so streamed uploads are sent by hand
+        if isinstance(kwargs.get("data"), MultipartBody):
+            return await self._make_streaming_request(kwargs["method"], kwargs["uri"],
+                                                      headers=headers, body=kwargs["data"],
+                                                      params=kwargs.get("params"))
+
         return await asks.request(*args, headers=headers, timeout=5, **kwargs)
 
+    async def _make_streaming_request(self, method: str, uri: str, *,
+                                      headers: dict, body: MultipartBody,
+                                      params: dict = None, timeout: float = 60) -> Response:
+        """
+        Makes a request with a streamed body, sending it chunk by chunk.
+
+        :param timeout: The number of seconds the whole request, including the upload, can take.
+        :returns: The response body.
+        """
+        split = urlsplit(uri)
+        target = split.path
+        query = "&".join(filter(None, (split.query, urlencode(params) if params else "")))
+        if query:
+            target += "?" + query
+
+        port = split.port or (443 if split.scheme == "https" else 80)
+        ssl_context = ssl.create_default_context() if split.scheme == "https" else None
+
+        request_headers = {
+            "Host": split.hostname,
+            "Connection": "close",
+            "Accept-Encoding": "identity",
+            **headers,
+            **body.headers,
+        }
+        request = h11.Request(method=method, target=target, headers=list(request_headers.items()))
+
+        connection = h11.Connection(our_role=h11.CLIENT)
+        response = None
+        content = bytearray()
+
+        async with anyio.fail_after(timeout):
+            sock = await anyio.connect_tcp(split.hostname, port, ssl_context=ssl_context,
+                                           autostart_tls=ssl_context is not None,
+                                           tls_standard_compatible=False)
+            try:
+                await sock.send_all(connection.send(request))
+                async for chunk in body:
+                    await sock.send_all(connection.send(h11.Data(data=chunk)))
+                await sock.send_all(connection.send(h11.EndOfMessage()))
+
+                while True:
+                    event = connection.next_event()
+                    if event is h11.NEED_DATA:
+                        connection.receive_data(await sock.receive_some(65536))
+                    elif isinstance(event, h11.Response):
+                        response = event
+                    elif isinstance(event, h11.Data):
+                        content += event.data
+                    elif isinstance(event, (h11.EndOfMessage, h11.ConnectionClosed)):
+                        break
+            finally:
+                await sock.close()
+
+        if response is None:
+            # the retry loop in request() treats this like any other dropped connection
+            raise ServerClosedConnectionError("Connection closed before a response was received")
+
+        response_headers = CaseInsensitiveDict(
+            [(name.decode(), value.decode()) for (name, value) in response.headers]
+        )
+        return Response(encoding="utf-8", http_version=response.http_version.decode(),
+                        status_code=response.status_code,
+                        reason_phrase=response.reason.decode(),
+                        headers=response_headers, body=content, method=method, url=uri)
+
     async def request(self, bucket: object, *args, **kwargs):
         """
         Makes a rate-limited request.
@@ -513,6 +786,33 @@ class HTTPClient(object):
         """
         return await self.request(("PATCH", bucket), method="PATCH", path=url, *args, **kwargs)
 
+    async def stream_download(self, url: str, *,
+                              chunk_size: int = 65536) -> 'typing.AsyncGenerator[bytes, None]':
+        """
+        Downloads a file from the CDN, yielding the content in chunks as it is received.
+
+        This does not go through the ratelimit buckets, as the CDN is not ratelimited.
+
+        :param url: The URL of the file to download.
+        :param chunk_size: The maximum size of each chunk read from the connection.
+        """
+        response = await self.download_session.get(url, stream=True)
+
+        async with response.body as body:
+            if not 200 <= response.status_code < 300:
+                error = {"code": 0, "message": response.reason_phrase}
+                if response.status_code == 403:
+                    raise Forbidden(response, error)
+
+                if response.status_code == 404:
+                    raise NotFound(response, error)
+
+                raise HTTPException(response, error)
+
+            body.read_size = chunk_size
+            async for chunk in body:
+                yield chunk
+
     # Non-generic methods
     async def get_gateway_url(self):
         """
@@ -681,12 +981,14 @@ class HTTPClient(object):
         data = await self.post(url, "messages:{}".format(channel_id), json=payload)
         return data
 
-    async def send_file(self, channel_id: int, file_content: bytes, *,
+    async def send_file(self, channel_id: int,
+                        file_content: 'typing.Union[bytes, os.PathLike, typing.BinaryIO]', *,
                         filename: str = None, content: str = None, embed: dict = None):
         """
         Uploads a file to the current channel.
 
-        This will encode the data as multipart/form-data.
+        This will stream the data as multipart/form-data; see :class:`.MultipartBody` for the
+        types of file content accepted.
 
         :param channel_id: The channel ID to upload to.
         :param file_content: The content of the file being uploaded.
@@ -714,9 +1016,9 @@ class HTTPClient(object):
         payload = {
             "payload_json": json.dumps(payload_json, ensure_ascii=True, separators=(',', ':'))}
 
-        body, headers = encode_multipart(payload, files)
+        body = MultipartBody(payload, files)
         data = await self.post(url, "messages:{}".format(channel_id),
-                               data=body, headers=headers)
+                               data=body, headers=body.headers)
         return data
 
     async def delete_message(self, channel_id: int, message_id: int):
@@ -807,20 +1109,34 @@ class HTTPClient(object):
         data = await self.delete(url, bucket="reactions:{}".format(channel_id))
         return data
 
-    async def get_reaction_users(self, channel_id: int, message_id: int, emoji: str):
+    async def get_reaction_users(self, channel_id: int, message_id: int, emoji: str, *,
+                                 limit: int = None, before: int = None, after: int = None):
         """
         Gets a list of users who reacted to this message with the specified reaction.
 
         :param channel_id: The channel ID to check in.
         :param message_id: The message ID to check.
         :param emoji: The emoji to get reactions for.
+        :param limit: The maximum number of users to return.
+        :param before: Get users before this user ID.
+        :param after: Get users after this user ID.
         """
         url = Endpoints.CHANNEL_MESSAGE_REACTION_EMOJI.format(
             channel_id=channel_id,
             message_id=message_id,
             emoji=emoji)
 
-        data = await self.get(url, bucket="reactions:{}".format(channel_id))
+        params = {}
+        if limit is not None:
+            params["limit"] = str(limit)
+
+        if before is not None:
+            params["before"] = str(before)
+
+        if after is not None:
+            params["after"] = str(after)
+
+        data = await self.get(url, bucket="reactions:{}".format(channel_id), params=params)
         return data
 
     async def pin_message(self, channel_id: int, message_id: int):
@@ -925,6 +1241,17 @@ class HTTPClient(object):
                                json=payload)
         return data
 
+    def bulk(self, guild_id: int, operations: 'typing.Iterable[BulkOperation]',
+             **kwargs) -> BulkExecutor:
+        """
+        Creates a new :class:`.BulkExecutor` for running a batch of moderation operations.
+
+        :param guild_id: The ID of the guild to run the operations in.
+        :param operations: An iterable of :class:`.BulkOperation` to run.
+        :return: A :class:`.BulkExecutor` that can be ran with :meth:`.BulkExecutor.run`.
+        """
+        return BulkExecutor(self, guild_id, operations, **kwargs)
+
     # Profile endpoints
     async def edit_user(self, username: str = None, avatar: str = None,
                         password: str = None):
@@ -950,16 +1277,30 @@ class HTTPClient(object):
         return data
 
     # Moderation
-    async def get_bans(self, guild_id: int):
+    async def get_bans(self, guild_id: int, *,
+                       limit: int = None, before: int = None, after: int = None):
         """
         Gets a list of bans from a guild.
 
         :param guild_id: The guild to get bans from.
+        :param limit: The maximum number of bans to return.
+        :param before: Get bans before this user ID.
+        :param after: Get bans after this user ID.
         :return: A list of user dicts containing ban information.
         """
         url = Endpoints.GUILD_BANS.format(guild_id=guild_id)
 
-        data = await self.get(url, bucket="bans:{}".format(guild_id))
+        params = {}
+        if limit is not None:
+            params["limit"] = str(limit)
+
+        if before is not None:
+            params["before"] = str(before)
+
+        if after is not None:
+            params["after"] = str(after)
+
+        data = await self.get(url, bucket="bans:{}".format(guild_id), params=params)
         return data
 
     async def kick_member(self, guild_id: int, member_id: int):
@@ -1285,6 +1626,21 @@ class HTTPClient(object):
         data = await self.put(url, bucket="member_edit:{}".format(guild_id))
         return data
 
+    async def remove_member_role(self, guild_id: int, member_id: int, role_id: int):
+        """
+        Removes a single role from a member.
+
+        :param guild_id: The guild ID that contains the objects.
+        :param member_id: The member ID to remove the role from.
+        :param role_id: The role ID to remove from the member.
+        """
+        url = Endpoints.GUILD_MEMBER_ROLE.format(guild_id=guild_id,
+                                                 member_id=member_id,
+                                                 role_id=role_id)
+
+        data = await self.delete(url, bucket="member_edit:{}".format(guild_id))
+        return data
+
     async def edit_member_roles(self, guild_id: int, member_id: int,
                                 role_ids: typing.Iterable[int]):
         """
@@ -1681,7 +2037,10 @@ class HTTPClient(object):
     async def execute_webhook(self, webhook_id: int, webhook_token: str, *,
                               content: str = None, embeds: typing.List[typing.Dict] = None,
                               username: str = None, avatar_url: str = None,
-                              wait: bool = False):
+                              wait: bool = False,
+                              file_content: 'typing.Union[bytes, os.PathLike, '
+                                            'typing.BinaryIO]' = None,
+                              filename: str = None):
         """
         Executes a webhook.
 
@@ -1692,6 +2051,8 @@ class HTTPClient(object):
         :param username: The username to override with.
         :param avatar_url: The avatar URL to send.
         :param wait: If we should wait for the message to send.
+        :param file_content: The content of a file to upload with this message, if any.
+        :param filename: The filename of the file being uploaded.
         """
         url = Endpoints.WEBHOOKS_TOKEN.format(webhook_id=webhook_id, token=webhook_token)
         payload = {}
@@ -1710,7 +2071,23 @@ class HTTPClient(object):
 
         # URL params, not payload
         params = {"wait": str(wait)}
-        data = await self.post(url, bucket="webhooks", json=payload, params=params)
+
+        if file_content is not None:
+            files = {
+                "file": {
+                    "filename": filename or "unknown.bin",
+                    "content": file_content
+                }
+            }
+            fields = {
+                "payload_json": json.dumps(payload, ensure_ascii=True, separators=(',', ':'))
+            }
+            body = MultipartBody(fields, files)
+            data = await self.post(url, bucket="webhooks:{}".format(webhook_id), data=body,
+                                   headers=body.headers, params=params)
+        else:
+            data = await self.post(url, bucket="webhooks:{}".format(webhook_id), json=payload,
+                                   params=params)
 
         return data
 
@@ -1947,7 +2324,8 @@ class HTTPClient(object):
 
     async def get_mentions(self, *,
                            guild_id: int = None, limit: int = 25,
-                           roles: bool = True, everyone: bool = True):
+                           roles: bool = True, everyone: bool = True,
+                           before: int = None):
         """
         Gets your recent mentions.
         
@@ -1959,10 +2337,14 @@ class HTTPClient(object):
         :param limit: The maximum number of messages to return.
         :param roles: Should role mentions be included?
         :param everyone: Should @everyone/@here mentions be included?
+        :param before: Get mentions before this message ID.
         """
         url = Endpoints.USER_MENTIONS
         params = {}
 
+        if before is not None:
+            params["before"] = str(before)
+
         if limit is not None:
             params["limit"] = str(limit)
 
@@ -0,0 +1,515 @@
+# This file is part of curious.
+#
+# curious is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# curious is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with curious.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Queued senders that coalesce outgoing messages whilst waiting on ratelimits.
+
+.. currentmodule:: curious.core.outbound
+"""
+import anyio
+import collections
+import enum
+import logging
+import outcome
+import typing
+from typing import Dict, List, Optional
+
+from curious.core import get_current_client
+from curious.util import Promise
+
+logger = logging.getLogger("curious.outbound")
+
+#: The maximum length of the content of a message.
+MAX_CONTENT_LENGTH = 2000
+
+#: The maximum number of embeds in a single webhook message.
+MAX_WEBHOOK_EMBEDS = 10
+
+
+class _PendingMessage(object):
+    """
+    Represents a message waiting to be sent, which may be made up of several merged messages.
+    """
+
+    __slots__ = "content", "embeds", "username", "avatar_url", "count"
+
+    def __init__(self, content: str = None, embeds: List[Dict] = None,
+                 username: str = None, avatar_url: str = None):
+        self.content = content
+        self.embeds = list(embeds) if embeds else []
+        self.username = username
+        self.avatar_url = avatar_url
+
+        #: The number of messages merged into this one.
+        self.count = 1
+
+    def merge(self, other: '_PendingMessage', separator: str) -> bool:
+        """
+        Merges another message into this one, if it fits.
+
+        :return: True if the message was merged, False if it must be sent separately.
+        """
+        if (self.username, self.avatar_url) != (other.username, other.avatar_url):
+            return False
+
+        if len(self.embeds) + len(other.embeds) > MAX_WEBHOOK_EMBEDS:
+            return False
+
+        if self.content and other.content:
+            content = self.content + separator + other.content
+        else:
+            content = self.content or other.content
+
+        if content is not None and len(content) > MAX_CONTENT_LENGTH:
+            return False
+
+        self.content = content
+        self.embeds.extend(other.embeds)
+        self.count += other.count
+        return True
+
+
+class WebhookSender(object):
+    """
+    A queued sender for a webhook, for sending large amounts of messages.
+
+    Messages are placed on a bounded queue, and a background task coalesces pending messages
+    into as few requests as possible, up to the content length and embed limits of a single
+    webhook message. Messages are merged only if they have the same username and avatar URL.
+
+    While a request is waiting on the webhook's ratelimit bucket, more messages pile up and are
+    merged into the next request. If the queue is full, :meth:`.WebhookSender.send` blocks until
+    there is room.
+
+    If a request fails, the messages in it are not sent, and the error is raised from the next
+    call to :meth:`.WebhookSender.send`, or when the ``async with`` block exits.
+
+    .. code-block:: python3
+
+        async with webhook.sender(flush_interval=2) as sender:
+            async for line in log_lines():
+                await sender.send(line)
+
+    """
+
+    def __init__(self, webhook_id: int, token: str, *,
+                 max_pending: int = 1000, flush_interval: float = 1.0,
+                 separator: str = "\n"):
+        """
+        :param webhook_id: The ID of the webhook to send with.
+        :param token: The token of the webhook to send with.
+        :param max_pending: The maximum number of messages that can be waiting to be sent before \
+            callers of :meth:`.WebhookSender.send` are blocked.
+        :param flush_interval: The maximum time, in seconds, to wait for more messages to \
+            merge before a request is made.
+        :param separator: The separator placed between the content of merged messages.
+        """
+        self.webhook_id = webhook_id
+        self.token = token
+        self.flush_interval = flush_interval
+        self.separator = separator
+
+        self._queue = anyio.create_queue(max_pending)
+        # a message that didn't fit in the last batch
+        self._carry: Optional[_PendingMessage] = None
+        # the batch being merged or sent
+        self._batch: Optional[_PendingMessage] = None
+        # the error from a failed request, which hasn't been raised yet
+        self._error: Optional[Exception] = None
+        self._task_group: anyio.TaskGroup = None
+
+        #: The number of messages that have been sent.
+        self.messages_sent = 0
+
+        #: The number of requests that have been made to send messages.
+        self.requests_made = 0
+
+        #: The number of messages that couldn't be sent because their request failed.
+        self.messages_failed = 0
+
+    def __repr__(self) -> str:
+        return "<WebhookSender webhook_id={} pending={}>".format(self.webhook_id, self.pending)
+
+    @property
+    def pending(self) -> int:
+        """
+        :return: The number of messages waiting to be sent.
+        """
+        in_flight = self._batch.count if self._batch is not None else 0
+        return self._queue.qsize() + (self._carry is not None) + in_flight
+
+    def _raise_error(self) -> None:
+        """
+        Raises the error from a failed request, if there is one that hasn't been raised yet.
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    async def send(self, content: str = None, *,
+                   embeds: 'typing.List[typing.Any]' = None,
+                   username: str = None, avatar_url: str = None) -> None:
+        """
+        Queues a message to be sent through this webhook.
+
+        :param content: The content of the message.
+        :param embeds: A list of :class:`.Embed` objects (or embed dicts) to send.
+        :param username: A username to override the default username of the webhook with.
+        :param avatar_url: The URL for the avatar to override the default avatar with.
+        :raises Exception: The error from an earlier request that failed.
+        """
+        if self._task_group is None:
+            raise RuntimeError("This sender is not running - use `async with`")
+
+        self._raise_error()
+
+        if content is not None and not isinstance(content, str):
+            content = str(content)
+
+        if not content and not embeds:
+            raise ValueError("Cannot send an empty message")
+
+        if content and len(content) > MAX_CONTENT_LENGTH:
+            raise ValueError("Content must be less than 2000 characters")
+
+        if embeds:
+            if len(embeds) > MAX_WEBHOOK_EMBEDS:
+                raise ValueError("Cannot send more than 10 embeds in a message")
+
+            embeds = [e if isinstance(e, dict) else e.to_dict() for e in embeds]
+
+        await self._queue.put(_PendingMessage(content, embeds, username, avatar_url))
+
+    async def _flush(self, message: _PendingMessage) -> None:
+        """
+        Sends a batch of merged messages.
+        """
+        try:
+            await get_current_client().http.execute_webhook(
+                self.webhook_id, self.token,
+                content=message.content, embeds=message.embeds or None,
+                username=message.username, avatar_url=message.avatar_url
+            )
+        except Exception as e:
+            logger.exception("Failed to send %d message(s) through webhook %s",
+                             message.count, self.webhook_id)
+            self.messages_failed += message.count
+            # only the first error is kept, as later ones are usually the same
+            if self._error is None:
+                self._error = e
+        else:
+            self.messages_sent += message.count
+            self.requests_made += 1
+
+    async def _run(self) -> None:
+        """
+        Consumes the queue, merging and sending messages until the sender is closed.
+        """
+        closing = False
+        while not closing:
+            if self._carry is not None:
+                batch, self._carry = self._carry, None
+            else:
+                batch = await self._queue.get()
+                if batch is None:
+                    return
+
+            self._batch = batch
+
+            # wait a little while for more messages to merge into this one
+            async with anyio.move_on_after(self.flush_interval):
+                while True:
+                    message = await self._queue.get()
+                    if message is None:
+                        closing = True
+                        break
+
+                    if not batch.merge(message, self.separator):
+                        self._carry = message
+                        break
+
+            await self._flush(batch)
+            self._batch = None
+
+        if self._carry is not None:
+            self._batch, self._carry = self._carry, None
+            await self._flush(self._batch)
+            self._batch = None
+
+    async def __aenter__(self) -> 'WebhookSender':
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+        await self._task_group.spawn(self._run)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                # the sentinel tells the runner to flush what's left and exit
+                await self._queue.put(None)
+            else:
+                await self._task_group.cancel_scope.cancel()
+
+            suppress = await self._task_group.__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            self._task_group = None
+
+        if exc_type is None:
+            self._raise_error()
+
+        return suppress
+
+
+class OverflowPolicy(enum.Enum):
+    """
+    Represents what a :class:`.ChannelSendQueue` does when a message is sent whilst it is full.
+    """
+    #: Wait until there is room in the queue.
+    BLOCK = "block"
+
+    #: Drop the message being sent.
+    DROP_NEWEST = "drop_newest"
+
+    #: Drop the oldest message waiting in the queue.
+    DROP_OLDEST = "drop_oldest"
+
+    #: Merge the message into the newest message waiting in the queue if possible, otherwise
+    #: wait until there is room in the queue.
+    MERGE = "merge"
+
+
+class _QueuedSend(object):
+    """
+    Represents one or more merged sends waiting in a :class:`.ChannelSendQueue`.
+    """
+
+    __slots__ = "content", "tts", "embed", "promises"
+
+    def __init__(self, content: str, tts: bool, embed: dict):
+        self.content = content
+        self.tts = tts
+        self.embed = embed
+
+        #: The promises of every send merged into this one.
+        self.promises = [Promise()]
+
+    @property
+    def mergeable(self) -> bool:
+        """
+        :return: If this is a plain-text send, which can be merged with others.
+        """
+        return bool(self.content) and not self.tts and self.embed is None
+
+    def merge(self, other: '_QueuedSend', separator: str) -> bool:
+        """
+        Merges another send into this one, if both are plain-text and the result fits.
+
+        :return: True if the send was merged.
+        """
+        if not (self.mergeable and other.mergeable):
+            return False
+
+        content = self.content + separator + other.content
+        if len(content) > MAX_CONTENT_LENGTH:
+            return False
+
+        self.content = content
+        self.promises.extend(other.promises)
+        return True
+
+    async def resolve(self, value: typing.Any = None, error: Exception = None) -> None:
+        """
+        Resolves every send in this item with the same result.
+        """
+        for promise in self.promises:
+            # outcomes can only be unwrapped once, so each send gets its own
+            if error is not None:
+                await promise.set(outcome.Error(error))
+            else:
+                await promise.set(outcome.Value(value))
+
+
+class ChannelSendQueue(object):
+    """
+    An outbound message queue for a single channel.
+
+    Sends are placed on a queue and sent in order by a background task. When the channel's
+    message ratelimit bucket is exhausted, the queue waits for the bucket to reset and then merges
+    consecutive plain-text sends that piled up into as few messages as possible, rather than
+    letting latency grow without bound.
+
+    Queues are usually enabled with :meth:`.ChannelMessageWrapper.enable_queue`, after which
+    :meth:`.ChannelMessageWrapper.send` goes through the queue automatically.
+    """
+
+    def __init__(self, channel_id: int, *,
+                 max_depth: int = 50,
+                 policy: OverflowPolicy = OverflowPolicy.MERGE,
+                 separator: str = "\n"):
+        """
+        :param channel_id: The ID of the channel to send messages to.
+        :param max_depth: The maximum number of sends that can be waiting in the queue.
+        :param policy: The :class:`.OverflowPolicy` used when the queue is full.
+        :param separator: The separator placed between the content of merged messages.
+        """
+        if max_depth < 1:
+            raise ValueError("Max depth must be at least 1")
+
+        self.channel_id = channel_id
+        self.max_depth = max_depth
+        self.policy = policy
+        self.separator = separator
+
+        self._pending: typing.Deque[_QueuedSend] = collections.deque()
+        self._condition = anyio.create_condition()
+        self._running = False
+
+        #: The number of sends that have been queued.
+        self.sends_queued = 0
+
+        #: The number of sends that were merged into another send.
+        self.sends_merged = 0
+
+        #: The number of sends that were dropped due to the overflow policy.
+        self.sends_dropped = 0
+
+        #: The number of sends that have been delivered, including merged sends.
+        self.sends_delivered = 0
+
+        #: The number of messages that have actually been sent to Discord.
+        self.messages_sent = 0
+
+    def __repr__(self) -> str:
+        return "<ChannelSendQueue channel_id={} queue_length={}>".format(self.channel_id,
+                                                                         self.queue_length)
+
+    @property
+    def bucket(self) -> tuple:
+        """
+        :return: The ratelimit bucket messages in this channel are sent under.
+        """
+        return "POST", "messages:{}".format(self.channel_id)
+
+    @property
+    def queue_length(self) -> int:
+        """
+        :return: The number of sends waiting in the queue.
+        """
+        return len(self._pending)
+
+    @property
+    def merge_ratio(self) -> float:
+        """
+        :return: The average number of sends per message sent to Discord. A ratio of 1 means \
+            nothing has been merged.
+        """
+        if self.messages_sent == 0:
+            return 1.0
+
+        return self.sends_delivered / self.messages_sent
+
+    async def _enqueue(self, item: _QueuedSend) -> bool:
+        """
+        Places an item on the queue, applying the overflow policy.
+
+        :return: True if the item was queued or merged, False if it was dropped.
+        """
+        async with self._condition:
+            if len(self._pending) >= self.max_depth:
+                if self.policy is OverflowPolicy.DROP_NEWEST:
+                    self.sends_dropped += 1
+                    return False
+
+                if self.policy is OverflowPolicy.DROP_OLDEST:
+                    oldest = self._pending.popleft()
+                    self.sends_dropped += len(oldest.promises)
+                    await oldest.resolve(None)
+
+                elif self.policy is OverflowPolicy.MERGE \
+                        and self._pending[-1].merge(item, self.separator):
+                    self.sends_merged += 1
+                    return True
+
+            while len(self._pending) >= self.max_depth:
+                await self._condition.wait()
+
+            self._pending.append(item)
+            return True
+
+    async def send(self, content: str = None, *,
+                   tts: bool = False, embed: dict = None) -> 'typing.Optional[dict]':
+        """
+        Queues a message to be sent, and waits for it to be sent.
+
+        :param content: The content of the message.
+        :param tts: Should this message be text to speech?
+        :param embed: The embed dict to send with this message.
+        :return: The message data returned by Discord, which will be shared with any other sends \
+            merged into the same message. None if the send was dropped.
+        """
+        item = _QueuedSend(content, tts, embed)
+        promise = item.promises[0]
+        self.sends_queued += 1
+
+        if not await self._enqueue(item):
+            return None
+
+        if not self._running:
+            self._running = True
+            await get_current_client()._spawn_task_internal(self._run)
+
+        result: outcome.Outcome = await promise.wait()
+        return result.unwrap()
+
+    async def _next(self, merge: bool) -> _QueuedSend:
+        """
+        Takes the next item off the queue, merging following items into it if requested.
+        """
+        async with self._condition:
+            item = self._pending.popleft()
+            if merge:
+                while self._pending and item.merge(self._pending[0], self.separator):
+                    self._pending.popleft()
+                    self.sends_merged += 1
+
+            await self._condition.notify_all()
+
+        return item
+
+    async def _run(self) -> None:
+        """
+        Sends items from the queue until it is empty.
+        """
+        http = get_current_client().http
+        try:
+            while self._pending:
+                # if the bucket is exhausted, wait it out here so more sends pile up for merging
+                delay = http.get_ratelimit_delay(self.bucket)
+                if delay > 0:
+                    await anyio.sleep(delay)
+
+                item = await self._next(merge=delay > 0)
+
+                try:
+                    data = await http.send_message(self.channel_id, item.content,
+                                                   tts=item.tts, embed=item.embed)
+                except Exception as e:
+                    await item.resolve(error=e)
+                else:
+                    self.messages_sent += 1
+                    self.sends_delivered += len(item.promises)
+                    await item.resolve(data)
+        finally:
+            self._running = False
@@ -33,6 +33,7 @@ from curious.dataclasses.emoji import Emoji
 from curious.dataclasses.guild import ContentFilterLevel, Guild, MFALevel, NotificationLevel, \
     VerificationLevel
 from curious.dataclasses.member import Member
+from curious.dataclasses.memberstore import MemberStore
 from curious.dataclasses.message import Message
 from curious.dataclasses.permissions import Permissions
 from curious.dataclasses.presence import Presence, Status
@@ -63,7 +64,13 @@ class State(object):
     The other main purpose for this class is to parse events from the Discord websocket.
     """
 
-    def __init__(self, max_messages: int = 500):
+    def __init__(self, max_messages: int = 500,
+                 member_store_factory: typing.Callable[[Guild], MemberStore] = None):
+        """
+        :param max_messages: The maximum number of messages to cache.
+        :param member_store_factory: A callable that takes a :class:`.Guild` and returns the \
+            :class:`.MemberStore` to keep its members in. See :meth:`.make_member_store`.
+        """
         #: The current user of this bot.
         #: This is automatically set after login.
         self._user = None  # type: BotUser
@@ -81,6 +88,9 @@ class State(object):
         #: This is bounded to prevent the message cache from growing infinitely.
         self.messages = collections.deque(maxlen=max_messages)
 
+        #: The callable used to make member stores for guilds, or None for the default.
+        self.member_store_factory = member_store_factory
+
         self.__shards_is_ready = collections.defaultdict(lambda: False)
 
     def is_ready(self, shard_id: int) -> bool:
@@ -236,6 +246,19 @@ class State(object):
         self._users.pop(id, None)
 
     # make_ methods
+    def make_member_store(self, guild: Guild) -> MemberStore:
+        """
+        Creates the member store for a guild. This is called when a guild is created, once its
+        member count is known.
+
+        :param guild: The :class:`.Guild` to create the store for.
+        :return: The :class:`.MemberStore` to keep the guild's members in.
+        """
+        if self.member_store_factory is not None:
+            return self.member_store_factory(guild)
+
+        return MemberStore(guild.id)
+
     def make_webhook(self, event_data: dict) -> Webhook:
         """
         Creates a new webhook object from the event data.
@@ -288,7 +311,7 @@ class State(object):
         :param channel_data: The channel data to cache.
         :return: A new :class:`.Channel`.
         """
-        channel = Channel(**channel_data)
+        channel = Channel._from_payload(channel_data)
         self._private_channels[channel.id] = channel
 
         return channel
@@ -308,7 +331,10 @@ class State(object):
         if id in self._users and not override_cache:
             return self._users[id]
 
-        user = user_klass(**user_data)
+        if user_klass is User:
+            user = User._from_payload(user_data)
+        else:
+            user = user_klass(**user_data)
         self._users[user.id] = user
 
         return user
@@ -321,7 +347,7 @@ class State(object):
         :param cache: Should this message be cached?
         :return: A new :class:`.Message` object for the message.
         """
-        message = Message(**event_data)
+        message = Message._from_payload(event_data)
 
         if message in self.messages and cache is True:
             # don't bother re-caching
@@ -424,6 +450,9 @@ class State(object):
         self._user.discriminator = event_data.get("discriminator", self._user.discriminator)
         self._user.avatar_hash = event_data.get("avatar", self._user.avatar_hash)
 
+        for guild in self._guilds.values():
+            guild._members._reindex(self._user.id)
+
         yield "user_update",
 
     async def handle_presence_update(self, gw: 'gateway.GatewayHandler', event_data: dict):
@@ -460,7 +489,8 @@ class State(object):
             old_member = member._copy()
 
         # Update the member's presence
-        member.presence = Presence(status=event_data.get("status"), game=event_data.get("game", {}))
+        member.presence = Presence.interned(status=event_data.get("status"),
+                                            game=event_data.get("game", {}))
 
         # copy the roles if it exists
         if old_member is not None:
@@ -471,7 +501,7 @@ class State(object):
         roles = event_data.get("roles", fallback)
         if roles:
             # clear roles
-            member.role_ids = [int(rid) for rid in roles]
+            member.role_ids = tuple(int(rid) for rid in roles)
 
         # update the nickname
         if old_member is not None:
@@ -494,9 +524,19 @@ class State(object):
 
         yield "presence_update", old_member, member,
 
-    async def handle_presences_replace(self, gw: 'gateway.GatewayHandler', event_data: dict):
-        # TODO
-        pass
+    async def handle_presences_replace(self, gw: 'gateway.GatewayHandler', event_data: list):
+        """
+        Called when every presence is replaced at once.
+        """
+        for presence in event_data or []:
+            guild = self._guilds.get(int(presence.get("guild_id", 0)))
+            user = presence.get("user")
+            if guild is None or not user:
+                continue
+
+            guild._members.set_presence(int(user["id"]), presence)
+
+        yield "presences_replace",
 
     async def handle_guild_members_chunk(self, gw: 'gateway.GatewayHandler', event_data: dict):
         """
@@ -539,8 +579,8 @@ class State(object):
         guild.shard_id = gw.session.shard_id
         # TODO: Need to do this
         # try:
-        #    guild.me.presence.game = gw.game
-        #    guild.me.presence.status = gw.status
+        #    # presences are shared between members, so set a new one
+        #    guild.me.presence = Presence.interned(status=gw.status, game=gw.game)
         # except AttributeError:
         #    # unavailable guilds etc
         #    pass
@@ -631,9 +671,8 @@ class State(object):
             guild = self._guilds.pop(guild_id, None)
             if guild:
                 yield "guild_leave", guild,
-                for member in guild._members.values():
-                    # use member.id to avoid user lookup
-                    self._check_decache_user(member.id)
+                for member_id in guild._members:
+                    self._check_decache_user(member_id)
 
     async def handle_guild_emojis_update(self, gw: 'gateway.GatewayHandler', event_data: dict):
         """
@@ -861,7 +900,7 @@ class State(object):
         if not guild:
             return
 
-        member = Member(**event_data)
+        member = Member._from_payload(event_data)
         member.guild_id = guild.id
 
         guild._members[member.id] = member
@@ -917,10 +956,10 @@ class State(object):
 
         # Overwrite roles, we want to get rid of any roles that are stale.
         if "roles" in event_data:
-            member.role_ids = [int(i) for i in event_data.get("roles", [])]
+            member.role_ids = tuple(int(i) for i in event_data.get("roles", []))
 
-        guild._members[member.id] = member
         member.nickname = event_data.get("nick", member.nickname.value)
+        guild._members[member.id] = member
 
         yield "guild_member_update", old_member, member,
 
@@ -965,7 +1004,7 @@ class State(object):
         guild_id = int(event_data.get("guild_id", 0))
         guild = self._guilds.get(guild_id)
 
-        channel = Channel(**event_data)
+        channel = Channel._from_payload(event_data)
         if channel.private:
             self._private_channels[channel.id] = channel
         else:
@@ -1037,7 +1076,7 @@ class State(object):
             return
 
         if role_id not in guild._roles:
-            role = Role(**role_data)
+            role = Role._from_payload(role_data)
             role.guild_id = guild.id
             guild._roles[role_id] = role
         else:
@@ -1097,11 +1136,7 @@ class State(object):
             return
 
         # Remove the role from all members.
-        for member in guild.members.values():
-            try:
-                member.role_ids.remove(role.id)
-            except ValueError:
-                continue
+        guild._members.remove_role(role.id)
 
         yield "guild_role_delete", role,
 
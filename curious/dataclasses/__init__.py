@@ -34,6 +34,7 @@ stateful,  as in they store state which allows the user to edit them as appropri
     guild
     invite
     member
+    memberstore
     message
     permissions
     presence
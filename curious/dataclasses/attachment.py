@@ -13,7 +13,14 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with curious.  If not, see <http://www.gnu.org/licenses/>.
 
+import anyio
+import pathlib
+import typing
+from os import PathLike
+
+from curious.core import get_current_client
 from curious.dataclasses.bases import Dataclass
+from curious.util import finalise
 
 
 class Attachment(Dataclass):
@@ -41,10 +48,83 @@ class Attachment(Dataclass):
         #: The width of this attachment, if an image.
         self.width: int = kwargs.get("width")
 
+    async def stream(self, *, chunk_size: int = 65536) -> typing.AsyncGenerator[bytes, None]:
+        """
+        Streams the content of this attachment, without holding the whole file in memory.
+
+        .. code-block:: python3
+
+            async for chunk in attachment.stream():
+                hasher.update(chunk)
+
+        :param chunk_size: The maximum size of each chunk.
+        """
+        http = get_current_client().http
+        async with finalise(http.stream_download(self.url, chunk_size=chunk_size)) as agen:
+            async for chunk in agen:
+                yield chunk
+
     async def download(self) -> bytes:
         """
         Downloads the attachment into bytes.
         """
-        bucket = ("attachment", self.id)
-        data = await get_current_client().http.request(bucket, method="GET", uri=self.proxy_url)
-        return data
+        data = bytearray()
+        async for chunk in self.stream():
+            data += chunk
+
+        return bytes(data)
+
+    async def save(self, fp: 'typing.Union[str, PathLike, typing.BinaryIO]', *,
+                   chunk_size: int = 65536) -> int:
+        """
+        Saves this attachment to a file, streaming it to disk in chunks.
+
+        :param fp: The path or binary file object to write to.
+        :param chunk_size: The maximum size of each chunk.
+        :return: The number of bytes written.
+        """
+        if isinstance(fp, (str, PathLike)):
+            with open(fp, 'wb') as f:
+                return await self.save(f, chunk_size=chunk_size)
+
+        written = 0
+        async for chunk in self.stream(chunk_size=chunk_size):
+            await anyio.run_in_thread(fp.write, chunk)
+            written += len(chunk)
+
+        return written
+
+    @staticmethod
+    async def save_all(attachments: 'typing.Iterable[Attachment]',
+                       directory: 'typing.Union[str, PathLike]', *,
+                       concurrency: int = 4) -> 'typing.List[pathlib.Path]':
+        """
+        Saves many attachments to a directory concurrently.
+
+        Each attachment is saved as ``<id>_<filename>``, so that attachments with the same
+        filename do not overwrite each other.
+
+        :param attachments: An iterable of :class:`.Attachment` to save.
+        :param directory: The directory to save the attachments into.
+        :param concurrency: The maximum number of attachments to download at once.
+        :return: A list of the paths the attachments were saved to, in the same order.
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        directory = pathlib.Path(directory)
+        attachments = list(attachments)
+        paths = [directory / "{}_{}".format(a.id, a.filename) for a in attachments]
+        # workers pull from the same iterator, so no more than `concurrency` files are open
+        pending = iter(zip(attachments, paths))
+
+        async def worker():
+            for attachment, path in pending:
+                await attachment.save(path)
+
+        async with anyio.create_task_group() as tg:
+            tg: anyio.TaskGroup
+            for _ in range(min(concurrency, len(attachments))):
+                await tg.spawn(worker)
+
+        return paths
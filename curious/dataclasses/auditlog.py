@@ -17,14 +17,16 @@ Classes for the audit log.
 
 .. currentmodule:: curious.dataclasses.auditlog
 """
+import datetime
 import enum
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 from curious.core import get_current_client
 from curious.dataclasses import channel as md_channel, guild as md_guild, member as md_member, \
     permissions as dt_permissions, role as md_role
 from curious.dataclasses.bases import Dataclass
 from curious.dataclasses.user import User
+from curious.util import PaginatedIterator, to_snowflake
 
 
 class AuditLogEvent(enum.IntEnum):
@@ -206,7 +208,7 @@ class AuditLogChange(object):
 
         # switch on key
         if key in self.basic_converters:
-            return self.basic_converters[item]
+            return self.basic_converters[key](item)
 
         if key == "permissions_overwrites":
             overwrites = []
@@ -228,7 +230,7 @@ class AuditLogChange(object):
         if key in ["$add", "$remove"]:
             roles = []
             for i in item:
-                role = self._entry._guild.roles[int(i["id"])]
+                role = self._entry._guild.roles.get(int(i["id"]))
                 if role is None:
                     roles.append(i["name"])  # TODO: Make this better?
                 else:
@@ -240,7 +242,7 @@ class AuditLogChange(object):
             return self._entry._view._try_unwrap_member(int(item))
 
         if key in ["widget_channel_id", "afk_channel_id", "channel_id"]:
-            return self._entry._guild.channels.get(item)
+            return self._entry._guild.channels.get(int(item))
 
         # just pass-through the item directly
         return item
@@ -272,7 +274,7 @@ class AuditLogEntry(Dataclass):
         self.event = AuditLogEvent(kwargs.get("action_type"))
 
         #: The "extra" options for this entry.
-        self.extra_options = AuditLogExtra(**kwargs.get("options", {}))
+        self.extra_options = AuditLogExtra(self, **(kwargs.get("options") or {}))
 
         #: The changes for this entry.
         self.changes: List[AuditLogChange] = \
@@ -307,27 +309,130 @@ class AuditLogView(object):
     def __init__(self, guild, **kwargs):
         self._guild = guild
 
+        #: The mapping of user ID -> :class:`.User` for this view.
+        self._users: Dict[int, User] = {}
+
+        # resolved members or users, shared by every entry in this view
+        self._resolved: Dict[int, Union[User, md_member.Member]] = {}
+
+        self._add_users(kwargs.get("users", []))
+
         #: The list of audit log entries for this view.
         self.entries: List[AuditLogEntry] \
-            = [AuditLogEntry(self, **x) for x in kwargs.get("audit_log_entries")]
-
-        #: The list of users for this view.
-        self._users = [User(**data) for data in kwargs.get("users")]
+            = [AuditLogEntry(self, **x) for x in kwargs.get("audit_log_entries", [])]
 
     def __repr__(self):
         return f"<AuditLogView entries={self.entries!r}>"
 
     __str__ = __repr__
 
-    def _try_unwrap_member(self, id: int) -> 'Union[User, md_member.Member]':
+    def _add_users(self, users: List[dict]) -> None:
+        """
+        Adds users returned with a page of audit log entries to this view.
+        """
+        for data in users:
+            user_id = int(data["id"])
+            if user_id not in self._users:
+                self._users[user_id] = User._from_payload(data)
+
+    def _try_unwrap_member(self, id: int) -> 'Union[User, md_member.Member, None]':
         """
         Tries to unwrap an ID into a member or user.
         """
         try:
-            return self._guild.members[id]
+            return self._resolved[id]
         except KeyError:
+            pass
+
+        member = self._guild.members.get(id)
+        if member is None:
             member = get_current_client().state._users.get(id)
             if member is None:
-                return next(filter(lambda user: user.id == id, self._users))
-            else:
-                return member
+                member = self._users.get(id)
+
+        if member is not None:
+            self._resolved[id] = member
+
+        return member
+
+
+class AuditLogIterator(PaginatedIterator[AuditLogEntry]):
+    """
+    Iterates over the audit log of a guild, newest entry first.
+
+    Filters are applied by Discord, and iteration stops once ``after`` is reached, so polling for
+    new entries only fetches the pages that are new. Every entry shares the same
+    :class:`.AuditLogView`, so users and members are only resolved once across every page.
+
+    .. code-block:: python3
+
+        last_seen = None
+        while True:
+            it = guild.audit_log(action_type=AuditLogEvent.MEMBER_BAN_ADD, after=last_seen)
+            async for entry in it:
+                ...
+
+            last_seen = it.newest_id or last_seen
+            await anyio.sleep(60)
+
+    """
+
+    def __init__(self, guild: 'md_guild.Guild', *,
+                 author: 'Union[User, md_member.Member]' = None,
+                 action_type: AuditLogEvent = None,
+                 before: 'Union[int, datetime.datetime]' = None,
+                 after: 'Union[int, datetime.datetime]' = None,
+                 limit: int = -1, prefetch: int = 1):
+        """
+        :param guild: The :class:`.Guild` to iterate over the audit log of.
+        :param author: The :class:`.Member` or :class:`.User` to filter by.
+        :param action_type: The :class:`.AuditLogEvent` to filter by.
+        :param before: The snowflake or datetime to get entries before.
+        :param after: The snowflake or datetime to stop at. Entries at or before this are not \
+            returned.
+        :param limit: The maximum number of entries to return. <= 0 means every entry.
+        :param prefetch: The number of pages to fetch ahead of the consumer.
+        """
+        if isinstance(before, datetime.datetime):
+            before = to_snowflake(before)
+
+        if isinstance(after, datetime.datetime):
+            after = to_snowflake(after)
+
+        super().__init__(self._fetch_entries, transform=self._make_entry, limit=limit,
+                         cursor=before, prefetch=prefetch)
+
+        self._guild = guild
+        self._user_id = author.id if author is not None else None
+        self._action_type = int(action_type) if action_type is not None else None
+
+        #: The entry ID that iteration stops at.
+        self.after = after
+
+        #: The :class:`.AuditLogView` shared by every entry.
+        self.view = AuditLogView(guild)
+
+        #: The ID of the newest entry fetched, which can be used as ``after`` when polling. This
+        #: is None if there were no entries newer than ``after``.
+        self.newest_id: Optional[int] = None
+
+    async def _fetch_entries(self, cursor: Optional[int], limit: int) -> List[dict]:
+        data = await get_current_client().http.get_audit_logs(
+            guild_id=self._guild.id, limit=limit, user_id=self._user_id,
+            action_type=self._action_type, before=cursor
+        )
+        self.view._add_users(data.get("users", []))
+
+        entries = data.get("audit_log_entries", [])
+        if self.after is not None:
+            # a short page stops iteration
+            entries = [entry for entry in entries if int(entry["id"]) > self.after]
+
+        # only entries newer than after count, so polling never moves backwards
+        if entries and self.newest_id is None:
+            self.newest_id = int(entries[0]["id"])
+
+        return entries
+
+    def _make_entry(self, entry: dict) -> AuditLogEntry:
+        return AuditLogEntry(self.view, **entry)
@@ -18,13 +18,16 @@ Wrappers for Channel objects.
 
 .. currentmodule:: curious.dataclasses.channel
 """
+import datetime
 import time
 from math import floor
 
 import anyio
-import collections
 import copy
 import enum
+import inspect
+import io
+import mmap
 import pathlib
 import typing as _typing
 from async_generator import asynccontextmanager
@@ -32,13 +35,17 @@ from os import PathLike
 from types import MappingProxyType
 
 from curious.core import get_current_client
+from curious.core.export import HistoryExporter
+from curious.core.outbound import ChannelSendQueue, OverflowPolicy
 from curious.dataclasses import guild as dt_guild, invite as dt_invite, member as dt_member, \
     message as dt_message, permissions as dt_permissions, role as dt_role, user as dt_user, \
     webhook as dt_webhook
-from curious.dataclasses.bases import Dataclass, Snowflaked
+from curious.dataclasses.bases import Dataclass, Snowflaked, make_parser
 from curious.dataclasses.embed import Embed
-from curious.exc import CuriousError, ErrorCode, Forbidden, HTTPException, PermissionsError
-from curious.util import AsyncIteratorWrapper, base64ify, deprecated, safe_generator
+from curious.exc import CuriousError, ErrorCode, Forbidden, HTTPException, NotFound, \
+    PermissionsError
+from curious.util import AsyncIteratorWrapper, PaginatedIterator, base64ify, deprecated, \
+    safe_generator
 
 
 class ChannelType(enum.IntEnum):
@@ -68,7 +75,7 @@ class ChannelType(enum.IntEnum):
         return self not in [ChannelType.VOICE, ChannelType.CATEGORY]
 
 
-class HistoryIterator(collections.AsyncIterator):
+class HistoryIterator(PaginatedIterator['dt_message.Message']):
     """
     An iterator that allows you to automatically fetch messages and async iterate over them.
 
@@ -86,94 +93,102 @@ class HistoryIterator(collections.AsyncIterator):
             ...
 
     Note that usage 2 will only fill chunks of 100 messages at a time.
+
+    When iterating with ``async for``, the next ``prefetch`` pages are fetched in the background
+    whilst the current page is being consumed. See :class:`.PaginatedIterator` for how the
+    background fetch is stopped.
     """
 
     def __init__(self, channel: 'Channel',
                  max_messages: int = -1, *,
-                 before: int = None, after: int = None):
+                 before: int = None, after: int = None,
+                 prefetch: int = 1, cache: bool = True):
         """
         :param channel: The :class:`.Channel` to iterate over.
         :param max_messages: The maximum number of messages to return. <= 0 means infinite.
         :param before: The message ID to fetch before.
         :param after: The message ID to fetch after.
+        :param prefetch: The number of pages to fetch ahead of the consumer. 0 disables \
+            prefetching.
+        :param cache: If messages should be stored in the message cache. Disable this for large \
+            scans of history, so that old messages don't push recent messages out of the cache.
 
         .. versionchanged:: 0.7.0
 
             Removed the ``client`` parameter.
         """
-        self.channel = channel
+        if isinstance(before, Snowflaked):
+            before = before.id
 
-        #: The current storage of messages.
-        self.messages = collections.deque()
+        if isinstance(after, Snowflaked):
+            after = after.id
+
+        super().__init__(self._fetch_messages, transform=self._make_message, page_size=100,
+                         limit=max_messages, cursor=before or after, prefetch=prefetch)
+
+        self.channel = channel
 
         #: The current count of messages iterated over.
-        #: This is used to know when to automatically fill new messages.
         self.current_count = 0
 
-        #: The maximum amount of messages to use.
-        #: If this is <= 0, an infinite amount of messages are returned.
-        self.max_messages = max_messages
+        #: If messages returned by this iterator are cached.
+        self.cache = cache
 
         #: The message ID of before to fetch.
         self.before = before
-        if isinstance(self.before, Snowflaked):
-            self.before = self.before.id
 
         #: The message ID of after to fetch.
         self.after = after
-        if isinstance(self.after, Snowflaked):
-            self.after = self.after.id
 
-        #: The last message ID that we fetched.
-        if self.before:
-            self.last_message_id = self.before
-        else:
-            self.last_message_id = self.after
+        # if we're walking forwards from ``after`` rather than backwards from ``before``
+        self._forwards = not self.before and self.after is not None
 
-    async def fill_messages(self) -> None:
+    @property
+    def messages(self) -> '_typing.Deque[dt_message.Message]':
         """
-        Called to fill the next <n> messages.
+        :return: The messages that have been fetched, but not iterated over yet.
+        """
+        return self.items
 
-        This is called automatically by :meth:`.__anext__`, but can be used to fill the messages
-        anyway.
+    @property
+    def max_messages(self) -> int:
         """
-        if self.max_messages < 0:
-            to_get = 100
-        else:
-            to_get = self.max_messages - self.current_count
+        :return: The maximum amount of messages to return. If this is <= 0, an infinite amount \
+            of messages are returned.
+        """
+        return self.limit
 
-        if to_get <= 0:
-            return
+    @property
+    def last_message_id(self) -> int:
+        """
+        :return: The ID of the last message fetched, which the next page is fetched from.
+        """
+        return self.cursor
 
-        client = get_current_client()
-        if self.before:
-            messages = await client.http.get_message_history(self.channel.id,
-                                                             before=self.last_message_id,
-                                                             limit=to_get)
-        else:
-            messages = await client.http.get_message_history(self.channel.id,
-                                                             after=self.last_message_id)
-            messages = reversed(messages)
+    async def _fetch_messages(self, cursor: int, limit: int) -> '_typing.List[dict]':
+        http = get_current_client().http
+        if self._forwards:
+            messages = await http.get_message_history(self.channel.id, after=cursor, limit=limit)
+            # the cursor is the last message in the page, so keep pages oldest first
+            return list(reversed(messages))
 
-        for message in messages:
-            self.messages.append(client.state.make_message(message))
+        return await http.get_message_history(self.channel.id, before=cursor, limit=limit)
 
-    async def __anext__(self) -> 'dt_message.Message':
-        self.current_count += 1
-        if self.current_count == self.max_messages:
-            raise StopAsyncIteration
+    def _make_message(self, data: dict) -> 'dt_message.Message':
+        return get_current_client().state.make_message(data, cache=self.cache)
 
-        if len(self.messages) <= 0:
-            await self.fill_messages()
+    async def fill_messages(self) -> None:
+        """
+        Called to fill the next <n> messages.
 
-        try:
-            message = self.messages.popleft()
-        except IndexError:
-            # No messages to fill, so self._fill_messages didn't return any
-            # This signals the end of iteration.
-            raise StopAsyncIteration
-        self.last_message_id = message.id
+        This is called automatically by :meth:`.__anext__`, but can be used to fill the messages
+        anyway.
+        """
+        self._add_page(await self._fetch_page())
 
+    async def __anext__(self) -> 'dt_message.Message':
+        message = await super().__anext__()
+        self.current_count += 1
         return message
 
     def __iter__(self) -> None:
@@ -226,7 +241,8 @@ class ChannelMessageWrapper(object):
 
     def get_history(self, before: int = None,
                     after: int = None,
-                    limit: int = 100) -> HistoryIterator:
+                    limit: int = 100, *,
+                    prefetch: int = 1, cache: bool = True) -> HistoryIterator:
         """
         Gets history for this channel.
 
@@ -241,12 +257,86 @@ class ChannelMessageWrapper(object):
         :param limit: The maximum number of messages to get.
         :param before: The snowflake ID to get messages before.
         :param after: The snowflake ID to get messages after.
+        :param prefetch: The number of pages to fetch ahead whilst iterating.
+        :param cache: If the messages should be stored in the message cache.
+        """
+        if self.channel.guild:
+            if not self.channel.effective_permissions(self.channel.guild.me).read_message_history:
+                raise PermissionsError("read_message_history")
+
+        return HistoryIterator(self.channel, before=before, after=after, max_messages=limit,
+                               prefetch=prefetch, cache=cache)
+
+    def export(self, *,
+               start: '_typing.Union[int, datetime.datetime]' = None,
+               end: '_typing.Union[int, datetime.datetime]' = None,
+               windows: int = 16, concurrency: int = 4) -> HistoryExporter:
+        """
+        Exports history for this channel, fetching several time windows concurrently.
+
+        This returns a :class:`.HistoryExporter`, which must be used with ``async with``.
+
+        .. code-block:: python3
+
+            async with channel.messages.export() as exporter:
+                await exporter.write_ndjson("archive.ndjson")
+
+        :param start: The datetime or snowflake to export from. Defaults to the creation of the \
+            channel.
+        :param end: The datetime or snowflake to export up to. Defaults to the last message in \
+            the channel.
+        :param windows: The number of time windows to split the channel's history into.
+        :param concurrency: The maximum number of windows to fetch at once.
         """
         if self.channel.guild:
             if not self.channel.effective_permissions(self.channel.guild.me).read_message_history:
                 raise PermissionsError("read_message_history")
 
-        return HistoryIterator(self.channel, before=before, after=after, max_messages=limit)
+        if end is None and self.channel._last_message_id is not None:
+            end = self.channel._last_message_id + 1
+
+        return HistoryExporter(get_current_client().http, self.channel.id,
+                               start=start, end=end, windows=windows, concurrency=concurrency)
+
+    @property
+    def queue(self) -> '_typing.Optional[ChannelSendQueue]':
+        """
+        :return: The :class:`.ChannelSendQueue` for this channel, or None if sends are not queued.
+        """
+        return get_current_client().send_queues.get(self.channel.id)
+
+    def enable_queue(self, *, max_depth: int = 50,
+                     policy: OverflowPolicy = OverflowPolicy.MERGE,
+                     separator: str = "\n") -> ChannelSendQueue:
+        """
+        Enables queued sends for this channel.
+
+        Once enabled, :meth:`.ChannelMessageWrapper.send` goes through a :class:`.ChannelSendQueue`.
+        When the channel's ratelimit bucket is exhausted, consecutive plain-text messages waiting in
+        the queue are merged into as few messages as possible, and every merged send returns the
+        same :class:`.Message`. Sends dropped due to the overflow policy return None.
+
+        .. code-block:: python3
+
+            queue = channel.messages.enable_queue(max_depth=20, policy=OverflowPolicy.DROP_OLDEST)
+            ...
+            print(queue.queue_length, queue.merge_ratio)
+
+        :param max_depth: The maximum number of sends that can be waiting in the queue.
+        :param policy: The :class:`.OverflowPolicy` used when the queue is full.
+        :param separator: The separator placed between the content of merged messages.
+        :return: The :class:`.ChannelSendQueue` for this channel.
+        """
+        queue = ChannelSendQueue(self.channel.id, max_depth=max_depth, policy=policy,
+                                 separator=separator)
+        get_current_client().send_queues[self.channel.id] = queue
+        return queue
+
+    def disable_queue(self) -> None:
+        """
+        Disables queued sends for this channel. Sends already in the queue will still be sent.
+        """
+        get_current_client().send_queues.pop(self.channel.id, None)
 
     async def send(self, content: str = None, *,
                    tts: bool = False, embed: 'Embed' = None) -> 'dt_message.Message':
@@ -263,7 +353,8 @@ class ChannelMessageWrapper(object):
         :param content: The content of the message to send.
         :param tts: Should this message be text to speech?
         :param embed: An embed object to send with this message.
-        :return: A new :class:`.Message` object.
+        :return: A new :class:`.Message` object, or None if queued sends are enabled and this \
+            send was dropped.
         """
         if not self.channel.type.has_messages():
             raise CuriousError("Cannot send messages to a voice channel")
@@ -291,8 +382,15 @@ class ChannelMessageWrapper(object):
             embed = embed.to_dict()
 
         client = get_current_client()
-        data = await client.http.send_message(self.channel.id, content,
-                                              tts=tts, embed=embed)
+        queue = client.send_queues.get(self.channel.id)
+        if queue is not None:
+            data = await queue.send(content, tts=tts, embed=embed)
+            if data is None:
+                return None
+        else:
+            data = await client.http.send_message(self.channel.id, content,
+                                                  tts=tts, embed=embed)
+
         obb = client.state.make_message(data, cache=True)
 
         return obb
@@ -314,10 +412,10 @@ class ChannelMessageWrapper(object):
 
         :param fp: Variable.
 
-            - If passed a string or a :class:`os.PathLike`, will open and read the file and
+            - If passed a string or a :class:`os.PathLike`, will stream the file from disk and
             upload it.
-            - If passed bytes, will use the bytes as the file content.
-            - If passed a file-like, will read and use the content to upload.
+            - If passed bytes or a :class:`mmap.mmap`, will use it as the file content.
+            - If passed a binary file-like, will stream the content from it to upload.
 
         :param filename: The filename for the file uploaded. If a path-like or str is passed, \
             will use the filename from that if this is not specified.
@@ -336,24 +434,25 @@ class ChannelMessageWrapper(object):
             if not self.channel.effective_permissions(self.channel.guild.me).attach_files:
                 raise PermissionsError("attach_files")
 
-        if isinstance(fp, bytes):
+        # files are streamed by the http client, so avoid reading them in here
+        if isinstance(fp, (bytes, bytearray, mmap.mmap)):
             file_content = fp
         elif isinstance(fp, pathlib.Path):
             if filename is None:
                 filename = fp.parts[-1]
 
-            file_content = fp.read_bytes()
+            file_content = fp
         elif isinstance(fp, (str, PathLike)):
             path = pathlib.Path(fp)
             if filename is None:
                 filename = path.parts[-1]
 
-            file_content = path.read_bytes()
+            file_content = path
+        elif isinstance(fp, io.TextIOBase):
+            # text files can't be streamed as-is
+            file_content = fp.read().encode("utf-8")
         elif isinstance(fp, _typing.IO) or hasattr(fp, "read"):
-            file_content = fp.read()
-
-            if isinstance(file_content, str):
-                file_content = file_content.encode("utf-8")
+            file_content = fp
         else:
             raise ValueError("Got unknown type for upload")
 
@@ -411,12 +510,22 @@ class ChannelMessageWrapper(object):
                     author: 'dt_member.Member' = None,
                     content: str = None,
                     predicate: '_typing.Callable[[dt_message.Message], bool]' = None,
-                    fallback_from_bulk: bool = False):
+                    fallback_from_bulk: bool = False,
+                    concurrency: int = 4,
+                    progress: '_typing.Callable[[int, int], _typing.Any]' = None) -> int:
         """
         Purges messages from a channel.
         This will attempt to use ``bulk-delete`` if possible, but otherwise will use the normal
         delete endpoint (which can get ratelimited severely!) if ``fallback_from_bulk`` is True.
 
+        Deletion is pipelined with the history scan; each batch of 100 messages is bulk deleted as
+        soon as it fills, whilst the scan carries on.
+
+        Messages older than 14 days can't be bulk deleted. Unless ``fallback_from_bulk`` is True,
+        the purge stops at the first of these, as history is scanned newest first so every
+        message after it is older still. If a delete fails part of the way through, the error is
+        raised but the messages that were already deleted stay deleted.
+
         Example for deleting all messages owned by the bot:
 
         .. code-block:: python3
@@ -440,14 +549,21 @@ class ChannelMessageWrapper(object):
         :param content: Only delete messages that exactly match this content.
         :param predicate: A callable that determines if a message should be deleted.
         :param fallback_from_bulk: If this is True, messages will be regular deleted if they \
-            cannot be bulk deleted.
-        :return: The number of messages deleted.
+            cannot be bulk deleted, including messages that are too old to be bulk deleted.
+        :param concurrency: The maximum number of regular deletes to have in flight at once.
+        :param progress: A callable (or async callable) that is called with \
+            ``(scanned, deleted)`` after every delete.
+        :return: The number of messages deleted, which is less than the number of matching \
+            messages if the purge stopped at a message that was too old to bulk delete.
         """
         if self.channel.guild:
             if not self.channel.effective_permissions(self.channel.guild.me).manage_messages \
                     and not fallback_from_bulk:
                 raise PermissionsError("manage_messages")
 
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
         checks = []
         if author:
             checks.append(lambda m: m.author == author)
@@ -458,47 +574,101 @@ class ChannelMessageWrapper(object):
         if predicate:
             checks.append(predicate)
 
-        to_delete = []
-        history = self.get_history(limit=limit)
-
-        async for message in history:
-            if all(check(message) for check in checks):
-                to_delete.append(message)
+        http = get_current_client().http
+        minimum_allowed = floor((time.time() - 14 * 24 * 60 * 60) * 1000.0 - 1420070400000) << 22
 
+        # batches of ids waiting to be bulk deleted, and single ids waiting to be regular deleted
+        batches = anyio.create_queue(1)
+        singles = anyio.create_queue(concurrency * 2)
         can_bulk_delete = True
+        scanned = 0
+        deleted = 0
 
-        # Split into chunks of 100.
-        message_chunks = [to_delete[i:i + 100] for i in range(0, len(to_delete), 100)]
-        minimum_allowed = floor((time.time() - 14 * 24 * 60 * 60) * 1000.0 - 1420070400000) << 22
-        for chunk in message_chunks:
-            message_ids = []
-            for message in chunk:
-                if message.id < minimum_allowed:
-                    msg = f"Cannot delete message id {message.id} older than {minimum_allowed}"
-                    raise CuriousError(msg)
+        async def report(count: int):
+            nonlocal deleted
+            deleted += count
 
-                message_ids.append(message.id)
+            if progress is not None:
+                res = progress(scanned, deleted)
+                if inspect.isawaitable(res):
+                    await res
+
+        async def bulk_deleter():
+            nonlocal can_bulk_delete
+
+            while True:
+                batch = await batches.get()
+                if batch is None:
+                    for _ in range(concurrency):
+                        await singles.put(None)
+                    return
+
+                if can_bulk_delete and len(batch) > 1:
+                    try:
+                        await http.delete_multiple_messages(self.channel.id, batch)
+                    except Forbidden:
+                        # We might not have MANAGE_MESSAGES.
+                        # Check if we should fallback on normal delete.
+                        can_bulk_delete = False
+                        if not fallback_from_bulk:
+                            # Don't bother, actually.
+                            raise
+                    else:
+                        await report(len(batch))
+                        continue
+
+                for message_id in batch:
+                    await singles.put(message_id)
+
+        async def single_deleter():
+            while True:
+                message_id = await singles.get()
+                if message_id is None:
+                    return
 
-            # First, try and bulk delete all the messages.
-            if can_bulk_delete:
                 try:
-                    await get_current_client().http.delete_multiple_messages(self.channel.id,
-                                                                          message_ids)
-                except Forbidden:
-                    # We might not have MANAGE_MESSAGES.
-                    # Check if we should fallback on normal delete.
-                    can_bulk_delete = False
-                    if not fallback_from_bulk:
-                        # Don't bother, actually.
-                        raise
-
-            # This is an `if not` instead of an `else` because `can_bulk_delete` might've changed.
-            if not can_bulk_delete:
-                # Instead, just delete() the message.
-                for message in chunk:
-                    await message.delete()
-
-        return len(to_delete)
+                    await http.delete_message(self.channel.id, message_id)
+                except NotFound:
+                    # already deleted by someone else
+                    continue
+
+                await report(1)
+
+        async with anyio.create_task_group() as tg:
+            tg: anyio.TaskGroup
+            await tg.spawn(bulk_deleter)
+            for _ in range(concurrency):
+                await tg.spawn(single_deleter)
+
+            batch = []
+            async with self.get_history(limit=limit, cache=False) as history:
+                async for message in history:
+                    scanned += 1
+                    if message.id < minimum_allowed and not fallback_from_bulk:
+                        # history is newest first, so nothing after this can be bulk deleted
+                        # either
+                        break
+
+                    if not all(check(message) for check in checks):
+                        continue
+
+                    if message.id < minimum_allowed:
+                        await singles.put(message.id)
+                        continue
+
+                    batch.append(message.id)
+                    if len(batch) == 100:
+                        await batches.put(batch)
+                        batch = []
+
+            if batch:
+                await batches.put(batch)
+
+            # the bulk deleter stops the single deleters once it's done, as it may hand them
+            # messages
+            await batches.put(None)
+
+        return deleted
 
     async def get(self, message_id: int) -> 'dt_message.Message':
         """
@@ -575,13 +745,7 @@ class Channel(Dataclass):
         self._recipients = {}  # type: _typing.Dict[int, dt_user.User]
 
         if self.private:
-            for recipient in kwargs.get("recipients", []):
-                u = get_current_client().state.make_user(recipient)
-                self._recipients[u.id] = u
-
-            if self.type == ChannelType.GROUP:
-                # append the current user
-                self._recipients[get_current_client().user.id] = get_current_client().user
+            self._add_recipients(kwargs.get("recipients", []))
 
         #: The position of this channel.
         self.position = kwargs.get("position", 0)  # type: int
@@ -613,6 +777,18 @@ class Channel(Dataclass):
 
     __str__ = __repr__
 
+    def _add_recipients(self, recipients: _typing.List[dict]):
+        """
+        Adds the recipients of a private channel.
+        """
+        for recipient in recipients:
+            u = get_current_client().state.make_user(recipient)
+            self._recipients[u.id] = u
+
+        if self.type == ChannelType.GROUP:
+            # append the current user
+            self._recipients[get_current_client().user.id] = get_current_client().user
+
     def _update_overwrites(self, overwrites: _typing.List[dict]):
         """
         Updates the overwrites for this channel.
@@ -1273,3 +1449,26 @@ class Channel(Dataclass):
 
         await get_current_client().http.delete_channel(self.id)
         return self
+
+
+# fast path for making channels from gateway payloads, kept in sync with Channel.__init__
+Channel._from_payload = classmethod(make_parser(Channel, [
+    ("id", 'int(data["id"])'),
+    ("name", 'data.get("name")'),
+    ("topic", 'data.get("topic")'),
+    ("guild_id", 'int(data.get("guild_id", 0)) or None'),
+    ("parent_id", 'int(data["parent_id"]) if data.get("parent_id") is not None else None'),
+    ("type", 'ChannelType(data.get("type", 0))'),
+    ("_messages", 'None'),
+    ("nsfw", 'data.get("nsfw", False)'),
+    ("rate_limit_per_user", 'data.get("rate_limit_per_user", 0)'),
+    ("_recipients", '{}'),
+    ("position", 'data.get("position", 0)'),
+    ("_last_message_id", 'int(data["last_message_id"]) if data.get("last_message_id") else None'),
+    ("owner_id", 'int(data.get("owner_id", 0)) or None'),
+    ("icon_hash", 'data.get("icon")'),
+    ("_overwrites", '{}'),
+], globals(), after=[
+    'if self.private:',
+    '    self._add_recipients(data.get("recipients", []))',
+]))
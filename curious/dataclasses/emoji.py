@@ -22,7 +22,7 @@ Wrappers for custom emojis in guilds.
 import typing
 
 from curious.dataclasses import guild as dt_guild, role as dt_role
-from curious.dataclasses.bases import Dataclass
+from curious.dataclasses.bases import Dataclass, make_parser
 
 
 class Emoji(Dataclass):
@@ -117,3 +117,15 @@ class Emoji(Dataclass):
             return f"{cdn_url}.png"
 
         return f"{cdn_url}.gif"
+
+
+# fast path for making emojis from gateway payloads, kept in sync with Emoji.__init__
+Emoji._from_payload = classmethod(make_parser(Emoji, [
+    ("id", 'int(data["id"])'),
+    ("name", 'data.get("name")'),
+    ("role_ids", 'data.get("roles", [])'),
+    ("require_colons", 'data.get("require_colons", False)'),
+    ("managed", 'data.get("managed", False)'),
+    ("guild_id", 'None'),
+    ("animated", 'data.get("animated", False)'),
+], globals()))
@@ -34,14 +34,16 @@ from types import MappingProxyType
 from typing import Union
 
 from curious.core import get_current_client
+from curious.core.bulk import BulkExecutor, BulkOperation, BulkResult
 from curious.core.httpclient import Endpoints
 from curious.dataclasses import auditlog as dt_auditlog, channel as dt_channel, emoji as dt_emoji, \
     invite as dt_invite, member as dt_member, permissions as dt_permissions, role as dt_role, \
     search as dt_search, user as dt_user, voice_state as dt_vs, webhook as dt_webhook
 from curious.dataclasses.bases import Dataclass
-from curious.dataclasses.presence import Presence, Status
+from curious.dataclasses.memberstore import MemberStore
+from curious.dataclasses.presence import Status
 from curious.exc import CuriousError, HTTPException, HierarchyError, PermissionsError
-from curious.util import AsyncIteratorWrapper, base64ify, deprecated
+from curious.util import AsyncIteratorWrapper, PaginatedIterator, base64ify, deprecated
 
 default_var = typing.TypeVar("default_var")
 
@@ -436,7 +438,8 @@ class GuildRoleWrapper(_WrapperBase):
         if not self._guild.me.guild_permissions.manage_roles:
             raise PermissionsError("manage_roles")
 
-        role_obb = dt_role.Role(**(await get_current_client().http.create_role(self._guild.id)))
+        role_data = await get_current_client().http.create_role(self._guild.id)
+        role_obb = dt_role.Role._from_payload(role_data)
         self._guild._roles[role_obb.id] = role_obb
         role_obb.guild_id = self._guild.id
         return await role_obb.edit(**kwargs)
@@ -512,7 +515,7 @@ class GuildEmojiWrapper(_WrapperBase):
                                                                         name=name,
                                                                         image_data=image_data,
                                                                         roles=roles)
-        emoji = dt_emoji.Emoji(**emoji_data)
+        emoji = dt_emoji.Emoji._from_payload(emoji_data)
         return emoji
 
 
@@ -542,21 +545,26 @@ class GuildBanContainer(object):
     def __init__(self, guild: 'Guild'):
         self._guild = guild
 
-    async def __aiter__(self) -> 'typing.AsyncGenerator[GuildBan]':
+    def __aiter__(self) -> 'PaginatedIterator[GuildBan]':
         if not self._guild.me.guild_permissions.ban_members:
             raise PermissionsError("ban_members")
 
-        bans = await get_current_client().http.get_bans(self._guild.id)
+        client = get_current_client()
 
-        for ban in bans:
+        async def fetch(cursor: int, limit: int):
+            return await client.http.get_bans(self._guild.id, after=cursor, limit=limit)
+
+        def make_ban(ban: dict) -> GuildBan:
             user_data = ban.get("user", None)
             if user_data is None:
-                continue
+                return None
+
+            user = client.state.make_user(user_data)
+            client.state._check_decache_user(user.id)
+            return GuildBan(reason=ban.get("reason", None), victim=user)
 
-            user = get_current_client().state.make_user(user_data)
-            get_current_client().state._check_decache_user(user.id)
-            ban = GuildBan(reason=ban.get("reason", None), user=user)
-            yield ban
+        return PaginatedIterator(fetch, transform=make_ban, page_size=1000,
+                                 key=lambda ban: int(ban["user"]["id"]))
 
     async def add(self, victim: 'typing.Union[dt_user.User, dt_member.Member]', *,
                   delete_message_days: int, reason: str = None) -> GuildBan:
@@ -664,6 +672,16 @@ class GuildBanContainer(object):
         return [ban async for ban in self]
 
 
+def _bulk_id(target: 'typing.Union[Dataclass, int]') -> int:
+    """
+    Gets the ID of a target for a bulk operation.
+    """
+    if isinstance(target, int):
+        return target
+
+    return target.id
+
+
 class Guild(Dataclass):
     """
     Represents a guild object on Discord.
@@ -737,8 +755,8 @@ class Guild(Dataclass):
 
         #: The roles that this guild has.
         self._roles = {}
-        #: The members of this guild.
-        self._members = {}
+        #: The :class:`.MemberStore` holding the members of this guild.
+        self._members = MemberStore(self.id)
         #: The channels of this guild.
         self._channels = {}
         #: The emojis that this guild has.
@@ -793,6 +811,13 @@ class Guild(Dataclass):
     def members(self) -> 'typing.Mapping[int, dt_member.Member]':
         """
         :return: A mapping of :class:`.Member` that represent members on this guild.
+
+        .. note::
+
+            If this guild uses a :class:`.ColumnarMemberStore`, each :class:`.Member` is a
+            snapshot of its row in the store. Changes made to the object itself are lost once
+            nothing references it any more, as the next lookup makes a new object from the row.
+            Changes from the gateway are written to the store, so they are always kept.
         """
         return MappingProxyType(self._members)
 
@@ -869,17 +894,29 @@ class Guild(Dataclass):
         """
         :return: The number of members with a non-Invisible presence. 
         """
-        return sum(1 for member in self._members.values() if member.status is not Status.OFFLINE)
+        return len(self._members) - self._members.status_count(Status.OFFLINE)
+
+    def status_count(self, status: Status) -> int:
+        """
+        Gets the number of members with the specified status.
+
+        The members of each status are tracked as presences come in, so this doesn't go through
+        every member.
+
+        :param status: The :class:`.Status` to count.
+        :return: The number of members with that status.
+        """
+        return self._members.status_count(Status(status))
 
     # Presence methods
     def members_with_status(self, status: Status) \
             -> 'typing.Generator[dt_member.Member, None, None]':
         """
         A generator that returns the members that match the specified status.
+
+        Only the members with the status are looked up, except for offline members.
         """
-        for member in self.members.values():
-            if member.status == status:
-                yield member
+        yield from self._members.with_status(Status(status))
 
     @property
     def online_members(self) -> 'typing.Generator[dt_member.Member, None, None]':
@@ -943,6 +980,9 @@ class Guild(Dataclass):
             Using a username and discriminator pair is most accurate when finding a user; a
             nickname pair or not providing one of the arguments might not find the right member.
 
+        Names are looked up in an index, which is made on the first search. Exact matches are
+        preferred, then case-insensitive matches.
+
         :return: A :class:`.Member` that matched, or None if no matches were found.
         """
         if full_name is not None:
@@ -957,16 +997,7 @@ class Guild(Dataclass):
         if isinstance(discriminator, int):
             discriminator = "{:04d}".format(discriminator)
 
-        for member in self._members.values():
-            # ensure discrim matches first
-            if discriminator is not None and discriminator != member.user.discriminator:
-                continue
-
-            if member.user.username == name:
-                return member
-
-            if member.nickname == name:
-                return member
+        return self._members.search(name, discriminator)
 
     @deprecated(since="0.7.0", see_instead=search_for_member, removal="0.9.0")
     def find_member(self, search_str: str) -> 'dt_member.Member':
@@ -983,15 +1014,23 @@ class Guild(Dataclass):
         sp = search_str.rsplit("#", 1)
         if len(sp) == 1:
             # Member name only :(
-            predicate = lambda member: member.user.name == sp[0] or member.nickname == sp[0]
-        else:
-            # Discriminator too!
-            # Don't check nicknames for this.
-            predicate = lambda member: member.user.name == sp[0] \
-                                       and member.user.discriminator == sp[1]
+            return self._members.search(sp[0])
+
+        # Discriminator too!
+        # Don't check nicknames for this.
+        return self._members.search(sp[0], sp[1], nicknames=False)
+
+    def members_by_prefix(self, prefix: str, *,
+                          limit: int = 25) -> 'typing.List[dt_member.Member]':
+        """
+        Finds members with a username, nickname or ``username#discriminator`` starting with the
+        specified prefix, ignoring case. This is useful for autocompleting member names.
 
-        filtered = filter(predicate, self.members.values())
-        return next(filtered, None)
+        :param prefix: The prefix to search for.
+        :param limit: The maximum number of members to return.
+        :return: A list of :class:`.Member` that matched, sorted by the name that matched.
+        """
+        return self._members.search_prefix(prefix, limit)
 
     # creation methods
     def start_chunking(self) -> None:
@@ -1022,15 +1061,7 @@ class Guild(Dataclass):
             self._chunks_left -= 1
 
         for member_data in members:
-            member_id = int(member_data["user"]["id"])
-            if member_id in self._members:
-                member_obj = self._members[member_id]
-            else:
-                member_obj = dt_member.Member(**member_data)
-                self._members[member_obj.id] = member_obj
-
-            member_obj.nickname = member_data.get("nick", member_obj.nickname)
-            member_obj.guild_id = self.id
+            self._members.add_payload(member_data)
 
     def _handle_emojis(self, emojis: typing.List[dict]):
         """
@@ -1039,7 +1070,7 @@ class Guild(Dataclass):
         :param emojis: A list of emoji objects from Discord.
         """
         for emoji in emojis:
-            emoji_obj = dt_emoji.Emoji(**emoji)
+            emoji_obj = dt_emoji.Emoji._from_payload(emoji)
             self._emojis[emoji_obj.id] = emoji_obj
             emoji_obj.guild_id = self.id
 
@@ -1077,9 +1108,13 @@ class Guild(Dataclass):
 
         self.member_count = data.get("member_count", 0)
 
+        if not self._members:
+            # now the member count is known, the state can pick how to store members
+            self._members = get_current_client().state.make_member_store(self)
+
         # Create all the Role objects for the server.
         for role_data in data.get("roles", []):
-            role_obj = dt_role.Role(**role_data)
+            role_obj = dt_role.Role._from_payload(role_data)
             role_obj.guild_id = self.id
             self._roles[role_obj.id] = role_obj
 
@@ -1087,17 +1122,11 @@ class Guild(Dataclass):
         self._handle_member_chunk(data.get("members", []))
 
         for presence in data.get("presences", []):
-            member_id = int(presence["user"]["id"])
-            member_obj = self._members.get(member_id)
-
-            if not member_obj:
-                continue
-
-            member_obj.presence = Presence(**presence)
+            self._members.set_presence(int(presence["user"]["id"]), presence)
 
         # Create all of the channel objects.
         for channel_data in data.get("channels", []):
-            channel_obj = dt_channel.Channel(**channel_data)
+            channel_obj = dt_channel.Channel._from_payload(channel_data)
             self._channels[channel_obj.id] = channel_obj
             channel_obj.guild_id = self.id
             channel_obj._update_overwrites(channel_data.get("permission_overwrites", []), )
@@ -1179,6 +1208,41 @@ class Guild(Dataclass):
 
         return invites
 
+    def get_members(self, *, limit: int = -1,
+                    after: int = None) -> 'PaginatedIterator[dt_member.Member]':
+        """
+        Fetches the members of this guild from the API, one page at a time.
+
+        This is *not* an async function - it returns a :class:`.PaginatedIterator` which can be
+        async iterated over. Members that aren't already cached are not added to the cache, and
+        neither are their users, so this can be used to scan huge guilds in constant memory.
+
+        .. code-block:: python3
+
+            async for member in guild.get_members():
+                print(member.name)
+
+        :param limit: The maximum number of members to fetch. <= 0 means every member.
+        :param after: The member ID to fetch members after.
+        """
+        client = get_current_client()
+
+        async def fetch(cursor: int, limit: int):
+            return await client.http.get_guild_members(self.id, after=cursor, limit=limit)
+
+        def make_member(member_data: dict) -> 'dt_member.Member':
+            member_id = int(member_data["user"]["id"])
+            member = self._members.get(member_id)
+            if member is None:
+                # don't cache the user, or check if it should be decached once this member dies
+                member = dt_member._DetachedMember._from_payload(member_data)
+                member.guild_id = self.id
+
+            return member
+
+        return PaginatedIterator(fetch, transform=make_member, page_size=1000, limit=limit,
+                                 cursor=after, key=lambda member: int(member["user"]["id"]))
+
     async def kick(self, victim: 'dt_member.Member'):
         """
         Kicks somebody from the guild.
@@ -1201,6 +1265,113 @@ class Guild(Dataclass):
 
         await get_current_client().http.kick_member(self.id, victim_id)
 
+    def bulk(self, operations: 'typing.Iterable[BulkOperation]', *,
+             concurrency: int = 5,
+             progress: 'typing.Callable[[int, int], typing.Any]' = None,
+             completed: 'typing.Iterable[tuple]' = None) -> BulkExecutor:
+        """
+        Creates a :class:`.BulkExecutor` that runs a batch of moderation operations in this guild.
+
+        .. code-block:: python3
+
+            ops = [BulkOperation.ban(id, reason="raid") for id in raider_ids]
+            results = await guild.bulk(ops, concurrency=10).run()
+
+        :param operations: An iterable of :class:`.BulkOperation` to run.
+        :param concurrency: The maximum number of operations to have in flight at once.
+        :param progress: A callable that is called with ``(done, total)`` as operations finish.
+        :param completed: The :attr:`.BulkExecutor.completed` keys of a previous run, to resume.
+        :return: A :class:`.BulkExecutor` for the operations.
+        """
+        return get_current_client().http.bulk(self.id, operations,
+                                              concurrency=concurrency, progress=progress,
+                                              completed=completed)
+
+    def _check_bulk_role(self, role: 'dt_role.Role') -> None:
+        """
+        Checks if a role can be bulk added or removed.
+        """
+        if not self.me.guild_permissions.manage_roles:
+            raise PermissionsError("manage_roles")
+
+        if role >= self.me.top_role:
+            raise HierarchyError("Cannot edit role {} - it has a higher or equal position to our "
+                                 "top role".format(role.name))
+
+    async def bulk_add_role(self, role: 'dt_role.Role',
+                            members: 'typing.Iterable[typing.Union[dt_member.Member, int]]',
+                            **kwargs) -> 'typing.List[BulkResult]':
+        """
+        Adds a role to many members at once.
+
+        This takes the same keyword arguments as :meth:`.Guild.bulk`.
+
+        :param role: The :class:`.Role` to add.
+        :param members: An iterable of :class:`.Member` objects or member IDs.
+        :return: A list of :class:`.BulkResult` for each member.
+        """
+        self._check_bulk_role(role)
+
+        operations = (BulkOperation.add_role(_bulk_id(m), role.id) for m in members)
+        return await self.bulk(operations, **kwargs).run()
+
+    async def bulk_remove_role(self, role: 'dt_role.Role',
+                               members: 'typing.Iterable[typing.Union[dt_member.Member, int]]',
+                               **kwargs) -> 'typing.List[BulkResult]':
+        """
+        Removes a role from many members at once.
+
+        This takes the same keyword arguments as :meth:`.Guild.bulk`.
+
+        :param role: The :class:`.Role` to remove.
+        :param members: An iterable of :class:`.Member` objects or member IDs.
+        :return: A list of :class:`.BulkResult` for each member.
+        """
+        self._check_bulk_role(role)
+
+        operations = (BulkOperation.remove_role(_bulk_id(m), role.id) for m in members)
+        return await self.bulk(operations, **kwargs).run()
+
+    async def bulk_kick(self, members: 'typing.Iterable[typing.Union[dt_member.Member, int]]',
+                        **kwargs) -> 'typing.List[BulkResult]':
+        """
+        Kicks many members at once.
+
+        This takes the same keyword arguments as :meth:`.Guild.bulk`.
+
+        :param members: An iterable of :class:`.Member` objects or member IDs.
+        :return: A list of :class:`.BulkResult` for each member.
+        """
+        if not self.me.guild_permissions.kick_members:
+            raise PermissionsError("kick_members")
+
+        operations = (BulkOperation.kick(_bulk_id(m)) for m in members)
+        return await self.bulk(operations, **kwargs).run()
+
+    async def bulk_ban(self,
+                       victims: 'typing.Iterable[typing.Union[dt_member.Member, dt_user.User, '
+                                'int]]', *,
+                       delete_message_days: int = 0, reason: str = None,
+                       **kwargs) -> 'typing.List[BulkResult]':
+        """
+        Bans many users at once.
+
+        This takes the same keyword arguments as :meth:`.Guild.bulk`.
+
+        :param victims: An iterable of :class:`.Member`, :class:`.User` objects or user IDs.
+        :param delete_message_days: The number of days of messages to delete for each user.
+        :param reason: The reason given for banning.
+        :return: A list of :class:`.BulkResult` for each user.
+        """
+        if not self.me.guild_permissions.ban_members:
+            raise PermissionsError("ban_members")
+
+        operations = (
+            BulkOperation.ban(_bulk_id(v), delete_message_days=delete_message_days, reason=reason)
+            for v in victims
+        )
+        return await self.bulk(operations, **kwargs).run()
+
     @deprecated(since="0.7.0", see_instead=GuildBanContainer.add, removal="0.9.0")
     async def ban(self, victim: 'typing.Union[dt_member.Member, dt_user.User]', *,
                   delete_message_days: int = 7) -> GuildBan:
@@ -1282,6 +1453,36 @@ class Guild(Dataclass):
                                                                 before=before)
         return dt_auditlog.AuditLogView(self, **result)
 
+    def audit_log(self, *,
+                  author: 'Union[dt_user.User, dt_member.Member]' = None,
+                  action_type: 'dt_auditlog.AuditLogEvent' = None,
+                  before: 'Union[int, datetime.datetime]' = None,
+                  after: 'Union[int, datetime.datetime]' = None,
+                  limit: int = -1) -> 'dt_auditlog.AuditLogIterator':
+        """
+        Iterates over the audit log for this guild, newest entry first.
+
+        This is *not* an async function - it returns a :class:`.AuditLogIterator` which can be
+        async iterated over.
+
+        .. code-block:: python3
+
+            async for entry in guild.audit_log(action_type=AuditLogEvent.MEMBER_KICK):
+                print(entry.author, "kicked", entry.target_id)
+
+        :param author: The :class:`.Member` or :class:`.User` to filter by.
+        :param action_type: The :class:`.AuditLogEvent` to filter by.
+        :param before: The snowflake or datetime to look for entries before.
+        :param after: The snowflake or datetime to stop at.
+        :param limit: The maximum number of entries to return. <= 0 means every entry.
+        :return: An :class:`.AuditLogIterator` for this guild.
+        """
+        if not self.me.guild_permissions.view_audit_log:
+            raise PermissionsError("view_audit_log")
+
+        return dt_auditlog.AuditLogIterator(self, author=author, action_type=action_type,
+                                            before=before, after=after, limit=limit)
+
     async def get_webhooks(self) -> 'typing.List[dt_webhook.Webhook]':
         """
         Gets the webhooks for this guild.
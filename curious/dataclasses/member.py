@@ -26,7 +26,7 @@ from typing import List, Optional
 from curious.core import get_current_client
 from curious.dataclasses import guild as dt_guild, role as dt_role, user as dt_user, \
     voice_state as dt_vs
-from curious.dataclasses.bases import Dataclass
+from curious.dataclasses.bases import Dataclass, make_parser
 from curious.dataclasses.permissions import Permissions
 from curious.dataclasses.presence import Game, Presence, Status
 from curious.exc import HierarchyError, PermissionsError
@@ -37,6 +37,9 @@ class Nickname(object):
     """
     Represents the nickname of a :class:`.Member`.
     """
+
+    __slots__ = ("parent", "value")
+
     def __init__(self, parent: 'Member', value: str):
         self.parent = parent
         self.value = value
@@ -120,6 +123,8 @@ class MemberRoleContainer(collections.Sequence):
     Represents the roles of a :class:`.Member`.
     """
 
+    __slots__ = ("_member",)
+
     def __init__(self, member: 'Member'):
         self._member = member
 
@@ -244,11 +249,12 @@ class Member(Dataclass):
         super().__init__(kwargs["user"]["id"])
 
         # copy user data for when the user is decached
-        self._user_data = kwargs["user"]
+        self._user_data = dt_user._intern_user_data(kwargs["user"])
         get_current_client().state.make_user(self._user_data)
 
-        #: An iterable of role IDs this member has.
-        self.role_ids = [int(rid) for rid in kwargs.get("roles", [])]
+        #: A tuple of role IDs this member has.
+        #: This is shared with other members of the guild with the same roles.
+        self.role_ids = tuple(int(rid) for rid in kwargs.get("roles", []))
 
         #: A :class:`._MemberRoleContainer` that represents the roles of this member.
         self.roles = MemberRoleContainer(self)
@@ -264,8 +270,9 @@ class Member(Dataclass):
         self.guild_id = None  # type: int
 
         #: The current :class:`.Presence` of this member.
-        self.presence = Presence(status=kwargs.get("status", Status.OFFLINE),
-                                 game=kwargs.get("game", None))
+        #: This is shared with other members with the same presence.
+        self.presence = Presence.interned(status=kwargs.get("status", Status.OFFLINE),
+                                          game=kwargs.get("game", None))
 
     @property
     def guild(self) -> 'dt_guild.Guild':
@@ -316,14 +323,20 @@ class Member(Dataclass):
         """
         new_object = copy.copy(self)
         new_object.roles = MemberRoleContainer(new_object)
-        new_object.role_ids = self.role_ids.copy()
         new_object._nickname = copy.copy(self._nickname)
 
         return new_object
 
     def __del__(self):
         try:
-            get_current_client().state._check_decache_user(self.id)
+            client = get_current_client()
+            guild = client.guilds.get(self.guild_id)
+            # copies and member store lookups die all the time, so skip the full scan of every
+            # guild if this member is still in theirs
+            if guild is not None and self.id in guild._members:
+                return
+
+            client.state._check_decache_user(self.id)
         except (AttributeError, LookupError):
             # during shutdown
             pass
@@ -337,7 +350,7 @@ class Member(Dataclass):
             return get_current_client().state._users[self.id]
         except KeyError:
             # don't go through make_user as it'll cache it
-            return dt_user.User(**self._user_data)
+            return dt_user.User._from_payload(self._user_data)
 
     @property
     def name(self) -> str:
@@ -441,3 +454,37 @@ class Member(Dataclass):
         Kicks this member from the guild.
         """
         return await self.guild.kick(self)
+
+
+class _DetachedMember(Member):
+    """
+    A member that was fetched from the API, and isn't kept in any guild's member store.
+
+    Its user isn't cached, so :attr:`.Member.user` is made from the member's own user data, and it
+    doesn't check if its user should be decached when it dies.
+    """
+
+    __slots__ = ()
+
+    def __del__(self):
+        pass
+
+
+# fast path for making members from gateway payloads, kept in sync with Member.__init__
+_MEMBER_FIELDS = [
+    ("id", 'int(data["user"]["id"])'),
+    ("_user_data", 'dt_user._intern_user_data(data["user"])'),
+    ("role_ids", 'tuple(int(rid) for rid in data.get("roles", ()))'),
+    ("roles", 'MemberRoleContainer(self)'),
+    ("joined_at", 'to_datetime(data.get("joined_at"))'),
+    ("_nickname", 'Nickname(self, data.get("nick"))'),
+    ("guild_id", 'None'),
+    ("presence", 'Presence.interned(status=data.get("status", Status.OFFLINE), '
+                 'game=data.get("game"))'),
+]
+
+Member._from_payload = classmethod(make_parser(Member, _MEMBER_FIELDS, globals(), after=[
+    'get_current_client().state.make_user(self._user_data)',
+]))
+_DetachedMember._from_payload = classmethod(make_parser(_DetachedMember, _MEMBER_FIELDS,
+                                                        globals()))
@@ -0,0 +1,958 @@
+# This file is part of curious.
+#
+# curious is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# curious is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with curious.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Storage for the members of a :class:`.Guild`.
+
+By default, every member of a guild is kept as a :class:`.Member` in a :class:`.MemberStore`. For
+very large guilds, one of these can be used instead:
+
+- :class:`.LazyMemberStore`, which keeps member chunks as they are and makes each
+  :class:`.Member` the first time it is looked up.
+- :class:`.ColumnarMemberStore`, which keeps members in typed arrays and makes :class:`.Member`
+  objects whenever they are looked up.
+
+The store used for each guild is picked by :meth:`.State.make_member_store`:
+
+.. code-block:: python3
+
+    def member_store(guild: Guild) -> MemberStore:
+        if guild.member_count >= 100_000:
+            return ColumnarMemberStore(guild.id)
+
+        return MemberStore(guild.id)
+
+    client.state.member_store_factory = member_store
+
+.. currentmodule:: curious.dataclasses.memberstore
+"""
+import bisect
+import collections.abc
+import datetime
+import itertools
+import weakref
+from array import array
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Tuple, Union
+
+from curious.core import get_current_client
+from curious.dataclasses import member as dt_member, user as dt_user
+from curious.dataclasses.presence import Game, OFFLINE, Presence, Status
+from curious.util import to_datetime
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+# joined_at is stored as microseconds since the epoch, which is exact for any datetime
+_NO_DATE = -1
+
+_STATUSES = tuple(Status)
+_STATUS_INDEXES = {status: index for (index, status) in enumerate(_STATUSES)}
+# offline members aren't kept in a bucket, as most members of large guilds are offline
+_BUCKETED_STATUSES = tuple(status for status in Status if status is not Status.OFFLINE)
+
+
+def _fold(value: str) -> str:
+    folded = value.casefold()
+    # reuse the (deduplicated) original where possible
+    return value if folded == value else folded
+
+
+class _NameIndex(object):
+    """
+    An index of members by their casefolded username, nickname and ``username#discriminator``.
+
+    Each key maps to a member ID, or a dict of member IDs (used as an ordered set) when several
+    members share it. The sorted list of keys used for prefix lookups is only made when it's
+    needed, and is then kept up to date.
+    """
+
+    __slots__ = ("_ids", "_member_keys", "_sorted")
+
+    def __init__(self):
+        self._ids = {}  # type: Dict[str, Union[int, Dict[int, None]]]
+        self._member_keys = {}  # type: Dict[int, Tuple[str, ...]]
+        self._sorted = None  # type: List[str]
+
+    def __len__(self) -> int:
+        return len(self._member_keys)
+
+    def add(self, member_id: int, username: str, discriminator: str, nick: str, *,
+            keep_sorted: bool = True) -> None:
+        """
+        Indexes a member, replacing any previous entry.
+
+        :param keep_sorted: If the sorted keys should be updated. When adding many members at \
+            once, it's faster to drop them, and sort again when next needed.
+        """
+        keys = []
+        if username:
+            keys.append(_fold(username))
+            if discriminator:
+                keys.append(_fold("{}#{}".format(username, discriminator)))
+        if nick:
+            keys.append(_fold(nick))
+
+        # a nickname often folds to the same key as the username
+        keys = tuple(dict.fromkeys(keys))
+        old_keys = self._member_keys.get(member_id, ())
+        if keys == old_keys:
+            return
+
+        if not keep_sorted:
+            self._sorted = None
+
+        self.remove(member_id)
+        self._member_keys[member_id] = keys
+        for key in keys:
+            ids = self._ids.get(key)
+            if ids is None:
+                self._ids[key] = member_id
+                if self._sorted is not None:
+                    bisect.insort(self._sorted, key)
+            elif type(ids) is dict:
+                ids[member_id] = None
+            elif ids != member_id:
+                self._ids[key] = {ids: None, member_id: None}
+
+    def remove(self, member_id: int) -> None:
+        """
+        Removes a member from the index, if they are in it.
+        """
+        for key in self._member_keys.pop(member_id, ()):
+            ids = self._ids.get(key)
+            if type(ids) is dict:
+                ids.pop(member_id, None)
+                if len(ids) == 1:
+                    self._ids[key] = next(iter(ids))
+                continue
+
+            if ids != member_id:
+                # already removed, or held by another member
+                continue
+
+            del self._ids[key]
+            if self._sorted is not None:
+                index = bisect.bisect_left(self._sorted, key)
+                if index < len(self._sorted) and self._sorted[index] == key:
+                    del self._sorted[index]
+
+    def get(self, key: str) -> Iterable[int]:
+        """
+        :param key: The name to look up, which will be casefolded.
+        :return: The IDs of the members with that name, in the order they were added.
+        """
+        ids = self._ids.get(key.casefold())
+        if ids is None:
+            return ()
+
+        if type(ids) is dict:
+            return tuple(ids)
+
+        return ids,
+
+    def prefixed(self, prefix: str) -> Iterator[int]:
+        """
+        :param prefix: The prefix to look up, which will be casefolded.
+        :return: An iterator of the IDs of the members with a name starting with the prefix, \
+            sorted by name. Members may be repeated.
+        """
+        if self._sorted is None:
+            self._sorted = sorted(self._ids)
+
+        prefix = prefix.casefold()
+        index = bisect.bisect_left(self._sorted, prefix)
+        while index < len(self._sorted):
+            key = self._sorted[index]
+            if not key.startswith(prefix):
+                break
+
+            ids = self._ids[key]
+            if type(ids) is dict:
+                yield from tuple(ids)
+            else:
+                yield ids
+
+            index += 1
+
+
+class MemberStore(collections.abc.MutableMapping):
+    """
+    The default member store, which keeps a :class:`.Member` object for every member in a dict.
+
+    A member store is a mapping of ``member_id -> Member``, with some extra methods that allow
+    stores to handle gateway payloads without making a :class:`.Member` first.
+    """
+
+    __slots__ = ("guild_id", "_members", "_interned_roles", "_interned_roles_limit",
+                 "_name_index", "_status_buckets")
+
+    def __init__(self, guild_id: int):
+        """
+        :param guild_id: The ID of the guild this store is for.
+        """
+        #: The ID of the guild this store is for.
+        self.guild_id = guild_id
+
+        self._members = {}  # type: Dict[int, dt_member.Member]
+
+        # members with the same roles share the same role ID tuple
+        self._interned_roles = {}  # type: Dict[tuple, tuple]
+        self._interned_roles_limit = 64
+
+        # made on the first search, and kept up to date from then on
+        self._name_index = None  # type: _NameIndex
+
+        # the IDs of the members with each status, as ordered sets
+        self._status_buckets = {
+            status: {} for status in _BUCKETED_STATUSES
+        }  # type: Dict[Status, Dict[int, None]]
+
+    def __repr__(self) -> str:
+        return "<{} guild_id={} members={}>".format(type(self).__name__, self.guild_id, len(self))
+
+    # the dict methods are forwarded directly, as the Mapping mixins are much slower
+    def __getitem__(self, member_id: int) -> 'dt_member.Member':
+        return self._members[member_id]
+
+    def __setitem__(self, member_id: int, member: 'dt_member.Member'):
+        member.role_ids = self._intern_roles(member.role_ids)
+        self._members[member_id] = member
+        self._reindex(member_id)
+        self._set_status(member_id, member.status)
+
+    def __delitem__(self, member_id: int):
+        del self._members[member_id]
+        self._unindex(member_id)
+        self._set_status(member_id, Status.OFFLINE)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._members)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self._members
+
+    def get(self, member_id: int, default=None) -> 'dt_member.Member':
+        return self._members.get(member_id, default)
+
+    def keys(self):
+        return self._members.keys()
+
+    def values(self):
+        return self._members.values()
+
+    def items(self):
+        return self._members.items()
+
+    def copy(self) -> 'MemberStore':
+        """
+        :return: A shallow copy of this store.
+        """
+        new_store = type(self)(self.guild_id)
+        new_store._members = self._members.copy()
+        new_store._interned_roles = self._interned_roles.copy()
+        new_store._interned_roles_limit = self._interned_roles_limit
+        new_store._status_buckets = {
+            status: bucket.copy() for (status, bucket) in self._status_buckets.items()
+        }
+        return new_store
+
+    def add_payload(self, member_data: dict) -> None:
+        """
+        Adds a member from a member payload, such as in a member chunk. If the member already
+        exists, only their nickname is updated.
+
+        :param member_data: The member data dictionary, as returned from Discord.
+        """
+        member_id = int(member_data["user"]["id"])
+        member = self._members.get(member_id)
+        if member is None:
+            member = dt_member.Member._from_payload(member_data)
+            member.guild_id = self.guild_id
+            member.role_ids = self._intern_roles(member.role_ids)
+            self._members[member_id] = member
+            self._set_status(member_id, member.status)
+
+        member.nickname = member_data.get("nick", member.nickname)
+        self._reindex(member_id, keep_sorted=False)
+
+    def set_presence(self, member_id: int, presence_data: dict) -> None:
+        """
+        Sets the presence of a member from a presence payload, if the member exists.
+
+        :param member_id: The ID of the member.
+        :param presence_data: The presence data dictionary, as returned from Discord.
+        """
+        member = self._members.get(member_id)
+        if member is not None:
+            member.presence = Presence.interned(status=presence_data.get("status"),
+                                                game=presence_data.get("game"))
+            self._set_status(member_id, member.presence.status)
+
+    def remove_role(self, role_id: int) -> None:
+        """
+        Removes a role from every member in this store.
+
+        :param role_id: The ID of the role to remove.
+        """
+        for member in self._members.values():
+            if role_id in member.role_ids:
+                member.role_ids = self._intern_roles(r for r in member.role_ids if r != role_id)
+
+    def status_count(self, status: Status) -> int:
+        """
+        Counts the members with a status, without going through every member.
+
+        :param status: The :class:`.Status` to count.
+        :return: The number of members with that status.
+        """
+        if status is Status.OFFLINE:
+            return len(self) - sum(len(bucket) for bucket in self._status_buckets.values())
+
+        return len(self._status_buckets[status])
+
+    def with_status(self, status: Status) -> 'Iterator[dt_member.Member]':
+        """
+        Iterates over the members with a status. See :meth:`.Guild.members_with_status`.
+
+        Only the members with the status are looked up, apart from offline members, which are
+        found by skipping over every member with another status.
+
+        :param status: The :class:`.Status` of the members.
+        :return: An iterator of :class:`.Member`.
+        """
+        if status is not Status.OFFLINE:
+            # copied, so members can change status while this is being iterated over
+            for member_id in tuple(self._status_buckets[status]):
+                member = self.get(member_id)
+                if member is not None:
+                    yield member
+
+            return
+
+        buckets = tuple(self._status_buckets.values())
+        for member_id in tuple(self):
+            if any(member_id in bucket for bucket in buckets):
+                continue
+
+            member = self.get(member_id)
+            if member is not None:
+                yield member
+
+    def search(self, name: str, discriminator: str = None, *,
+               nicknames: bool = True) -> 'dt_member.Member':
+        """
+        Searches for a member by username or nickname. See :meth:`.Guild.search_for_member`.
+
+        Exact matches are preferred over case-insensitive matches, and usernames over nicknames.
+
+        :param name: The username or nickname of the member.
+        :param discriminator: The discriminator of the member, if known.
+        :param nicknames: If nicknames should be searched.
+        :return: The :class:`.Member` that matched, or None if no members matched.
+        """
+        if name is None:
+            # only members without a nickname match, which can't be looked up by name
+            for member_id in self:
+                username, member_discriminator, nick = self._names(member_id)
+                if discriminator is not None and discriminator != member_discriminator:
+                    continue
+
+                if username is None or (nicknames and not nick):
+                    return self[member_id]
+
+            return None
+
+        index = self._get_name_index()
+        if discriminator is not None:
+            # username#discriminator is usually unique, so try that first
+            candidates = itertools.chain(index.get("{}#{}".format(name, discriminator)),
+                                         index.get(name))
+        else:
+            candidates = index.get(name)
+
+        folded = name.casefold()
+        best, best_rank = None, None
+        for member_id in candidates:
+            username, member_discriminator, nick = self._names(member_id)
+            if discriminator is not None and discriminator != member_discriminator:
+                continue
+
+            if username == name:
+                return self[member_id]
+            elif nicknames and nick == name:
+                rank = 1
+            elif username and username.casefold() == folded:
+                rank = 2
+            elif nicknames and nick and nick.casefold() == folded:
+                rank = 3
+            else:
+                continue
+
+            if best_rank is None or rank < best_rank:
+                best, best_rank = member_id, rank
+
+        if best is not None:
+            return self[best]
+
+    def search_prefix(self, prefix: str, limit: int = 25) -> 'List[dt_member.Member]':
+        """
+        Finds members with a username, nickname or ``username#discriminator`` starting with a
+        prefix, ignoring case. See :meth:`.Guild.members_by_prefix`.
+
+        :param prefix: The prefix to search for.
+        :param limit: The maximum number of members to return.
+        :return: A list of :class:`.Member`, sorted by the name that matched.
+        """
+        members = []
+        seen = set()
+        for member_id in self._get_name_index().prefixed(prefix):
+            if member_id in seen:
+                continue
+
+            seen.add(member_id)
+            members.append(self[member_id])
+            if len(members) >= limit:
+                break
+
+        return members
+
+    def _names(self, member_id: int) -> Tuple[str, str, str]:
+        """
+        :return: The (username, discriminator, nickname) of a member.
+        """
+        member = self._members[member_id]
+        user = member.user
+        return user.username, user.discriminator, member.nickname.value
+
+    def _get_name_index(self) -> _NameIndex:
+        if self._name_index is None:
+            self._name_index = _NameIndex()
+            for member_id in self:
+                self._name_index.add(member_id, *self._names(member_id), keep_sorted=False)
+
+        return self._name_index
+
+    def _reindex(self, member_id: int, *, keep_sorted: bool = True) -> None:
+        """
+        Updates the name index for a member, if the index has been made.
+        """
+        if self._name_index is not None and member_id in self:
+            self._name_index.add(member_id, *self._names(member_id), keep_sorted=keep_sorted)
+
+    def _unindex(self, member_id: int) -> None:
+        if self._name_index is not None:
+            self._name_index.remove(member_id)
+
+    def _set_status(self, member_id: int, status: Status) -> None:
+        """
+        Moves a member into the bucket for their status.
+        """
+        for (bucket_status, bucket) in self._status_buckets.items():
+            if bucket_status is status:
+                bucket[member_id] = None
+            elif member_id in bucket:
+                del bucket[member_id]
+
+    def _intern_roles(self, role_ids) -> tuple:
+        """
+        Gets the shared tuple for a set of role IDs.
+        """
+        role_ids = tuple(role_ids)
+        try:
+            return self._interned_roles[role_ids]
+        except KeyError:
+            pass
+
+        if len(self._interned_roles) >= self._interned_roles_limit:
+            # drop the role sets that no member has any more
+            in_use = {member.role_ids for member in self._members.values()}
+            self._interned_roles = {ids: ids for ids in self._interned_roles.values()
+                                    if ids in in_use}
+            self._interned_roles_limit = max(64, len(self._interned_roles) * 2)
+
+        self._interned_roles[role_ids] = role_ids
+        return role_ids
+
+
+class _MemberRecord(object):
+    """
+    A member that hasn't been made into a :class:`.Member` yet.
+    """
+
+    __slots__ = ("user_data", "role_ids", "joined_at", "nick", "presence")
+
+    def __init__(self, user_data: dict, role_ids: tuple, joined_at: str, nick: str):
+        self.user_data = user_data
+        self.role_ids = role_ids
+        # parsed when the member is made
+        self.joined_at = joined_at
+        self.nick = nick
+        self.presence = OFFLINE
+
+    def copy(self) -> '_MemberRecord':
+        record = _MemberRecord(self.user_data, self.role_ids, self.joined_at, self.nick)
+        record.presence = self.presence
+        return record
+
+
+class LazyMemberStore(MemberStore):
+    """
+    A member store that keeps the payloads from member chunks as they are, and only makes
+    :class:`.Member` objects (and caches their :class:`.User`) when they are first looked up.
+
+    Most members of large guilds are never looked up, so this makes chunking faster and uses less
+    memory. Members are looked up by :attr:`.Guild.members`, :meth:`.Guild.search_for_member`,
+    events and converters as normal, and stay made once they have been.
+
+    .. warning::
+
+        Users are only cached once their member has been made, so the users of members that
+        haven't been looked up yet won't be found in the user cache.
+    """
+
+    __slots__ = ()
+
+    def _materialize(self, member_id: int, record: _MemberRecord) -> 'dt_member.Member':
+        member = dt_member.Member._from_payload({
+            "user": record.user_data, "roles": (), "joined_at": record.joined_at,
+            "nick": record.nick,
+        })
+        member.guild_id = self.guild_id
+        member.role_ids = record.role_ids
+        member.presence = record.presence
+        self._members[member_id] = member
+        return member
+
+    def __getitem__(self, member_id: int) -> 'dt_member.Member':
+        member = self._members[member_id]
+        if type(member) is _MemberRecord:
+            member = self._materialize(member_id, member)
+
+        return member
+
+    def get(self, member_id: int, default=None) -> 'dt_member.Member':
+        member = self._members.get(member_id, default)
+        if type(member) is _MemberRecord:
+            member = self._materialize(member_id, member)
+
+        return member
+
+    def values(self):
+        return collections.abc.ValuesView(self)
+
+    def items(self):
+        return collections.abc.ItemsView(self)
+
+    def copy(self) -> 'LazyMemberStore':
+        new_store = super().copy()
+        # records are updated in place, so the copy can't share them with this store
+        for (member_id, member) in new_store._members.items():
+            if type(member) is _MemberRecord:
+                new_store._members[member_id] = member.copy()
+
+        return new_store
+
+    def add_payload(self, member_data: dict) -> None:
+        user_data = member_data["user"]
+        member_id = int(user_data["id"])
+        member = self._members.get(member_id)
+        if member is None:
+            role_ids = self._intern_roles(int(role_id) for role_id in member_data.get("roles", ()))
+            self._members[member_id] = _MemberRecord(
+                dt_user._intern_user_data(user_data), role_ids, member_data.get("joined_at"),
+                member_data.get("nick")
+            )
+        elif type(member) is _MemberRecord:
+            member.nick = member_data.get("nick", member.nick)
+        else:
+            member.nickname = member_data.get("nick", member.nickname)
+
+        self._reindex(member_id, keep_sorted=False)
+
+    def set_presence(self, member_id: int, presence_data: dict) -> None:
+        member = self._members.get(member_id)
+        if type(member) is _MemberRecord:
+            member.presence = Presence.interned(status=presence_data.get("status"),
+                                                game=presence_data.get("game"))
+            self._set_status(member_id, member.presence.status)
+        else:
+            super().set_presence(member_id, presence_data)
+
+    def _names(self, member_id: int) -> Tuple[str, str, str]:
+        record = self._members[member_id]
+        if type(record) is not _MemberRecord:
+            return super()._names(member_id)
+
+        # the cached user is newer than the chunk, if there is one
+        user = get_current_client().state._users.get(member_id)
+        if user is not None:
+            return user.username, user.discriminator, record.nick
+
+        user_data = record.user_data
+        return user_data.get("username"), user_data.get("discriminator"), record.nick
+
+
+class _InternTable(object):
+    """
+    A reference counted table of shared values, referred to by index.
+
+    Index 0 is always ``None``, and is never released.
+    """
+
+    __slots__ = ("values", "_keys", "_indexes", "_refs", "_free")
+
+    def __init__(self):
+        #: The values in this table, by index.
+        self.values = [None]  # type: List[Any]
+        self._keys = [None]  # type: List[Hashable]
+        self._indexes = {None: 0}  # type: Dict[Hashable, int]
+        self._refs = array('L', [0])
+        self._free = []  # type: List[int]
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def copy(self) -> '_InternTable':
+        new_table = _InternTable()
+        new_table.values = self.values.copy()
+        new_table._keys = self._keys.copy()
+        new_table._indexes = self._indexes.copy()
+        new_table._refs = array('L', self._refs)
+        new_table._free = self._free.copy()
+        return new_table
+
+    def add(self, key: Hashable, value: Any = None) -> int:
+        """
+        Adds a reference to a value.
+
+        :param key: The key to deduplicate the value by.
+        :param value: The value to store, if it isn't the same as the key.
+        :return: The index of the value.
+        """
+        index = self._indexes.get(key)
+        if index is None:
+            if value is None:
+                value = key
+
+            if self._free:
+                index = self._free.pop()
+                self.values[index] = value
+                self._keys[index] = key
+            else:
+                index = len(self.values)
+                self.values.append(value)
+                self._keys.append(key)
+                self._refs.append(0)
+
+            self._indexes[key] = index
+
+        if index:
+            self._refs[index] += 1
+
+        return index
+
+    def release(self, index: int) -> None:
+        """
+        Removes a reference to a value, removing it from the table once it's unused.
+
+        :param index: The index of the value.
+        """
+        if not index:
+            return
+
+        self._refs[index] -= 1
+        if self._refs[index] == 0:
+            del self._indexes[self._keys[index]]
+            self.values[index] = self._keys[index] = None
+            self._free.append(index)
+
+
+def _game_key(game: Game):
+    if game is None:
+        return None
+
+    return game.name, game.type, game.url
+
+
+class ColumnarMemberStore(MemberStore):
+    """
+    A member store for very large guilds, which keeps members in typed arrays instead of
+    :class:`.Member` objects.
+
+    Each member is a row, holding their ID, join date, status, and indexes into shared tables of
+    nicknames, role ID sets and games. This costs a few dozen bytes per member, instead of the
+    handful of objects that each :class:`.Member` holds on to. User data is still cached in the
+    :class:`.State` as normal.
+
+    :class:`.Member` objects are made when they are looked up, and are reused for as long as
+    something holds a reference to them. These objects are a snapshot of the row: changes to
+    them are not stored until they are assigned back into the store.
+    """
+
+    __slots__ = ("_rows", "_ids", "_joined", "_statuses", "_nicks", "_role_sets", "_games",
+                 "_nick_table", "_role_table", "_game_table", "_views")
+
+    def __init__(self, guild_id: int):
+        super().__init__(guild_id)
+
+        #: The mapping of member ID -> row.
+        self._rows = {}  # type: Dict[int, int]
+
+        # the columns
+        self._ids = array('Q')
+        self._joined = array('q')
+        self._statuses = array('B')
+        self._nicks = array('L')
+        self._role_sets = array('L')
+        self._games = array('L')
+
+        self._nick_table = _InternTable()
+        self._role_table = _InternTable()
+        self._game_table = _InternTable()
+
+        #: The member objects that are currently alive.
+        self._views = weakref.WeakValueDictionary()
+
+    def __getitem__(self, member_id: int) -> 'dt_member.Member':
+        member = self._views.get(member_id)
+        if member is None:
+            member = self._materialize(member_id, self._rows[member_id])
+            self._views[member_id] = member
+
+        return member
+
+    def __setitem__(self, member_id: int, member: 'dt_member.Member'):
+        presence = member.presence
+        if presence is not None:
+            status, game = presence.status, presence.game
+        else:
+            status, game = Status.OFFLINE, None
+
+        row = self._rows.get(member_id)
+        if row is None:
+            self._append(member_id, member.joined_at, status, member.nickname.value,
+                         tuple(member.role_ids), game)
+        else:
+            self._joined[row] = self._encode_date(member.joined_at)
+            self._statuses[row] = _STATUS_INDEXES[status]
+            self._set_nick(row, member.nickname.value)
+            self._set_roles(row, tuple(member.role_ids))
+            self._set_game(row, game)
+
+        member.role_ids = self._role_table.values[self._role_sets[self._rows[member_id]]]
+        self._views[member_id] = member
+        self._reindex(member_id)
+        self._set_status(member_id, status)
+
+    def __delitem__(self, member_id: int):
+        row = self._rows.pop(member_id)
+        self._views.pop(member_id, None)
+        self._unindex(member_id)
+        self._set_status(member_id, Status.OFFLINE)
+
+        self._nick_table.release(self._nicks[row])
+        self._role_table.release(self._role_sets[row])
+        self._game_table.release(self._games[row])
+
+        # move the last row into the hole, so the columns stay packed
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._rows[moved_id] = row
+            for column in self._columns():
+                column[row] = column[last]
+
+        for column in self._columns():
+            del column[last]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self._rows
+
+    def get(self, member_id: int, default=None) -> 'dt_member.Member':
+        try:
+            return self[member_id]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self._rows.keys()
+
+    def values(self):
+        return collections.abc.ValuesView(self)
+
+    def items(self):
+        return collections.abc.ItemsView(self)
+
+    def copy(self) -> 'ColumnarMemberStore':
+        new_store = type(self)(self.guild_id)
+        new_store._rows = self._rows.copy()
+        for name in ("_ids", "_joined", "_statuses", "_nicks", "_role_sets", "_games"):
+            column = getattr(self, name)
+            setattr(new_store, name, array(column.typecode, column))
+
+        new_store._nick_table = self._nick_table.copy()
+        new_store._role_table = self._role_table.copy()
+        new_store._game_table = self._game_table.copy()
+        new_store._status_buckets = {
+            status: bucket.copy() for (status, bucket) in self._status_buckets.items()
+        }
+        return new_store
+
+    def add_payload(self, member_data: dict) -> None:
+        user_data = member_data["user"]
+        member_id = int(user_data["id"])
+        row = self._rows.get(member_id)
+        if row is not None:
+            if "nick" in member_data:
+                self._set_nick(row, member_data["nick"])
+                member = self._views.get(member_id)
+                if member is not None:
+                    member.nickname = member_data["nick"]
+
+                self._reindex(member_id, keep_sorted=False)
+
+            return
+
+        get_current_client().state.make_user(user_data)
+
+        game = member_data.get("game")
+        if game is not None:
+            game = Game.interned(**game)
+
+        status = Status(member_data.get("status", Status.OFFLINE))
+        self._append(member_id, to_datetime(member_data.get("joined_at")), status,
+                     member_data.get("nick"),
+                     tuple(int(role_id) for role_id in member_data.get("roles", ())), game)
+        self._reindex(member_id, keep_sorted=False)
+        self._set_status(member_id, status)
+
+    def set_presence(self, member_id: int, presence_data: dict) -> None:
+        row = self._rows.get(member_id)
+        if row is None:
+            return
+
+        presence = Presence.interned(status=presence_data.get("status"),
+                                     game=presence_data.get("game"))
+        self._statuses[row] = _STATUS_INDEXES[presence.status]
+        self._set_game(row, presence.game)
+        self._set_status(member_id, presence.status)
+
+        member = self._views.get(member_id)
+        if member is not None:
+            member.presence = presence
+
+    def remove_role(self, role_id: int) -> None:
+        # work out the replacement for each role set with the role, then rewrite the rows
+        replacements = {}
+        for (index, role_ids) in enumerate(self._role_table.values):
+            if role_ids is not None and role_id in role_ids:
+                replacements[index] = tuple(r for r in role_ids if r != role_id)
+
+        if not replacements:
+            return
+
+        for (row, index) in enumerate(self._role_sets):
+            if index in replacements:
+                self._set_roles(row, replacements[index])
+
+        for member in self._views.values():
+            row = self._rows[member.id]
+            member.role_ids = self._role_table.values[self._role_sets[row]]
+
+    def _names(self, member_id: int) -> Tuple[str, str, str]:
+        nick = self._nick_table.values[self._nicks[self._rows[member_id]]]
+        user = get_current_client().state._users.get(member_id)
+        if user is None:
+            return None, None, nick
+
+        return user.username, user.discriminator, nick
+
+    # internal methods
+    def _columns(self):
+        return (self._ids, self._joined, self._statuses, self._nicks, self._role_sets,
+                self._games)
+
+    @staticmethod
+    def _encode_date(date: datetime.datetime) -> int:
+        if date is None:
+            return _NO_DATE
+
+        return (date - _EPOCH) // _MICROSECOND
+
+    @staticmethod
+    def _decode_date(value: int) -> datetime.datetime:
+        if value == _NO_DATE:
+            return None
+
+        return _EPOCH + datetime.timedelta(microseconds=value)
+
+    def _append(self, member_id: int, joined_at: datetime.datetime, status: Status,
+                nick: str, role_ids: tuple, game: Game):
+        self._rows[member_id] = len(self._ids)
+        self._ids.append(member_id)
+        self._joined.append(self._encode_date(joined_at))
+        self._statuses.append(_STATUS_INDEXES[status])
+        self._nicks.append(self._nick_table.add(nick))
+        self._role_sets.append(self._role_table.add(role_ids))
+        self._games.append(self._game_table.add(_game_key(game), game))
+
+    def _set_nick(self, row: int, nick: str):
+        old_index = self._nicks[row]
+        self._nicks[row] = self._nick_table.add(nick)
+        self._nick_table.release(old_index)
+
+    def _set_roles(self, row: int, role_ids: tuple):
+        old_index = self._role_sets[row]
+        self._role_sets[row] = self._role_table.add(role_ids)
+        self._role_table.release(old_index)
+
+    def _set_game(self, row: int, game: Game):
+        old_index = self._games[row]
+        self._games[row] = self._game_table.add(_game_key(game), game)
+        self._game_table.release(old_index)
+
+    def _materialize(self, member_id: int, row: int) -> 'dt_member.Member':
+        """
+        Makes a :class:`.Member` from a row.
+        """
+        member = object.__new__(dt_member.Member)
+        member.id = member_id
+        member.guild_id = self.guild_id
+        member.role_ids = self._role_table.values[self._role_sets[row]]
+        member.roles = dt_member.MemberRoleContainer(member)
+        member.joined_at = self._decode_date(self._joined[row])
+        member._nickname = dt_member.Nickname(member, self._nick_table.values[self._nicks[row]])
+        member.presence = Presence.interned(status=_STATUSES[self._statuses[row]],
+                                            game=self._game_table.values[self._games[row]])
+
+        # keep enough user data around to remake the user, if it gets decached
+        user = get_current_client().state._users.get(member_id)
+        if user is not None:
+            member._user_data = {"id": str(member_id), "username": user.username,
+                                 "discriminator": user.discriminator, "avatar": user.avatar_hash,
+                                 "bot": user.bot}
+        else:
+            member._user_data = {"id": str(member_id)}
+
+        return member
@@ -27,10 +27,10 @@ from curious.dataclasses import channel as dt_channel, emoji as dt_emoji, guild
     invite as dt_invite, member as dt_member, role as dt_role, user as dt_user, \
     webhook as dt_webhook
 from curious.dataclasses.attachment import Attachment
-from curious.dataclasses.bases import Dataclass
+from curious.dataclasses.bases import Dataclass, make_parser
 from curious.dataclasses.embed import Embed
 from curious.exc import CuriousError, ErrorCode, HTTPException, PermissionsError
-from curious.util import AsyncIteratorWrapper, to_datetime
+from curious.util import AsyncIteratorWrapper, PaginatedIterator, to_datetime
 
 CHANNEL_REGEX = re.compile(r"<#([0-9]*)>")
 INVITE_REGEX = re.compile(r"(?:discord\.gg/(\S+)|discordapp\.com/invites/(\S+))")
@@ -391,33 +391,47 @@ class Message(Dataclass):
         await get_current_client().http.unpin_message(self.channel.id, self.id)
         return self
 
-    async def get_who_reacted(self, emoji: 'typing.Union[dt_emoji.Emoji, str]') \
-            -> 'typing.List[typing.Union[dt_user.User, dt_member.Member]]':
+    def who_reacted(self, emoji: 'typing.Union[dt_emoji.Emoji, str]', *,
+                    limit: int = -1) \
+            -> 'PaginatedIterator[typing.Union[dt_user.User, dt_member.Member]]':
         """
-        Fetches who reacted to this message.
+        Iterates over who reacted to this message, one page at a time.
+
+        This is *not* an async function - it returns a :class:`.PaginatedIterator` which can be
+        async iterated over.
 
         :param emoji: The emoji to check.
-        :return: A list of either :class:`.Member` or :class:`.User` that reacted to this message.
+        :param limit: The maximum number of users to fetch. <= 0 means every user.
+        :return: A :class:`.PaginatedIterator` of either :class:`.Member` or :class:`.User`.
         """
         if isinstance(emoji, dt_emoji.Emoji):
             emoji = "{}:{}".format(emoji.name, emoji.id)
 
-        reactions = await get_current_client().http.get_reaction_users(self.channel.id, self.id,
-                                                                       emoji)
-        result = []
+        http = get_current_client().http
 
-        for user in reactions:
-            member_id = int(user.get("id"))
-            if self.guild is None:
-                result.append(dt_user.User(**user))
-            else:
-                member = self.guild.members.get(member_id)
-                if not member:
-                    result.append(dt_user.User(**user))
-                else:
-                    result.append(member)
+        async def fetch(cursor: int, limit: int):
+            return await http.get_reaction_users(self.channel.id, self.id, emoji,
+                                                 after=cursor, limit=limit)
+
+        def make_user(user: dict) -> 'typing.Union[dt_user.User, dt_member.Member]':
+            if self.guild is not None:
+                member = self.guild.members.get(int(user.get("id")))
+                if member is not None:
+                    return member
+
+            return dt_user.User._from_payload(user)
+
+        return PaginatedIterator(fetch, transform=make_user, limit=limit)
 
-        return result
+    async def get_who_reacted(self, emoji: 'typing.Union[dt_emoji.Emoji, str]') \
+            -> 'typing.List[typing.Union[dt_user.User, dt_member.Member]]':
+        """
+        Fetches who reacted to this message.
+
+        :param emoji: The emoji to check.
+        :return: A list of either :class:`.Member` or :class:`.User` that reacted to this message.
+        """
+        return await self.who_reacted(emoji).all()
 
     async def react(self, emoji: 'typing.Union[dt_emoji.Emoji, str]'):
         """
@@ -476,3 +490,22 @@ class Message(Dataclass):
             raise PermissionsError("manage_messages")
 
         await get_current_client().http.delete_all_reactions(self.channel.id, self.id)
+
+
+# fast path for making messages from gateway payloads, kept in sync with Message.__init__
+Message._from_payload = classmethod(make_parser(Message, [
+    ("id", 'int(data["id"])'),
+    ("content", 'data.get("content")'),
+    ("guild_id", 'None'),
+    ("channel_id", 'int(data.get("channel_id", 0))'),
+    ("author_id", 'int(data.get("author", {}).get("id", 0)) or None'),
+    ("author", 'None'),
+    ("type", 'MessageType(data.get("type", 0))'),
+    ("created_at", 'to_datetime(data.get("timestamp"))'),
+    ("edited_at", 'to_datetime(data.get("edited_timestamp"))'),
+    ("embeds", '[Embed(**embed) for embed in data.get("embeds", ())]'),
+    ("attachments", '[Attachment(**attachment) for attachment in data.get("attachments", ())]'),
+    ("_mentions", 'data.get("mentions", [])'),
+    ("_role_mentions", 'data.get("mention_roles", [])'),
+    ("reactions", '[]'),
+], globals()))
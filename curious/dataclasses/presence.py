@@ -20,7 +20,10 @@ Wrappers for Status objects.
 """
 
 import enum
-from typing import List
+import weakref
+from typing import List, Optional
+
+from curious.util import StringInterner
 
 
 class Status(enum.Enum):
@@ -76,7 +79,7 @@ class Game(object):
     Represents a game object.
     """
 
-    __slots__ = "type", "url", "name"
+    __slots__ = "type", "url", "name", "__weakref__"
 
     def __init__(self, **kwargs) -> None:
         """
@@ -112,13 +115,63 @@ class Game(object):
     def __repr__(self) -> str:
         return "<Game name='{}' type={} url={}>".format(self.name, self.type, self.url)
 
+    @classmethod
+    def interned(cls, **kwargs) -> 'Game':
+        """
+        Gets a shared game with the specified fields, creating it if needed. This is used for
+        games from the gateway, as many members play the same game.
+
+        Shared games are read-only; modifying one raises an :class:`AttributeError`.
+
+        :param name: The name for the game.
+        :param url: The URL for the game, if streaming.
+        :param type: A :class:`.GameType` for this game.
+        """
+        return cls._intern(cls(**kwargs))
+
+    @staticmethod
+    def _intern(game: 'Game') -> 'Game':
+        key = (game.name, game.type, game.url)
+        shared = _games.get(key)
+        if shared is None:
+            # copy the game, so that the caller can't modify the shared one
+            _games[key] = shared = _SharedGame(game)
+
+        return shared
+
+
+class _SharedGame(Game):
+    """
+    A read-only game, shared between every presence with the same game.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, game: Game) -> None:
+        object.__setattr__(self, "type", game.type)
+        object.__setattr__(self, "url", game.url)
+        object.__setattr__(self, "name", _game_names(game.name))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Shared games cannot be modified")
+
+    def __delattr__(self, item):
+        raise AttributeError("Shared games cannot be modified")
+
+    # read-only, so copies can share this object
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
 
 class Presence(object):
     """
     Represents a presence on a member.
     """
 
-    __slots__ = "_status", "_game"
+    __slots__ = "_status", "_game", "__weakref__"
 
     def __init__(self, **kwargs) -> None:
         """
@@ -182,6 +235,73 @@ class Presence(object):
         """
         return self.status.strength
 
+    @classmethod
+    def interned(cls, status=Status.OFFLINE, game=None) -> 'Presence':
+        """
+        Gets a shared presence with the specified status and game, creating it if needed. This is
+        used for member presences, as most members are offline with no game.
+
+        Shared presences are read-only, and modifying one raises an :class:`AttributeError`; set
+        a new presence on the member instead.
+
+        :param status: The :class:`.Status` for this presence.
+        :param game: The :class:`.Game` for this presence, or a game dict.
+        """
+        if status is None:
+            status = Status.OFFLINE
+        elif not isinstance(status, Status):
+            status = Status(status)
+
+        if game is not None:
+            if isinstance(game, Game):
+                game = Game._intern(game)
+            else:
+                game = Game.interned(**game)
+        elif status is Status.OFFLINE:
+            return OFFLINE
+
+        key = (status, game)
+        shared = _presences.get(key)
+        if shared is None:
+            _presences[key] = shared = _SharedPresence(status, game)
+
+        return shared
+
+
+class _SharedPresence(Presence):
+    """
+    A read-only presence, shared between every member with the same presence.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, status: Status, game: Optional[Game]) -> None:
+        object.__setattr__(self, "_status", status)
+        object.__setattr__(self, "_game", game)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Shared presences cannot be modified")
+
+    def __delattr__(self, item):
+        raise AttributeError("Shared presences cannot be modified")
+
+    # read-only, so copies can share this object
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+#: The games currently in use by shared presences, by (name, type, url).
+_games = weakref.WeakValueDictionary()
+_game_names = StringInterner(4096)
+#: The shared presences currently in use, by (status, game).
+_presences = weakref.WeakValueDictionary()
+
+#: The shared presence for offline members with no game.
+OFFLINE = _SharedPresence(Status.OFFLINE, None)
+
 
 def _make_property(field: str, doc: str = None, max_size: int = None) -> property:
     def _getter(self):
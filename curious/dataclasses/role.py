@@ -24,7 +24,7 @@ import functools
 from curious.core import get_current_client
 from curious.dataclasses import guild as dt_guild, member as dt_member, \
     permissions as dt_permissions
-from curious.dataclasses.bases import Dataclass
+from curious.dataclasses.bases import Dataclass, make_parser
 from curious.exc import PermissionsError
 
 
@@ -203,3 +203,17 @@ class Role(Dataclass):
                                            name=name, permissions=permissions, colour=colour,
                                            hoist=hoist, position=position, mentionable=mentionable)
         return self
+
+
+# fast path for making roles from gateway payloads, kept in sync with Role.__init__
+Role._from_payload = classmethod(make_parser(Role, [
+    ("id", 'int(data["id"])'),
+    ("name", 'data.get("name")'),
+    ("colour", 'data.get("color", 0)'),
+    ("hoisted", 'data.get("hoist", False)'),
+    ("mentionable", 'data.get("mentionable", False)'),
+    ("permissions", 'dt_permissions.Permissions(data.get("permissions", 0))'),
+    ("managed", 'data.get("managed", False)'),
+    ("position", 'data.get("position", 0)'),
+    ("guild_id", 'int(data.get("guild_id", 0))'),
+], globals()))
@@ -18,6 +18,7 @@ Wrappers for Search objects.
 
 .. currentmodule:: curious.dataclasses.search
 """
+import anyio
 import collections
 import functools
 import typing
@@ -26,18 +27,28 @@ from typing import Iterator
 from curious.core import get_current_client
 from curious.dataclasses import channel as dt_channel, guild as dt_guild, member as dt_member, \
     message as dt_message, user as dt_user
+from curious.exc import CuriousError, ErrorCode
+from curious.util import PaginatedIterator
+
+#: The number of message groups Discord returns per page of search results.
+PAGE_SIZE = 25
 
 
 class MessageGroup:
     """
     A small class that returns messages from a message group.
+
+    If the search was made without context messages, this only contains the matching message.
     """
 
-    __slots__ = "msgs",
+    __slots__ = "msgs", "hit"
 
-    def __init__(self, msgs: 'typing.List[dt_message.Message]'):
+    def __init__(self, msgs: 'typing.List[dt_message.Message]', hit: int = 2):
         self.msgs = msgs
 
+        #: The index of the message that matched the search query.
+        self.hit = hit
+
     # generic magic methods
     def __getitem__(self, item) -> 'dt_message.Message':
         return self.msgs[item]
@@ -49,25 +60,27 @@ class MessageGroup:
         return "<MessageGroup msgs='{}'>".format(self.msgs)
 
     @property
-    def before(self) -> 'typing.Tuple[dt_message.Message, dt_message.Message]':
+    def before(self) -> 'typing.Tuple[dt_message.Message, ...]':
         """
-        :return: The two :class:`.Message` objects that happen before the requested message.
+        :return: The (usually two) :class:`.Message` objects that happen before the requested \
+            message.
         """
-        return self.msgs[0], self.msgs[1]
+        return tuple(self.msgs[:self.hit])
 
     @property
     def message(self) -> 'dt_message.Message':
         """
         :return: The :class:`.Message` that matched this search query.
         """
-        return self.msgs[2]
+        return self.msgs[self.hit]
 
     @property
-    def after(self) -> 'typing.Tuple[dt_message.Message, dt_message.Message]':
+    def after(self) -> 'typing.Tuple[dt_message.Message, ...]':
         """
-        :return: The two :class:`.Message` objects that happen after the requested message.
+        :return: The (usually two) :class:`.Message` objects that happen after the requested \
+            message.
         """
-        return self.msgs[3], self.msgs[4]
+        return tuple(self.msgs[self.hit + 1:])
 
 
 class SearchResults(collections.AsyncIterator):
@@ -77,6 +90,8 @@ class SearchResults(collections.AsyncIterator):
     
     The return type of iterating over this is a :class:`.MessageGroup`, which contains the messages
     around the message that matched the search result.
+
+    Whilst iterating with ``async for``, the next page of results is fetched in the background.
     
     .. code-block:: python3
     
@@ -95,6 +110,9 @@ class SearchResults(collections.AsyncIterator):
 
         self._limit = -1
         self._total_count = 0
+        self._context = True
+        self._prefetch = 1
+        self._pages: PaginatedIterator[MessageGroup] = None
 
     def __repr__(self) -> str:
         return "<SearchResults page='{}' messages='{}'>".format(self.page, len(self.groups))
@@ -102,7 +120,8 @@ class SearchResults(collections.AsyncIterator):
     # builder methods
     def limit(self, limit: int=-1) -> 'SearchResults':
         """
-        Sets the maximum messages to fetch from this search result.
+        Sets the maximum number of results (:class:`.MessageGroup`) to fetch from this search,
+        whether or not context messages are skipped.
         
         .. code-block:: python3
         
@@ -115,6 +134,35 @@ class SearchResults(collections.AsyncIterator):
         self._limit = limit
         return self
 
+    def skip_context(self, skip: bool = True) -> 'SearchResults':
+        """
+        Sets if context messages should be skipped. If they are, each :class:`.MessageGroup` only
+        contains the message that matched, which is much cheaper for large searches.
+
+        :param skip: If context messages should be skipped.
+        :return: This :class:`.SearchResults`.
+        """
+        self._context = not skip
+        return self
+
+    def prefetch(self, pages: int = 1) -> 'SearchResults':
+        """
+        Sets the number of pages to fetch ahead whilst iterating. 0 disables prefetching.
+
+        :param pages: The number of pages to fetch ahead.
+        :return: This :class:`.SearchResults`.
+        """
+        self._prefetch = pages
+        return self
+
+    async def _fetch_raw_page(self, cursor: int, limit: int) -> 'typing.List[typing.List[dict]]':
+        groups = await self.sq.execute_raw(page=self.page)
+        self.page += 1
+        return groups
+
+    def _make_group(self, group: 'typing.List[dict]') -> MessageGroup:
+        return self.sq._make_group(group, context=self._context)
+
     async def fetch_next_page(self) -> None:
         """
         Fetches the next page of results from the SearchQuery.
@@ -122,11 +170,11 @@ class SearchResults(collections.AsyncIterator):
         if self._limit != -1 and self._total_count >= self._limit:
             return
 
-        results = await self.sq.execute(page=self.page)
+        groups = await self.sq.execute_raw(page=self.page)
 
         # add a new messagegroup to the end
-        for r in results:
-            self.groups.append(MessageGroup(r))
+        for group in groups:
+            self.groups.append(self.sq._make_group(group, context=self._context))
 
         self.page += 1
 
@@ -144,20 +192,36 @@ class SearchResults(collections.AsyncIterator):
             raise IndexError
 
         popped = self.groups.popleft()
-        self._total_count += len(popped.msgs)
+        self._total_count += 1
         return popped
 
     async def __anext__(self) -> 'MessageGroup':
         try:
             return self.get_next()
         except IndexError:
-            await self.fetch_next_page()
-            # try and pop left again
-            # if it fails no messages were returned
-            try:
-                return self.get_next()
-            except IndexError:
-                raise StopAsyncIteration
+            pass
+
+        if self._limit != -1 and self._total_count >= self._limit:
+            # stop the prefetcher, which would otherwise wait to hand over its next page forever
+            await self.aclose()
+            raise StopAsyncIteration
+
+        if self._pages is None:
+            # the page counter is used instead of a cursor
+            self._pages = PaginatedIterator(self._fetch_raw_page, transform=self._make_group,
+                                            key=lambda group: 0, page_size=PAGE_SIZE,
+                                            prefetch=self._prefetch)
+
+        group = await self._pages.__anext__()
+        self._total_count += 1
+        return group
+
+    async def aclose(self) -> None:
+        """
+        Closes this iterator, stopping any background fetches.
+        """
+        if self._pages is not None:
+            await self._pages.aclose()
 
 
 class SearchQuery(object):
@@ -208,6 +272,9 @@ class SearchQuery(object):
         self._query = None  # type: str
         self._author = None  # type: typing.Union[dt_user.User, dt_member.Member]
 
+        #: The number of times to retry whilst Discord is still indexing, before giving up.
+        self.index_retries = 5
+
     def make_params(self) -> typing.Dict[str, str]:
         """
         :return: The dict of parameters to send for this request. 
@@ -310,6 +377,49 @@ class SearchQuery(object):
         return SearchResults(self)
 
     # workhouse methods
+    async def execute_raw(self, page: int = 0) -> 'typing.List[typing.List[dict]]':
+        """
+        Executes the search query, returning the raw message groups.
+
+        If Discord has not finished indexing the guild or channel yet, this will back off and
+        retry up to :attr:`.SearchQuery.index_retries` times.
+
+        :param page: The page of results to return.
+        :return: A list of message groups, each a list of message dicts.
+        """
+        func = self._http_meth
+        params = self.make_params()
+
+        # get the offset page
+        params["offset"] = page * PAGE_SIZE
+
+        for attempt in range(self.index_retries + 1):
+            # make the http request
+            res = await func(params)
+            if res.get("code") != ErrorCode.SEARCH_INDEX_NOT_READY:
+                return res.get("messages", [])
+
+            if attempt == self.index_retries:
+                break
+
+            # retry_after is in ms
+            retry_after = res.get("retry_after", 2000) / 1000
+            await anyio.sleep(min(retry_after * 2 ** attempt, 30))
+
+        raise CuriousError("The search index is not yet available")
+
+    def _make_group(self, group: 'typing.List[dict]', *, context: bool = True) -> MessageGroup:
+        """
+        Makes a :class:`.MessageGroup` from a raw message group.
+        """
+        state = get_current_client().state
+
+        hit = next((i for (i, m) in enumerate(group) if m.get("hit")), len(group) // 2)
+        if not context:
+            return MessageGroup([state.make_message(group[hit])], hit=0)
+
+        return MessageGroup([state.make_message(m) for m in group], hit=hit)
+
     async def execute(self, page: int = 0) -> 'typing.List[typing.List[dt_message.Message]]':
         """
         Executes the search query.
@@ -322,21 +432,10 @@ class SearchQuery(object):
         :param page: The page of results to return.
         :return: A list of :class:`.Message` which returns the results of the search query.
         """
-        func = self._http_meth
-        params = self.make_params()
-
-        # get the offset page
-        params["offset"] = page * 25
-        # make the http request
-        res = await func(params)
-
-        message_blocks = []
+        groups = await self.execute_raw(page=page)
 
         # parse all of the message objects
-        for group in res.get("messages", []):
-            message_blocks.append([get_current_client().state.make_message(m) for m in group])
-
-        return message_blocks
+        return [self._make_group(group).msgs for group in groups]
 
     async def get_messages(self, page: int = 0) -> 'SearchResults':
         """
@@ -23,8 +23,9 @@ import datetime
 
 from curious.core import get_current_client
 from curious.dataclasses import channel as dt_channel, guild as dt_guild, message as dt_message
-from curious.dataclasses.bases import Dataclass
+from curious.dataclasses.bases import Dataclass, make_parser
 from curious.exc import CuriousError
+from curious.util import PaginatedIterator, StringInterner
 
 
 class AvatarUrl(object):
@@ -241,6 +242,34 @@ class BotUser(User):
         #: Is this user premium?
         self.premium = kwargs.get("premium", False)
 
+    def get_mentions(self, *, guild: 'dt_guild.Guild' = None, limit: int = -1,
+                     roles: bool = True, everyone: bool = True) \
+            -> 'PaginatedIterator[dt_message.Message]':
+        """
+        Iterates over the recent mentions of this user, newest first.
+
+        .. warning::
+
+            This is a **user-account only** endpoint.
+
+        :param guild: The :class:`.Guild` to limit mentions to.
+        :param limit: The maximum number of mentions to fetch. <= 0 means every mention.
+        :param roles: Should role mentions be included?
+        :param everyone: Should @everyone/@here mentions be included?
+        :return: A :class:`.PaginatedIterator` of :class:`.Message`.
+        """
+        client = get_current_client()
+        guild_id = guild.id if guild is not None else None
+
+        async def fetch(cursor: int, limit: int):
+            return await client.http.get_mentions(guild_id=guild_id, limit=limit, roles=roles,
+                                                  everyone=everyone, before=cursor)
+
+        def make_message(message_data: dict) -> 'dt_message.Message':
+            return client.state.make_message(message_data, cache=False)
+
+        return PaginatedIterator(fetch, transform=make_message, limit=limit)
+
     async def open_private_channel(self):
         raise NotImplementedError("Cannot open a private channel with yourself")
 
@@ -258,3 +287,38 @@ class BotUser(User):
         A higher level interface to editing the bot's avatar.
         """
         return await get_current_client().edit_avatar(path)
+
+
+# the same user is sent once per guild, and discriminators are shared by many users, so these
+# strings are deduplicated as they come in
+_usernames = StringInterner()
+_discriminators = StringInterner(10000)
+_avatar_hashes = StringInterner()
+
+
+def _intern_user_data(user_data: dict) -> dict:
+    """
+    Replaces the username, discriminator and avatar hash in a user payload with shared copies.
+
+    :param user_data: The user data dictionary, which is modified in place.
+    :return: The same dictionary.
+    """
+    for (key, interner) in (("username", _usernames), ("discriminator", _discriminators),
+                            ("avatar", _avatar_hashes)):
+        value = user_data.get(key)
+        if value is not None:
+            user_data[key] = interner(value)
+
+    return user_data
+
+
+# fast path for making users from gateway payloads, kept in sync with User.__init__
+User._from_payload = classmethod(make_parser(User, [
+    ("id", 'int(data["id"])'),
+    ("username", '_usernames(data.get("username"))'),
+    ("discriminator", '_discriminators(data.get("discriminator"))'),
+    ("avatar_hash", '_avatar_hashes(data.get("avatar"))'),
+    ("verified", 'data.get("verified")'),
+    ("mfa_enabled", 'data.get("mfa_enabled")'),
+    ("bot", 'data.get("bot", False)'),
+], globals()))
@@ -19,12 +19,16 @@ Wrappers for Webhook objects.
 .. currentmodule:: curious.dataclasses.webhook
 """
 
+import pathlib
 import typing
+from os import PathLike
 
 from curious.core import get_current_client
+from curious.core.outbound import WebhookSender
 from curious.dataclasses import channel as dt_channel, embed as dt_embed, guild as dt_guild, \
     user as dt_user
 from curious.dataclasses.bases import Dataclass
+from curious.exc import CuriousError
 from curious.util import base64ify
 
 
@@ -187,7 +191,9 @@ class Webhook(Dataclass):
 
     async def execute(self, *,
                       content: str = None, username: str = None, avatar_url: str = None,
-                      embeds: 'typing.List[dt_embed.Embed]' = None, wait: bool = False) \
+                      embeds: 'typing.List[dt_embed.Embed]' = None, wait: bool = False,
+                      file: 'typing.Union[bytes, PathLike, typing.BinaryIO]' = None,
+                      filename: str = None) \
             -> typing.Union[None, str]:
         """
         Executes the webhook.
@@ -197,6 +203,10 @@ class Webhook(Dataclass):
         :param avatar_url: The URL for the avatar to override the default avatar with.
         :param embeds: A list of embeds to add to the message.
         :param wait: Should we wait for the message to arrive before returning?
+        :param file: A file to upload with the message. This can be bytes, a path-like or a \
+            binary file object, and is streamed rather than read into memory.
+        :param filename: The filename of the uploaded file. If a path-like is passed, will use \
+            the filename from that if this is not specified.
         """
         if embeds:
             embeds = [embed.to_dict() for embed in embeds]
@@ -204,11 +214,36 @@ class Webhook(Dataclass):
         if self.token is None:
             await self.get_token()
 
+        if isinstance(file, str):
+            file = pathlib.Path(file)
+
+        if filename is None and isinstance(file, PathLike):
+            filename = pathlib.Path(file).name
+
         client = get_current_client()
         data = await client.http.execute_webhook(self.id, self.token,
                                                  content=content, embeds=embeds,
                                                  username=username, avatar_url=avatar_url,
-                                                 wait=wait)
+                                                 wait=wait, file_content=file, filename=filename)
 
         if wait:
             return client.state.make_message(data, cache=False)
+
+    def sender(self, **kwargs) -> WebhookSender:
+        """
+        Creates a :class:`.WebhookSender` for this webhook, which queues and merges messages to
+        send large amounts of them efficiently.
+
+        This takes the same keyword arguments as :class:`.WebhookSender`.
+
+        .. code-block:: python3
+
+            async with webhook.sender() as sender:
+                await sender.send("Hello, world!")
+
+        :return: A :class:`.WebhookSender` that must be used with ``async with``.
+        """
+        if self.token is None:
+            raise CuriousError("This webhook has no token - call `get_token` first")
+
+        return WebhookSender(self.id, self.token, **kwargs)
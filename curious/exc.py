@@ -84,6 +84,8 @@ class ErrorCode(enum.IntEnum):
 
     REACTION_BLOCKED = 90001
 
+    SEARCH_INDEX_NOT_READY = 110000
+
     UNKNOWN = 0
 
 
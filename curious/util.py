@@ -53,9 +53,14 @@ class Promise(object):
 def to_snowflake(dt: datetime.datetime) -> int:
     """
     Turns a :class:`datetime.datetime` into a snowflake.
+
+    Naive datetimes are assumed to be in UTC, like :attr:`.Dataclass.snowflake_timestamp`.
     """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+
     ts = int(dt.timestamp() * 1000)
-    return (ts << 22) - DISCORD_EPOCH
+    return (ts - DISCORD_EPOCH) << 22
 
 
 def remove_from_multidict(d: MultiDict, key: str, item: Any):
@@ -139,6 +144,222 @@ class AsyncIteratorWrapper(typing.Generic[T], collections.AsyncIterator):
         return items
 
 
+def _item_id(item: dict) -> int:
+    return int(item["id"])
+
+
+class PaginatedIterator(AsyncIteratorWrapper[T]):
+    """
+    Iterates over an endpoint that is paginated with ``before`` or ``after`` cursors.
+
+    Pages are fetched with ``fetch(cursor, limit)``, where ``cursor`` is the key of the last item
+    in the previous page. Whilst iterating inside a running client, the next page is fetched in
+    the background whilst the current page is consumed, with at most ``prefetch`` pages buffered
+    so that huge lists are iterated over in constant memory.
+
+    .. code-block:: python3
+
+        async def fetch(cursor, limit):
+            return await http.get_bans(guild_id, after=cursor, limit=limit)
+
+        it = PaginatedIterator(fetch, page_size=1000, key=lambda ban: int(ban["user"]["id"]))
+
+        async for ban in it:
+            print(ban)
+
+    If iteration stops early, the background fetch stops once its next page has gone untaken for
+    :attr:`.prefetch_timeout` seconds. To stop it straight away, use the iterator as an async
+    context manager, or call :meth:`.aclose`.
+
+    .. code-block:: python3
+
+        async with PaginatedIterator(fetch) as it:
+            async for ban in it:
+                if is_the_one(ban):
+                    break
+    """
+
+    #: How long (in seconds) a prefetched page can wait for the consumer to take it, before the
+    #: background fetch stops. Iteration carries on without prefetching if it resumes afterwards.
+    prefetch_timeout = 30.0
+
+    def __init__(self, fetch: 'Callable[[typing.Optional[int], int], Awaitable[List[dict]]]', *,
+                 transform: 'Callable[[dict], T]' = None,
+                 key: 'Callable[[dict], int]' = _item_id,
+                 page_size: int = 100, limit: int = -1, cursor: int = None,
+                 prefetch: int = 1):
+        """
+        :param fetch: A callable that returns the next page of raw items given a cursor and limit.
+        :param transform: A callable that turns a raw item into the item to yield. Items it \
+            returns None for are skipped.
+        :param key: A callable that returns the cursor for a raw item.
+        :param page_size: The maximum number of items the endpoint returns per page.
+        :param limit: The maximum number of items to fetch. <= 0 means infinite.
+        :param cursor: The cursor to start from.
+        :param prefetch: The number of pages to fetch ahead of the consumer. 0 disables \
+            prefetching.
+        """
+        super().__init__(self._next_page)
+
+        self.fetch = fetch
+        self.transform = transform
+        self.key = key
+        self.page_size = page_size
+        self.limit = limit
+        self.prefetch = prefetch
+
+        #: The cursor the next page will be fetched from.
+        self.cursor = cursor
+
+        self._fetched = 0
+        self._exhausted = False
+        self._closed = False
+        self._pages = None
+        self._prefetch_scope = None
+        self._prefetching = False
+        # the page the prefetcher gave up handing over
+        self._stashed_page = None
+
+    async def __aenter__(self) -> 'PaginatedIterator[T]':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
+    async def _fetch_page(self) -> List[dict]:
+        """
+        Fetches the next page of raw items, advancing the cursor.
+        """
+        if self.limit <= 0:
+            limit = self.page_size
+        else:
+            limit = min(self.page_size, self.limit - self._fetched)
+
+        if self._exhausted or limit <= 0:
+            return []
+
+        page = await self.fetch(self.cursor, limit)
+
+        # a short page means there's nothing left
+        # a long page means the endpoint ignored the limit and returned everything
+        if len(page) != limit:
+            self._exhausted = True
+
+        if page:
+            self.cursor = self.key(page[-1])
+
+        self._fetched += len(page)
+        return page
+
+    async def _prefetch_pages(self) -> None:
+        """
+        Fetches pages ahead of the consumer, until the endpoint is exhausted or this iterator is
+        closed.
+        """
+        try:
+            async with anyio.open_cancel_scope() as scope:
+                self._prefetch_scope = scope
+
+                while not self._closed:
+                    try:
+                        page = await self._fetch_page()
+                    except Exception as e:
+                        # re-raised in the consumer
+                        page = e
+
+                    handed_over = False
+                    async with anyio.move_on_after(self.prefetch_timeout):
+                        await self._pages.put(page)
+                        handed_over = True
+
+                    if not handed_over:
+                        # the consumer has stopped taking pages, and has probably gone away
+                        # without closing this iterator
+                        self._stashed_page = page
+                        return
+
+                    if isinstance(page, Exception) or not page:
+                        return
+        finally:
+            self._prefetching = False
+
+    async def _next_page(self) -> List[dict]:
+        """
+        Gets the next page of raw items, from the prefetch queue if possible.
+        """
+        if self.prefetch <= 0:
+            return await self._fetch_page()
+
+        if self._pages is None:
+            from curious.core import get_current_client
+            try:
+                task_manager = get_current_client().task_manager
+            except LookupError:
+                task_manager = None
+
+            if task_manager is None:
+                # there's nowhere to run the prefetcher
+                self.prefetch = 0
+                return await self._fetch_page()
+
+            self._pages = anyio.create_queue(self.prefetch)
+            self._prefetching = True
+            await task_manager.spawn(self._prefetch_pages)
+
+        if self._prefetching or not self._pages.empty():
+            page = await self._pages.get()
+        elif self._stashed_page is not None:
+            # the prefetcher stopped early, so carry on without it
+            page, self._stashed_page = self._stashed_page, None
+        else:
+            return await self._fetch_page()
+
+        if isinstance(page, Exception):
+            self._closed = True
+            raise page
+
+        return page
+
+    async def _fill(self) -> None:
+        # a whole page might be skipped by the transform, so keep going until there's an item
+        while not self.items and not self._closed:
+            page = await self._next_page()
+            if not page:
+                self._closed = True
+                return
+
+            self._add_page(page)
+
+    def _add_page(self, page: List[dict]) -> None:
+        """
+        Transforms a page of raw items, and adds it to the items to yield.
+        """
+        if self.transform is not None:
+            page = [item for item in map(self.transform, page) if item is not None]
+
+        self.items.extend(page)
+
+    async def aclose(self) -> None:
+        """
+        Closes this iterator, stopping any background fetches.
+        """
+        self._closed = True
+        self.items.clear()
+        self._stashed_page = None
+
+        if self._prefetch_scope is not None:
+            await self._prefetch_scope.cancel()
+
+    async def __anext__(self) -> T:
+        if not self.items:
+            await self._fill()
+
+        try:
+            return self.items.popleft()
+        except IndexError:
+            raise StopAsyncIteration
+
+
 def base64ify(image_data: bytes):
     """
     Base64-ifys an image to send to discord.
@@ -155,6 +376,10 @@ def base64ify(image_data: bytes):
     return "data:{};base64,{}".format(mimetype, b64_data)
 
 
+# python 3.7+ only
+_fromisoformat = getattr(datetime.datetime, "fromisoformat", None)
+
+
 def to_datetime(timestamp: str) -> datetime.datetime:
     """
     Converts a Discord-formatted timestamp to a datetime object.
@@ -168,6 +393,13 @@ def to_datetime(timestamp: str) -> datetime.datetime:
     if timestamp.endswith("+00:00"):
         timestamp = timestamp[:-6]
 
+    if _fromisoformat is not None:
+        # much faster than strptime, but only accepts 3 or 6 digits of microseconds
+        try:
+            return _fromisoformat(timestamp)
+        except ValueError:
+            pass
+
     try:
         return datetime.datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%f")
     except ValueError:
@@ -175,6 +407,57 @@ def to_datetime(timestamp: str) -> datetime.datetime:
         return datetime.datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S")
 
 
+class StringInterner(object):
+    """
+    Deduplicates equal strings, so that only one copy of each is kept alive.
+
+    Unlike :func:`sys.intern`, strings are not kept alive forever (which it does on some versions
+    of Python). The table is split into two generations; strings that are looked up are moved
+    into the newer one, and the older one is dropped once the newer one is full.
+
+    .. code-block:: python3
+
+        intern_name = StringInterner()
+        name = intern_name(data["name"])
+    """
+
+    __slots__ = ("limit", "_new", "_old")
+
+    def __init__(self, limit: int = 65536):
+        """
+        :param limit: The number of strings in each generation.
+        """
+        #: The number of strings in each generation.
+        self.limit = limit
+
+        self._new = {}
+        self._old = {}
+
+    def __len__(self) -> int:
+        return len(self._new) + len(self._old)
+
+    def __call__(self, value: str) -> str:
+        """
+        :param value: The string to deduplicate. None is passed through.
+        :return: The shared copy of the string.
+        """
+        try:
+            return self._new[value]
+        except KeyError:
+            pass
+
+        if value is None:
+            return None
+
+        value = self._old.pop(value, value)
+        if len(self._new) >= self.limit:
+            self._old = self._new
+            self._new = {}
+
+        self._new[value] = value
+        return value
+
+
 def replace_quotes(item: str) -> str:
     """
     Replaces the quotes in a string, but only if they are un-escaped.
@@ -0,0 +1,115 @@
+# This file is part of curious.
+#
+# curious is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# curious is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with curious.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Tests for event admission control.
+"""
+import types
+
+import anyio
+import pytest
+
+from curious.core import _current_client
+from curious.core.event import AdmissionControl, EventManager, OverloadPolicy, event
+
+GATEWAY = types.SimpleNamespace(session=types.SimpleNamespace(shard_id=0))
+
+
+def run(func, manager: EventManager):
+    _current_client.set(types.SimpleNamespace(shard_count=1))
+
+    async def main():
+        async with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                manager.task_manager = tg
+                await func()
+
+    anyio.run(main)
+
+
+@pytest.mark.parametrize("policy", list(OverloadPolicy))
+def test_wait_for_at_limit(policy):
+    manager = EventManager()
+    manager.admission = AdmissionControl(max_tasks=1, policy=policy)
+    results = []
+
+    @event("a")
+    async def waiter(ctx):
+        results.append(await manager.wait_for("b", lambda value: True))
+
+    manager.add_event(waiter)
+
+    async def fire():
+        await manager.fire_event("a", gateway=GATEWAY)
+        # let the handler start waiting
+        await anyio.sleep(0.01)
+        assert manager.admission.in_flight == 1
+
+        # this is over the limit, but the handler holding the slot is waiting for it
+        await manager.fire_event("b", 1, gateway=GATEWAY)
+
+    run(fire, manager)
+    assert results == [1]
+    assert manager.admission.in_flight == 0
+
+
+def test_block_limits_tasks():
+    manager = EventManager()
+    manager.admission = AdmissionControl(max_tasks=2)
+    peak = []
+
+    @event("a")
+    async def handler(ctx):
+        peak.append(manager.admission.in_flight)
+        await anyio.sleep(0.001)
+
+    manager.add_event(handler)
+
+    async def fire():
+        for _ in range(20):
+            await manager.fire_event("a", gateway=GATEWAY)
+
+    run(fire, manager)
+    assert len(peak) == 20 and max(peak) <= 2
+    assert manager.admission.delayed > 0 and manager.admission.shed == 0
+
+
+def test_drop_sheds_low_priority_events():
+    manager = EventManager()
+    manager.admission = AdmissionControl(max_tasks=1, policy=OverloadPolicy.DROP,
+                                         priorities={"important": 1})
+    handled = []
+
+    @event("important")
+    @event("spam")
+    async def handler(ctx):
+        await anyio.sleep(0.001)
+        handled.append(ctx.event_name)
+
+    @event("spam", inline=True)
+    async def counter(ctx):
+        handled.append("inline")
+
+    manager.add_event(handler)
+    manager.add_event(counter)
+
+    async def fire():
+        await manager.fire_event("important", gateway=GATEWAY)
+        await manager.fire_event("spam", gateway=GATEWAY)
+        await manager.fire_event("important", gateway=GATEWAY)
+
+    run(fire, manager)
+    assert sorted(handled) == ["important", "important", "inline"]
+    assert manager.admission.shed_events == {"spam": 1}
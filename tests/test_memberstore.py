@@ -0,0 +1,112 @@
+# This file is part of curious.
+#
+# curious is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# curious is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with curious.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Tests for the member stores.
+"""
+import types
+
+import anyio
+import pytest
+
+from curious.core import _current_client
+from curious.core.state import State
+from curious.dataclasses.guild import Guild
+from curious.dataclasses.memberstore import ColumnarMemberStore, LazyMemberStore, MemberStore, \
+    _NameIndex
+from curious.dataclasses.presence import Status
+
+STORES = [MemberStore, LazyMemberStore, ColumnarMemberStore]
+
+
+def member(member_id: int, username: str, nick: str = None) -> dict:
+    return {"user": {"id": str(member_id), "username": username, "discriminator": "0001"},
+            "roles": [], "nick": nick}
+
+
+async def _drain(agen):
+    return [event async for event in agen]
+
+
+def run_with_guild(store_type: type, members: list, func):
+    """
+    Makes a guild with some members in a state, then calls ``func(state, guild)`` inside an async
+    context.
+    """
+    state = State(member_store_factory=lambda guild: store_type(guild.id))
+    _current_client.set(types.SimpleNamespace(state=state, user=types.SimpleNamespace(id=0),
+                                              guilds=state.guilds))
+
+    async def main():
+        data = {"id": "1", "name": "guild", "member_count": len(members), "members": members}
+        guild = Guild(**data)
+        state._guilds[guild.id] = guild
+        guild.from_guild_create(**data)
+        await func(state, guild)
+
+    anyio.run(main)
+
+
+def test_name_index_repeated_keys():
+    index = _NameIndex()
+    index.add(1, "Bob", "0001", "bob")
+    index.add(2, "bob", "0002", None)
+    assert index.get("BOB") == (1, 2)
+
+    # member 1's username and nick fold to the same key, which must only be removed once
+    index.remove(1)
+    assert index.get("bob") == (2,)
+    index.remove(2)
+    assert index.get("bob") == ()
+    assert len(index) == 0
+
+
+@pytest.mark.parametrize("store_type", STORES)
+def test_update_member_with_nick_matching_username(store_type):
+    gateway = types.SimpleNamespace(session=types.SimpleNamespace(shard_id=0))
+
+    async def check(state: State, guild: Guild):
+        assert guild.search_for_member(name="Bob").id == 1
+        assert guild.search_for_member(name="bob").id == 2
+
+        await _drain(state.handle_guild_member_update(gateway, {
+            "guild_id": "1", "user": {"id": "1", "username": "Bob", "discriminator": "0001"},
+            "nick": "BOB", "roles": [],
+        }))
+        assert guild.search_for_member(name="BOB").id == 1
+        assert guild.search_for_member(name="bob").id == 2
+
+        await _drain(state.handle_guild_member_remove(gateway, {
+            "guild_id": "1", "user": {"id": "1"},
+        }))
+        assert guild.search_for_member(name="Bob").id == 2
+        assert guild.search_for_member(name="BOB").id == 2
+
+    run_with_guild(store_type, [member(1, "Bob", "bob"), member(2, "bob")], check)
+
+
+def test_lazy_copy_does_not_share_records():
+    async def check(state: State, guild: Guild):
+        # neither member has been looked up yet, so both stores hold the same record
+        old_members = guild._members.copy()
+        guild._members.add_payload(member(1, "alice", "ally"))
+        guild._members.set_presence(1, {"status": "online"})
+
+        assert guild.members[1].nickname == "ally"
+        assert guild.members[1].status == Status.ONLINE
+        assert old_members[1].nickname.value is None
+        assert old_members[1].status == Status.OFFLINE
+
+    run_with_guild(LazyMemberStore, [member(1, "alice")], check)
@@ -0,0 +1,126 @@
+# This file is part of curious.
+#
+# curious is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# curious is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with curious.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Tests that the generated ``_from_payload`` parsers make the same objects as ``__init__``.
+"""
+import types
+
+import pytest
+
+from curious.core import _current_client
+from curious.dataclasses.bases import Dataclass, allow_external_makes
+from curious.dataclasses.channel import Channel
+from curious.dataclasses.emoji import Emoji
+from curious.dataclasses.member import Member
+from curious.dataclasses.message import Message
+from curious.dataclasses.role import Role
+from curious.dataclasses.user import User
+
+TIMESTAMP = "2018-06-01T12:34:56.789000+00:00"
+
+
+def user(user_id: int, **extra) -> dict:
+    return {"id": str(user_id), "username": "user{}".format(user_id), "discriminator": "0001",
+            "avatar": "a" * 32, **extra}
+
+
+# each type has a bare payload and one with every optional field set
+PAYLOADS = [
+    (User, user(1)),
+    (User, user(2, bot=True, verified=True, mfa_enabled=True)),
+    (Member, {"user": user(3), "roles": []}),
+    (Member, {"user": user(4), "roles": ["10", "11"], "joined_at": TIMESTAMP, "nick": "nick",
+              "guild_id": "20", "deaf": True, "mute": True}),
+    (Role, {"id": "10"}),
+    (Role, {"id": "11", "name": "role", "color": 0xff00ff, "hoist": True, "mentionable": True,
+            "permissions": 104324161, "managed": True, "position": 3, "guild_id": "20"}),
+    (Channel, {"id": "30", "type": 0}),
+    (Channel, {"id": "31", "guild_id": "20", "name": "chan", "type": 0, "topic": "a topic",
+               "position": 2, "nsfw": True, "parent_id": "32", "last_message_id": "40",
+               "rate_limit_per_user": 5}),
+    (Channel, {"id": "33", "type": 3, "name": "group", "owner_id": "1", "icon": "b" * 32,
+               "recipients": [user(1), user(2)]}),
+    (Message, {"id": "40", "channel_id": "31", "author": user(1), "timestamp": TIMESTAMP}),
+    (Message, {"id": "41", "channel_id": "31", "guild_id": "20", "author": user(2),
+               "content": "hello", "timestamp": TIMESTAMP, "edited_timestamp": TIMESTAMP,
+               "type": 0, "pinned": True, "tts": True, "embeds": [], "attachments": [],
+               "mentions": [user(1)], "mention_roles": ["10"], "mention_everyone": True,
+               "reactions": [], "webhook_id": "50"}),
+    (Emoji, {"id": "60", "name": "emoji"}),
+    (Emoji, {"id": "61", "name": "emoji", "roles": ["10"], "require_colons": True,
+             "managed": True, "animated": True, "guild_id": "20"}),
+]
+
+
+def fake_client():
+    users = {}
+
+    def make_user(data: dict) -> User:
+        user_id = int(data["id"])
+        if user_id not in users:
+            users[user_id] = User._from_payload(data)
+
+        return users[user_id]
+
+    state = types.SimpleNamespace(make_user=make_user, _users=users,
+                                  _check_decache_user=lambda id: None)
+    return types.SimpleNamespace(state=state, user=make_user(user(99)), guilds={})
+
+
+def attributes(obj: object) -> dict:
+    """
+    Gets every attribute set on an object, from both its slots and its ``__dict__``.
+    """
+    names = set(getattr(obj, "__dict__", ()))
+    for klass in type(obj).__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        names.update((slots,) if isinstance(slots, str) else slots)
+
+    names.discard("__weakref__")
+    names.discard("__dict__")
+    return {name: normalise(getattr(obj, name)) for name in names if hasattr(obj, name)}
+
+
+def normalise(value: object) -> object:
+    """
+    Turns a value into something that can be compared between two separately made objects.
+    """
+    if isinstance(value, Dataclass):
+        return type(value), value.id
+
+    if isinstance(value, (list, tuple)):
+        return type(value)(normalise(item) for item in value)
+
+    if isinstance(value, dict):
+        return {key: normalise(item) for (key, item) in value.items()}
+
+    if type(value).__eq__ is object.__eq__ and hasattr(value, "__dict__"):
+        return type(value), attributes(value)
+
+    return value
+
+
+@pytest.mark.parametrize("cls,payload", PAYLOADS,
+                         ids=[cls.__name__ for (cls, _) in PAYLOADS])
+def test_parser_matches_init(cls, payload):
+    _current_client.set(fake_client())
+
+    with allow_external_makes():
+        expected = cls(**payload)
+
+    parsed = cls._from_payload(payload)
+    assert type(parsed) is cls
+    assert attributes(parsed) == attributes(expected)